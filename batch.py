@@ -0,0 +1,78 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+import multiprocessing
+import os
+import random
+import time
+from typing import Iterator, Optional, Set, Tuple
+from grid import Grid, GridSize, check_generated_grid_size
+from puzzle import Puzzle
+from word_list import get_shared_word_list
+
+"""Generates batches of puzzles across a pool of worker processes"""
+
+def initialize_worker(word_list_path: str) -> None:
+    """
+    Loads the shared word list once per worker process. Workers forked from a parent that has already
+    loaded it inherit it, and otherwise the compiled word list is memory-mapped.
+    """
+    get_shared_word_list(word_list_path)
+
+def generate_puzzle(task: Tuple[GridSize, int, str]) -> Optional[Puzzle]:
+    """
+    Generates a single puzzle in a worker process.
+
+    Args:
+        task (Tuple[GridSize, int, str]): The grid size, the seed of the grid and the word list path.
+
+    Returns:
+        Optional[Puzzle]: The puzzle, or None if no pattern could be filled.
+    """
+    grid_size, seed, word_list_path = task
+    start_time: float = time.perf_counter()
+    try:
+        grid: Grid = Grid(grid_size, word_list = get_shared_word_list(word_list_path), seed = seed)
+    except RuntimeError:
+        return None
+    return Puzzle.from_grid(grid, time.perf_counter() - start_time)
+
+def generate_batch(count: int, grid_size: GridSize = 15, workers: Optional[int] = None, base_seed: Optional[int] = None, word_list_path: str = "words_alpha.txt") -> Iterator[Puzzle]:
+    """
+    Generates puzzles across a pool of worker processes, yielding each one as soon as it is finished
+    rather than in submission order. Puzzle i is generated from the seed base_seed + i, and puzzles whose
+    patterns can't be filled are skipped, so fewer than count puzzles may be yielded.
+
+    Only a few tasks per worker are kept in flight, so the batch size doesn't affect memory use.
+
+    Args:
+        workers (Optional[int]): The number of worker processes. Defaults to the number of CPUs.
+        base_seed (Optional[int]): The seed of the first puzzle. A random seed is used if None.
+
+    Raises:
+        ValueError: If no pattern can be generated for the grid size. This is checked before any puzzle is
+                        submitted, as every puzzle of the batch would fail.
+    """
+    check_generated_grid_size(grid_size)
+    workers = workers or os.cpu_count() or 1
+    if base_seed is None:
+        base_seed = random.randrange(2 ** 32)
+    # Load the word list before the pool starts, so that forked workers share its pages
+    get_shared_word_list(word_list_path)
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with ProcessPoolExecutor(workers, mp_context = context, initializer = initialize_worker, initargs = (word_list_path,)) as executor:
+        pending: Set[Future] = set()
+        next_index: int = 0
+        try:
+            while next_index < count or pending:
+                while next_index < count and len(pending) < workers * 2:
+                    pending.add(executor.submit(generate_puzzle, (grid_size, base_seed + next_index, word_list_path)))
+                    next_index += 1
+                done, pending = wait(pending, return_when = FIRST_COMPLETED)
+                for future in done:
+                    puzzle: Optional[Puzzle] = future.result()
+                    if puzzle is not None:
+                        yield puzzle
+        finally:
+            # Don't start the remaining tasks if the caller stops early
+            for future in pending:
+                future.cancel()
\ No newline at end of file
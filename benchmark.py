@@ -0,0 +1,296 @@
+import argparse
+from dataclasses import asdict, dataclass, field
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+from fill_engine import nogood_stores, unfillable_regions
+from grid import Grid, GridSize, parse_grid_size
+from pattern_generator import NUMPY_AVAILABLE
+from word_list import get_shared_word_list
+
+"""Times seeded grid generations phase by phase, and compares the results with a saved baseline"""
+
+BENCHMARK_VERSION: int = 1
+PHASES: Tuple[str, ...] = ("pattern", "numbering", "connectivity", "domains", "fill")
+PERCENTILES: Tuple[int, ...] = (50, 90, 99)
+# A case is reported as a regression if its median wall time grows by more than this fraction
+DEFAULT_REGRESSION_THRESHOLD: float = 0.1
+
+class TimedGrid(Grid):
+
+    def __init__(self, *args, **kwargs) -> None:
+        """
+        A Grid that times each phase of its generation. Phases can be nested, as numbering and the
+        connectivity check happen inside pattern generation, so each phase is only charged the time
+        spent outside the phases nested in it.
+
+        A grid that can't fill any of its patterns is kept rather than raising, with the error in
+        self.failure, as those slow runs are the ones whose counters and phase times matter most.
+        """
+        self.phase_times: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.phase_stack: List[Tuple[str, float]] = [] # Each running phase and the time it started
+        self.failure: Optional[RuntimeError] = None
+        try:
+            super().__init__(*args, **kwargs)
+        except RuntimeError as error:
+            self.failure = error
+
+    def start_phase(self, phase: str) -> None:
+        now: float = time.perf_counter()
+        if self.phase_stack:
+            outer_phase, started = self.phase_stack[-1]
+            self.phase_times[outer_phase] += now - started
+        self.phase_stack.append((phase, now))
+
+    def end_phase(self) -> None:
+        now: float = time.perf_counter()
+        phase, started = self.phase_stack.pop()
+        self.phase_times[phase] += now - started
+        if self.phase_stack:
+            outer_phase, _ = self.phase_stack[-1]
+            self.phase_stack[-1] = (outer_phase, now)
+
+    def create_black_square_pattern(self) -> None:
+        self.start_phase("pattern")
+        try:
+            super().create_black_square_pattern()
+        finally:
+            self.end_phase()
+
+    def assign_numbering(self) -> None:
+        self.start_phase("numbering")
+        try:
+            super().assign_numbering()
+        finally:
+            self.end_phase()
+
+    def are_lines_connected(self) -> bool:
+        self.start_phase("connectivity")
+        try:
+            return super().are_lines_connected()
+        finally:
+            self.end_phase()
+
+    def initialize_domains(self) -> None:
+        self.start_phase("domains")
+        try:
+            super().initialize_domains()
+        finally:
+            self.end_phase()
+
+    def populated_with_words(self, *args, **kwargs) -> bool:
+        self.start_phase("fill")
+        try:
+            return super().populated_with_words(*args, **kwargs)
+        finally:
+            self.end_phase()
+
+@dataclass
+class RunResult:
+    seed: int
+    succeeded: bool # False if no pattern could be filled within the grid's pattern attempts
+    wall_time: float # Seconds taken to construct the grid
+    phase_times: Dict[str, float] # Seconds spent in each phase
+    nodes: int # Word placements tried, over every pattern attempted
+    backtracks: int # Words whose candidates were exhausted, over every pattern attempted
+    retries: int # Patterns abandoned by the grid's outer loop before the final one
+
+@dataclass
+class CaseResult:
+    name: str
+    rows: int
+    cols: int
+    generator: str # "numpy" or "legacy"
+    runs: List[RunResult] = field(default_factory = list)
+    peak_memory: Optional[int] = None # Peak bytes allocated by a traced run, if one was made
+
+    def summarise(self) -> Dict:
+        """
+        Summarises the runs of the case: wall time percentiles, mean phase times and totals of the
+        search statistics.
+        """
+        wall_times: List[float] = [run.wall_time for run in self.runs]
+        return {
+            "runs": len(self.runs),
+            "succeeded": sum(run.succeeded for run in self.runs),
+            "wall_time": {**{f"p{percent}": get_percentile(wall_times, percent) for percent in PERCENTILES}, "mean": statistics.fmean(wall_times), "max": max(wall_times)},
+            "phase_times": {phase: statistics.fmean(run.phase_times[phase] for run in self.runs) for phase in PHASES},
+            "nodes": sum(run.nodes for run in self.runs),
+            "backtracks": sum(run.backtracks for run in self.runs),
+            "retries": sum(run.retries for run in self.runs),
+            "peak_memory": self.peak_memory
+        }
+
+def get_percentile(values: List[float], percent: float) -> float:
+    """
+    Finds a percentile of the values by linear interpolation between the closest ranks.
+    """
+    ordered: List[float] = sorted(values)
+    position: float = (len(ordered) - 1) * percent / 100
+    lower: int = int(position)
+    upper: int = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def run_once(grid_size: GridSize, seed: int, vectorised_patterns: bool, word_list_path: str) -> RunResult:
+    """
+    Generates and fills one grid, timing the whole construction and each of its phases. Nogoods and unfillable
+    regions learnt by earlier runs are forgotten first, so that repeated seeds aren't sped up by them.
+    """
+    nogood_stores.clear()
+    unfillable_regions.clear()
+    start_time: float = time.perf_counter()
+    grid: TimedGrid = TimedGrid(grid_size, word_list = get_shared_word_list(word_list_path), seed = seed, vectorised_patterns = vectorised_patterns)
+    wall_time: float = time.perf_counter() - start_time
+    return RunResult(seed, grid.failure is None, wall_time, grid.phase_times, grid.counters.nodes, grid.counters.backtracks, grid.counters.pattern_retries)
+
+def measure_peak_memory(grid_size: GridSize, seed: int, vectorised_patterns: bool, word_list_path: str) -> int:
+    """
+    Generates one grid with tracemalloc running, and returns the peak number of bytes allocated. Tracing
+    slows Python down considerably, so traced runs are kept apart from the timed ones.
+    """
+    tracemalloc.start()
+    try:
+        run_once(grid_size, seed, vectorised_patterns, word_list_path)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run_case(grid_size: GridSize, generator: str, seeds: List[int], word_list_path: str = "words_alpha.txt", measure_memory: bool = True, warmup: int = 1) -> CaseResult:
+    """
+    Runs one benchmark case: a grid size and pattern generator, generated once per seed.
+
+    Args:
+        generator (str): "numpy" for the NumPy pattern generator, or "legacy" for the cell by cell one.
+        warmup (int): The number of untimed runs made first, so that caches are warm.
+    """
+    rows, cols = grid_size if isinstance(grid_size, tuple) else (grid_size, grid_size)
+    vectorised_patterns: bool = generator == "numpy"
+    # The word list is loaded outside the timed runs
+    get_shared_word_list(word_list_path)
+    for seed in seeds[:warmup]:
+        run_once(grid_size, seed, vectorised_patterns, word_list_path)
+    case: CaseResult = CaseResult(f"{rows}x{cols}-{generator}", rows, cols, generator)
+    case.runs = [run_once(grid_size, seed, vectorised_patterns, word_list_path) for seed in seeds]
+    if measure_memory and seeds:
+        case.peak_memory = measure_peak_memory(grid_size, seeds[0], vectorised_patterns, word_list_path)
+    return case
+
+def run_benchmarks(grid_sizes: List[GridSize], generators: List[str], seeds: List[int], word_list_path: str = "words_alpha.txt", measure_memory: bool = True) -> Dict:
+    """
+    Runs every combination of grid size and pattern generator over the same seeds.
+
+    Returns:
+        Dict: The machine-readable report, with a summary and the individual runs of each case.
+    """
+    cases: Dict[str, Dict] = {}
+    for grid_size in grid_sizes:
+        for generator in generators:
+            case: CaseResult = run_case(grid_size, generator, seeds, word_list_path, measure_memory)
+            cases[case.name] = {
+                "rows": case.rows,
+                "cols": case.cols,
+                "generator": case.generator,
+                "summary": case.summarise(),
+                "runs": [asdict(run) for run in case.runs]
+            }
+    return {
+        "version": BENCHMARK_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seeds": seeds,
+        "cases": cases
+    }
+
+def compare_reports(report: Dict, baseline: Dict, threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> List[Dict]:
+    """
+    Compares the median wall time and mean phase times of each case with those of the same case in a
+    baseline report. Cases missing from either report are skipped.
+
+    Returns:
+        List[Dict]: One comparison per case, giving the ratio of each time to its baseline and whether
+                                    the median wall time grew by more than the threshold.
+    """
+    comparisons: List[Dict] = []
+    for name, case in report["cases"].items():
+        if name not in baseline["cases"]:
+            continue
+        summary, baseline_summary = (case["summary"], baseline["cases"][name]["summary"])
+        wall_ratio: float = get_ratio(summary["wall_time"]["p50"], baseline_summary["wall_time"]["p50"])
+        comparisons.append({
+            "name": name,
+            "wall_time_p50": wall_ratio,
+            "phase_times": {phase: get_ratio(summary["phase_times"][phase], baseline_summary["phase_times"][phase]) for phase in PHASES},
+            "regression": wall_ratio > 1 + threshold
+        })
+    return comparisons
+
+def get_ratio(value: float, baseline: float) -> Optional[float]:
+    return value / baseline if baseline else None
+
+def format_report(report: Dict, comparisons: Optional[List[Dict]] = None) -> str:
+    """
+    Formats a report as a table with one line per case, followed by the baseline comparison if there is one.
+    """
+    lines: List[str] = [f"{'case':<18} {'ok':>7} {'p50':>8} {'p90':>8} {'p99':>8} " + " ".join(f"{phase:>12}" for phase in PHASES) + f" {'nodes':>9} {'backtracks':>10} {'retries':>7} {'peak KiB':>9}"]
+    for name, case in report["cases"].items():
+        summary: Dict = case["summary"]
+        wall_time: Dict[str, float] = summary["wall_time"]
+        peak_memory: str = f"{summary['peak_memory'] / 1024:.0f}" if summary["peak_memory"] is not None else "-"
+        lines.append(
+            f"{name:<18} {summary['succeeded']:>3}/{summary['runs']:<3} {wall_time['p50']:>8.4f} {wall_time['p90']:>8.4f} {wall_time['p99']:>8.4f} "
+            + " ".join(f"{summary['phase_times'][phase]:>12.5f}" for phase in PHASES)
+            + f" {summary['nodes']:>9} {summary['backtracks']:>10} {summary['retries']:>7} {peak_memory:>9}"
+        )
+    if comparisons:
+        lines.append("")
+        lines.append("Compared with baseline (new time / baseline time):")
+        for comparison in comparisons:
+            ratios: str = " ".join(f"{phase} {format_ratio(ratio)}" for phase, ratio in comparison["phase_times"].items())
+            flag: str = "  REGRESSION" if comparison["regression"] else ""
+            lines.append(f"{comparison['name']:<18} p50 {format_ratio(comparison['wall_time_p50'])}  {ratios}{flag}")
+    return "\n".join(lines)
+
+def format_ratio(ratio: Optional[float]) -> str:
+    return f"{ratio:.2f}x" if ratio is not None else "-"
+
+def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description = "Benchmark pattern generation, numbering and word fill.")
+    parser.add_argument("--sizes", type = parse_grid_size, nargs = "+", default = [15], help = "grid sizes to benchmark, each a number of rows and columns or ROWSxCOLS")
+    parser.add_argument("--generators", nargs = "+", choices = ["numpy", "legacy"], default = ["numpy", "legacy"] if NUMPY_AVAILABLE else ["legacy"], help = "pattern generators to benchmark")
+    parser.add_argument("--runs", type = int, default = 20, help = "number of seeded generations per case")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed of the first generation of each case")
+    parser.add_argument("--word-list", default = "words_alpha.txt", help = "path of the word list")
+    parser.add_argument("--no-memory", action = "store_true", help = "skip the traced run that measures peak memory")
+    parser.add_argument("--output", default = None, metavar = "PATH", help = "write the JSON report to this file")
+    parser.add_argument("--json", action = "store_true", help = "print the JSON report instead of a table")
+    parser.add_argument("--baseline", default = None, metavar = "PATH", help = "compare with a JSON report saved by --output")
+    parser.add_argument("--threshold", type = float, default = DEFAULT_REGRESSION_THRESHOLD, help = "fraction by which a median wall time may grow before it is a regression")
+    return parser.parse_args(args)
+
+def main(args: Optional[List[str]] = None) -> int:
+    """
+    Runs the benchmarks from the command line.
+
+    Returns:
+        int: The exit status, which is 1 if any case regressed against the baseline.
+    """
+    options: argparse.Namespace = parse_args(args)
+    seeds: List[int] = list(range(options.seed, options.seed + options.runs))
+    report: Dict = run_benchmarks(options.sizes, options.generators, seeds, options.word_list, not options.no_memory)
+    comparisons: Optional[List[Dict]] = None
+    if options.baseline:
+        with open(options.baseline) as file:
+            comparisons = compare_reports(report, json.load(file), options.threshold)
+        report["comparison"] = comparisons
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(report, file, indent = 2)
+    print(json.dumps(report, indent = 2) if options.json else format_report(report, comparisons))
+    return int(any(comparison["regression"] for comparison in comparisons or []))
+
+if __name__ == "__main__":
+    sys.exit(main())
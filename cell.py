@@ -1,3 +1,8 @@
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from grid_state import GridState
+
 class Cell:
     def __init__(self):
 
@@ -14,4 +19,50 @@ class Cell:
         number = f"self.numbering = {self.numbering}"
         across = f"self.num_across = {self.num_across}"
         down = f"self.num_down = {self.num_down}"
-        return f"{letter}, {number}, {across}, {down}"
\ No newline at end of file
+        return f"{letter}, {number}, {across}, {down}"
+
+class CellView:
+    """
+    A lightweight view of one cell of a GridState, with the same attributes as Cell. Reading or writing
+    an attribute reads or writes the grid state's buffers, so views can be created and discarded freely.
+    """
+    __slots__ = ("state", "index")
+
+    def __init__(self, state: "GridState", index: int):
+        self.state = state
+        self.index = index # Position of the cell in the state's flat buffers
+
+    @property
+    def letter(self) -> Optional[str]:
+        value: int = self.state.letters[self.index]
+        return chr(value) if value else None
+
+    @letter.setter
+    def letter(self, letter: Optional[str]) -> None:
+        self.state.set_letter(self.index, letter)
+
+    @property
+    def numbering(self) -> Optional[int]:
+        return self.state.numbering[self.index] or None
+
+    @numbering.setter
+    def numbering(self, number: Optional[int]) -> None:
+        self.state.numbering[self.index] = number or 0
+
+    @property
+    def num_across(self) -> Optional[int]:
+        return self.state.num_across[self.index] or None
+
+    @num_across.setter
+    def num_across(self, number: Optional[int]) -> None:
+        self.state.num_across[self.index] = number or 0
+
+    @property
+    def num_down(self) -> Optional[int]:
+        return self.state.num_down[self.index] or None
+
+    @num_down.setter
+    def num_down(self, number: Optional[int]) -> None:
+        self.state.num_down[self.index] = number or 0
+
+    __str__ = Cell.__str__
\ No newline at end of file
@@ -0,0 +1,274 @@
+import hashlib
+import mmap
+import os
+import random
+import struct
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple, TypeVar, Union
+
+"""Compiles a text word list into a binary file that can be memory-mapped"""
+
+MAGIC: bytes = b"CWWL0003"
+COMPILED_EXTENSION: str = ".bin"
+DEFAULT_SHUFFLE_SEED: int = 0
+# Score of words listed without one
+DEFAULT_WORD_SCORE: int = 50
+# Magic, SHA-256 of the source file, shuffle seed, alphabet size and number of word lengths
+HEADER_FORMAT: str = "<8s32sQII"
+# Word length, word count, offset of the letters, offset of the index, size of each bitset, offset of the
+# score buckets and number of score buckets
+TABLE_ENTRY_FORMAT: str = "<IIQQIQI"
+# First word id and score of a score bucket
+BUCKET_FORMAT: str = "<Ii"
+
+# A word as str or bytes
+AnyWord = TypeVar("AnyWord", str, bytes)
+# Words of one length with the same score, as the first word id, the word id after the last one and the score
+ScoreBucket = Tuple[int, int, int]
+
+def get_compiled_path(source: str) -> str:
+    """
+    Returns the path of the compiled file for a text word list.
+    """
+    return os.path.splitext(source)[0] + COMPILED_EXTENSION
+
+def hash_file(path: str) -> bytes:
+    """
+    Returns the SHA-256 digest of a file, which is stored in the compiled file to detect a changed source.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+def compile_word_list(source: str, target: Optional[str] = None, shuffle_seed: int = DEFAULT_SHUFFLE_SEED) -> str:
+    """
+    Compiles a text word list, with one word per line, into a binary file containing a fixed-width letter
+    array for each word length, the positional letter index of each length as prebuilt bitsets, and the
+    score buckets of each length. Words are ordered by order_scored_words, so a word's id is its position
+    in the ordered letter array. This gives the same order as WordList ordering the text file with the same
+    seed. Words that aren't ASCII are skipped.
+
+    File layout:
+        header: magic, source hash, shuffle seed, alphabet size, number of word lengths
+        alphabet: one byte per letter
+        table: one entry per word length
+        letters: count * length bytes per word length
+        index: length * alphabet size bitsets per word length, ordered by position then letter
+        buckets: first word id and score of each score bucket per word length, highest score first
+
+    Returns:
+        str: The path of the compiled file.
+    """
+    target = target or get_compiled_path(source)
+    words_by_length: Dict[int, List[Tuple[bytes, int]]] = {}
+    with open(source, "rb") as file:
+        for line in file:
+            word, score = parse_scored_word(line)
+            if word and word.isascii():
+                words_by_length.setdefault(len(word), []).append((word, score))
+    buckets_by_length: Dict[int, List[ScoreBucket]] = {length: order_scored_words(words, length, shuffle_seed) for length, words in words_by_length.items()}
+    alphabet: bytes = bytes(sorted({letter for words in words_by_length.values() for word, _ in words for letter in word}))
+    lengths: List[int] = sorted(words_by_length)
+    offset: int = struct.calcsize(HEADER_FORMAT) + len(alphabet) + len(lengths) * struct.calcsize(TABLE_ENTRY_FORMAT)
+    table: List[Tuple[int, int, int, int, int, int, int]] = []
+    for length in lengths:
+        count: int = len(words_by_length[length])
+        bitset_size: int = (count + 7) // 8
+        letters_offset: int = offset
+        index_offset: int = letters_offset + count * length
+        bucket_offset: int = index_offset + length * len(alphabet) * bitset_size
+        offset = bucket_offset + len(buckets_by_length[length]) * struct.calcsize(BUCKET_FORMAT)
+        table.append((length, count, letters_offset, index_offset, bitset_size, bucket_offset, len(buckets_by_length[length])))
+    temporary_target: str = f"{target}.{os.getpid()}.tmp"
+    with open(temporary_target, "wb") as file:
+        file.write(struct.pack(HEADER_FORMAT, MAGIC, hash_file(source), shuffle_seed, len(alphabet), len(lengths)))
+        file.write(alphabet)
+        for entry in table:
+            file.write(struct.pack(TABLE_ENTRY_FORMAT, *entry))
+        for length, count, _, _, bitset_size, _, _ in table:
+            words: List[bytes] = [word for word, _ in words_by_length[length]]
+            file.write(b"".join(words))
+            file.write(create_index_bitsets(words, length, alphabet, bitset_size))
+            for start, _, score in buckets_by_length[length]:
+                file.write(struct.pack(BUCKET_FORMAT, start, score))
+    # Replace atomically so that a process mapping the old file never sees a partial one
+    os.replace(temporary_target, target)
+    return target
+
+def shuffle_words(words: List, length: int, shuffle_seed: int) -> None:
+    """
+    Shuffles the words of one length in place. Each length is shuffled by its own generator, so the order
+    doesn't depend on which other lengths are loaded.
+    """
+    random.Random(f"{shuffle_seed}:{length}").shuffle(words)
+
+def parse_scored_word(line: AnyWord) -> Tuple[AnyWord, int]:
+    """
+    Parses a line of a word list, which is either a word or a word and an integer score separated by a
+    semicolon (e.g. "crossword;60"). Higher scores are better words.
+
+    Returns:
+        Tuple[AnyWord, int]: The word, which is empty for a blank line, and its score (DEFAULT_WORD_SCORE
+                                if it has none).
+
+    Raises:
+        ValueError: If the score isn't an integer.
+    """
+    word, _, score = line.strip().partition(b";" if isinstance(line, bytes) else ";")
+    return word.strip(), int(score) if score.strip() else DEFAULT_WORD_SCORE
+
+def order_scored_words(words: List[Tuple[AnyWord, int]], length: int, shuffle_seed: int) -> List[ScoreBucket]:
+    """
+    Orders scored words of one length in place: shuffled with the shuffle seed, then stably sorted from the
+    highest score to the lowest. Words with the same score form a bucket of consecutive word ids, in random
+    order within the bucket, so candidates can be tried best bucket first without reshuffling. A list with
+    no scores is a single bucket in the same order as shuffle_words gives.
+
+    Returns:
+        List[ScoreBucket]: The buckets, highest score first.
+    """
+    shuffle_words(words, length, shuffle_seed)
+    words.sort(key = lambda scored_word: -scored_word[1])
+    buckets: List[ScoreBucket] = []
+    for word_id, (_, score) in enumerate(words):
+        if buckets and buckets[-1][2] == score:
+            buckets[-1] = (buckets[-1][0], word_id + 1, score)
+        else:
+            buckets.append((word_id, word_id + 1, score))
+    return buckets
+
+def create_index_bitsets(words: List[bytes], length: int, alphabet: bytes, bitset_size: int) -> bytes:
+    """
+    Builds the little-endian bitsets of the positional letter index for words of one length.
+    """
+    bitsets: List[bytearray] = [bytearray(bitset_size) for _ in range(length * len(alphabet))]
+    letter_indexes: Dict[int, int] = {letter: i for i, letter in enumerate(alphabet)}
+    for word_id, word in enumerate(words):
+        byte_index: int = word_id >> 3
+        bit: int = 1 << (word_id & 7)
+        for position, letter in enumerate(word):
+            bitsets[position * len(alphabet) + letter_indexes[letter]][byte_index] |= bit
+    return b"".join(bitsets)
+
+class PackedWords:
+
+    def __init__(self, buffer: mmap.mmap, offset: int, length: int, count: int) -> None:
+        """
+        Provides read-only list access to the fixed-width letter array of one word length.
+        """
+        self.buffer: mmap.mmap = buffer
+        self.offset: int = offset
+        self.length: int = length
+        self.count: int = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, word_id: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(word_id, slice):
+            return [self[i] for i in range(*word_id.indices(self.count))]
+        if word_id < 0:
+            word_id += self.count
+        if not 0 <= word_id < self.count:
+            raise IndexError("word id out of range")
+        start: int = self.offset + word_id * self.length
+        return self.buffer[start:start + self.length].decode("ascii")
+
+    def __iter__(self) -> Iterator[str]:
+        for word_id in range(self.count):
+            yield self[word_id]
+
+class CompiledWordList:
+
+    def __init__(self, path: str) -> None:
+        """
+        Memory-maps a compiled word list. Only the header and table are read up front; words and index
+        bitsets are read from the mapping when they are first used.
+        """
+        self.path: str = path
+        with open(path, "rb") as file:
+            self.buffer: mmap.mmap = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+        magic, self.source_hash, self.shuffle_seed, alphabet_size, length_count = struct.unpack_from(HEADER_FORMAT, self.buffer)
+        if magic != MAGIC:
+            self.buffer.close()
+            raise ValueError(f"{path} is not a compiled word list")
+        offset: int = struct.calcsize(HEADER_FORMAT)
+        self.alphabet: Dict[str, int] = {chr(letter): i for i, letter in enumerate(self.buffer[offset:offset + alphabet_size])}
+        offset += alphabet_size
+        self.table: Dict[int, Tuple[int, int, int, int]] = {}
+        self.buckets: Dict[int, List[ScoreBucket]] = {}
+        for _ in range(length_count):
+            length, count, letters_offset, index_offset, bitset_size, bucket_offset, bucket_count = struct.unpack_from(TABLE_ENTRY_FORMAT, self.buffer, offset)
+            self.table[length] = (count, letters_offset, index_offset, bitset_size)
+            starts: List[Tuple[int, int]] = list(struct.iter_unpack(BUCKET_FORMAT, self.buffer[bucket_offset:bucket_offset + bucket_count * struct.calcsize(BUCKET_FORMAT)]))
+            self.buckets[length] = [(start, starts[i + 1][0] if i + 1 < len(starts) else count, score) for i, (start, score) in enumerate(starts)]
+            offset += struct.calcsize(TABLE_ENTRY_FORMAT)
+        self.bitsets: Dict[Tuple[int, int, str], int] = {}
+
+    def get_words(self, word_length: int) -> PackedWords:
+        """
+        Returns the words of the given length, in word id order.
+        """
+        count, letters_offset, _, _ = self.table.get(word_length, (0, 0, 0, 0))
+        return PackedWords(self.buffer, letters_offset, word_length, count)
+
+    def get_buckets(self, word_length: int) -> List[ScoreBucket]:
+        """
+        Returns the score buckets of the words of the given length, highest score first.
+        """
+        return self.buckets.get(word_length, [])
+
+    def get_letter_bitset(self, word_length: int, position: int, letter: str) -> int:
+        """
+        Returns the bitset of words of the given length that have the letter at the given position,
+        converting it from the mapping on first use.
+        """
+        key: Tuple[int, int, str] = (word_length, position, letter)
+        if key not in self.bitsets:
+            if word_length not in self.table or letter not in self.alphabet or not 0 <= position < word_length:
+                return 0
+            _, _, index_offset, bitset_size = self.table[word_length]
+            start: int = index_offset + (position * len(self.alphabet) + self.alphabet[letter]) * bitset_size
+            self.bitsets[key] = int.from_bytes(self.buffer[start:start + bitset_size], "little")
+        return self.bitsets[key]
+
+    def is_current(self, source: str, shuffle_seed: int = DEFAULT_SHUFFLE_SEED) -> bool:
+        """
+        Checks whether the compiled file was built from the current contents of the source file with
+        the given shuffle seed.
+        """
+        return self.shuffle_seed == shuffle_seed and self.source_hash == hash_file(source)
+
+    def close(self) -> None:
+        self.bitsets.clear()
+        self.buffer.close()
+
+def load_compiled_word_list(source: str, shuffle_seed: int = DEFAULT_SHUFFLE_SEED) -> Optional[CompiledWordList]:
+    """
+    Memory-maps the compiled form of a text word list, compiling it first if it is missing or was built
+    from a different version of the source file or with a different shuffle seed.
+
+    Returns:
+        Optional[CompiledWordList]: The compiled word list, or None if it can't be compiled or loaded
+                                        (e.g. if the directory is read-only).
+    """
+    path: str = get_compiled_path(source)
+    try:
+        compiled: CompiledWordList = CompiledWordList(path)
+        if compiled.is_current(source, shuffle_seed):
+            return compiled
+        compiled.close()
+    except (OSError, ValueError, struct.error):
+        # Missing, or written by an older version of the format
+        pass
+    try:
+        compile_word_list(source, path, shuffle_seed)
+        return CompiledWordList(path)
+    except (OSError, ValueError, struct.error):
+        return None
+
+if __name__ == "__main__":
+    for source in sys.argv[1:] or ["words_alpha.txt"]:
+        print(f"Compiled {source} to {compile_word_list(source)}")
@@ -0,0 +1,74 @@
+from pathlib import Path
+from typing import Iterator, List, Set, Tuple
+import pytest
+from fill_engine import nogood_stores
+from grid import Grid
+
+"""Fixtures shared by the tests"""
+
+# Three letter words that form 32 word squares, for grids that fill in a few nodes
+WORDS = ["ace", "are", "bar", "bee", "car", "ear", "eat", "era", "ere", "oar", "ore", "rat", "red", "sea", "tar", "tea", "tee"]
+
+@pytest.fixture(autouse = True)
+def clear_nogoods() -> Iterator[None]:
+    """
+    Clears the nogoods shared by fills of the same pattern, as every test uses a word list at the same path.
+    """
+    nogood_stores.clear()
+    yield
+
+@pytest.fixture
+def word_list_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> str:
+    """
+    Writes WORDS to words_alpha.txt in a temporary working directory, so that word lists loaded from the
+    default path, and any files written next to them, stay out of the repository.
+    """
+    path: Path = tmp_path / "words_alpha.txt"
+    path.write_text("\n".join(WORDS) + "\n")
+    monkeypatch.chdir(tmp_path)
+    return str(path)
+
+def assert_valid_fill(grid: Grid) -> None:
+    """
+    Checks that every white cell of a grid has a letter and that every word is in WORDS and matches the
+    letters of its line.
+    """
+    assert all(cell.letter for row in grid.grid for cell in row)
+    for direction, words in grid.words.items():
+        for word in words.values():
+            row, col = word.start_pos
+            letters: str = "".join(grid.grid[row + i * (direction == "down")][col + i * (direction == "across")].letter for i in range(word.length))
+            assert word.word == letters
+            assert word.word in WORDS
+
+def create_grid(**grid_options) -> Grid:
+    """
+    Creates a 3 x 3 grid from a fixed seed, as some 3 x 3 patterns have no words.
+    """
+    return Grid(3, seed = 2, **grid_options)
+
+def get_runs(line: str) -> List[str]:
+    return [run for run in line.split("#") if run]
+
+def assert_valid_pattern(pattern: List[str], max_length: int = 15) -> None:
+    """
+    Checks that a black square pattern is symmetric under 180 degree rotation, that every white cell is in
+    an across or down word of 3 to max_length cells, and that the white cells are connected.
+    """
+    columns: List[str] = ["".join(column) for column in zip(*pattern)]
+    assert [row[::-1] for row in pattern[::-1]] == pattern
+    for line in pattern + columns:
+        assert all(len(run) <= max_length for run in get_runs(line))
+    white: Set[Tuple[int, int]] = {(row, col) for row, line in enumerate(pattern) for col, character in enumerate(line) if character != "#"}
+    for row, col in white:
+        across: str = pattern[row][:col].rsplit("#", 1)[-1] + pattern[row][col:].split("#", 1)[0]
+        down: str = columns[col][:row].rsplit("#", 1)[-1] + columns[col][row:].split("#", 1)[0]
+        assert len(across) >= 3 or len(down) >= 3
+    reached: Set[Tuple[int, int]] = set()
+    pending: List[Tuple[int, int]] = [min(white)]
+    while pending:
+        cell: Tuple[int, int] = pending.pop()
+        if cell in white and cell not in reached:
+            reached.add(cell)
+            pending.extend((cell[0] + row_step, cell[1] + col_step) for row_step, col_step in ((1, 0), (-1, 0), (0, 1), (0, -1)))
+    assert reached == white
@@ -0,0 +1,179 @@
+from typing import List, Tuple
+from grid_state import BLACK_SQUARE, GridState
+
+"""Tracks whether the white cells of a grid form a single connected region"""
+
+
+class WhiteCellConnectivity:
+
+    def __init__(self, state: GridState) -> None:
+        """
+        Checks the connectivity of the white cells (cells without a black square) of a grid state with
+        iterative breadth-first searches over its flat letter buffer, so large open grids can't exceed
+        the recursion limit.
+
+        Black squares are only ever added while a pattern is generated, so a connected region can only be
+        split at the moment a black square is added. add_black_square checks exactly that, letting a
+        generator reject a pattern as soon as it splits instead of after it has been numbered.
+        """
+        self.state: GridState = state
+        self.visited: bytearray = bytearray(state.rows * state.cols)
+        self.search_mark: int = 0 # Value marking the cells visited by the current search
+
+    def get_white_neighbours(self, index: int) -> List[int]:
+        """
+        Finds the white cells above, below, left and right of a cell.
+        """
+        letters: bytearray = self.state.letters
+        cols: int = self.state.cols
+        col: int = index % cols
+        neighbours: List[int] = []
+        if col > 0 and letters[index - 1] != BLACK_SQUARE:
+            neighbours.append(index - 1)
+        if col < cols - 1 and letters[index + 1] != BLACK_SQUARE:
+            neighbours.append(index + 1)
+        if index >= cols and letters[index - cols] != BLACK_SQUARE:
+            neighbours.append(index - cols)
+        if index + cols < len(letters) and letters[index + cols] != BLACK_SQUARE:
+            neighbours.append(index + cols)
+        return neighbours
+
+    def start_search(self, labels: int = 1) -> int:
+        """
+        Starts a new search, reusing the visited buffer by marking cells with new values rather than
+        clearing it. The search may mark cells with the returned value and the labels - 1 values after it.
+        """
+        if self.search_mark + labels > 255:
+            self.visited = bytearray(len(self.visited))
+            self.search_mark = 0
+        mark: int = self.search_mark + 1
+        self.search_mark += labels
+        return mark
+
+    def is_white(self, row: int, col: int) -> bool:
+        """
+        Checks whether a cell is white, treating cells outside the grid as black squares.
+        """
+        return 0 <= row < self.state.rows and 0 <= col < self.state.cols and self.state.letters[row * self.state.cols + col] != BLACK_SQUARE
+
+    def are_neighbours_joined_locally(self, index: int) -> bool:
+        """
+        Checks whether the white cells above, below, left and right of a cell are joined through the white
+        cells diagonal to it, without searching the rest of the grid. Two neighbours next to each other
+        around the cell are joined if the diagonal cell between them is white.
+        """
+        row, col = divmod(index, self.state.cols)
+        # The neighbours in order around the cell, each followed by the diagonal cell before the next one
+        ring: Tuple[bool, ...] = (
+            self.is_white(row - 1, col), self.is_white(row - 1, col + 1),
+            self.is_white(row, col + 1), self.is_white(row + 1, col + 1),
+            self.is_white(row + 1, col), self.is_white(row + 1, col - 1),
+            self.is_white(row, col - 1), self.is_white(row - 1, col - 1)
+        )
+        white_neighbours: int = ring[0] + ring[2] + ring[4] + ring[6]
+        links: int = sum(1 for i in range(0, 8, 2) if ring[i] and ring[i + 1] and ring[(i + 2) % 8])
+        # The white neighbours form a path (or a cycle) around the cell, so they are joined by one fewer links
+        return links >= white_neighbours - 1
+
+    def add_black_square(self, row: int, col: int) -> bool:
+        """
+        Places a black square and checks whether the white cells around it are still connected to each other
+        through the rest of the grid. A breadth-first search is grown from each white neighbour in turn, and
+        searches that meet are merged. The check stops as soon as every search has merged, or every search but
+        one has run out of cells, so its cost is bounded by the smaller regions rather than the whole grid.
+
+        Regions that can't hold a word are allowed to be cut off, as they become black squares when the
+        pattern is numbered.
+
+        Returns:
+            bool: False if the black square has split the white cells into regions that can hold words,
+                    otherwise True.
+        """
+        index: int = row * self.state.cols + col
+        if self.state.blocks[index]:
+            return True
+        self.state.set_letter(index, "#")
+        neighbours: List[int] = self.get_white_neighbours(index)
+        if len(neighbours) <= 1 or self.are_neighbours_joined_locally(index):
+            return True
+        mark: int = self.start_search(len(neighbours))
+        visited: bytearray = self.visited
+        searches: List[List[int]] = [[neighbour] for neighbour in neighbours] # Cells reached by each search
+        heads: List[int] = [0] * len(neighbours) # Position of the next cell to expand in each search
+        running: List[bool] = [True] * len(neighbours) # Whether each search still has cells to expand
+        groups: List[int] = list(range(len(neighbours))) # Merged group of each search, as a union-find parent
+        for label, neighbour in enumerate(neighbours):
+            visited[neighbour] = mark + label
+
+        def find_group(label: int) -> int:
+            while groups[label] != label:
+                label = groups[label]
+            return label
+
+        # Number of groups with a running search, and of cut off regions that can hold a word
+        running_groups: int = len(neighbours)
+        word_regions: int = 0
+        while running_groups > 1:
+            for label, cells in enumerate(searches):
+                if not running[label]:
+                    continue
+                if heads[label] == len(cells):
+                    running[label] = False
+                    group: int = find_group(label)
+                    if not any(running[other] and find_group(other) == group for other in range(len(searches))):
+                        # The group has run out of cells without meeting the others, so its region is cut off
+                        running_groups -= 1
+                        region: List[int] = [cell for other, other_cells in enumerate(searches) if find_group(other) == group for cell in other_cells]
+                        word_regions += self.can_hold_word(region)
+                    continue
+                for neighbour in self.get_white_neighbours(cells[heads[label]]):
+                    visited_label: int = visited[neighbour] - mark
+                    if 0 <= visited_label < len(searches):
+                        # A search only meets another while both are running, so two running groups merge
+                        group, other_group = (find_group(label), find_group(visited_label))
+                        if group != other_group:
+                            groups[other_group] = group
+                            running_groups -= 1
+                    else:
+                        visited[neighbour] = mark + label
+                        cells.append(neighbour)
+                heads[label] += 1
+        # The searches still running have all merged into one region
+        return word_regions + (running_groups > 0) <= 1
+
+    def can_hold_word(self, cells: List[int]) -> bool:
+        """
+        Checks whether any of the given cells is in the middle of three white cells in a row or column,
+        i.e. whether a word of at least three letters passes through the cells.
+        """
+        letters: bytearray = self.state.letters
+        cols: int = self.state.cols
+        for index in cells:
+            col: int = index % cols
+            if 0 < col < cols - 1 and letters[index - 1] != BLACK_SQUARE and letters[index + 1] != BLACK_SQUARE:
+                return True
+            if cols <= index < len(letters) - cols and letters[index - cols] != BLACK_SQUARE and letters[index + cols] != BLACK_SQUARE:
+                return True
+        return False
+
+    def is_connected(self) -> bool:
+        """
+        Checks whether every white cell of the grid can be reached from the first one.
+        """
+        letters: bytearray = self.state.letters
+        white_count: int = len(letters) - self.state.blocks.count(1)
+        first: int = self.state.blocks.find(0)
+        if first == -1:
+            return False
+        mark: int = self.start_search()
+        visited: bytearray = self.visited
+        visited[first] = mark
+        cells_to_search: List[int] = [first]
+        head: int = 0
+        while head < len(cells_to_search):
+            for neighbour in self.get_white_neighbours(cells_to_search[head]):
+                if visited[neighbour] != mark:
+                    visited[neighbour] = mark
+                    cells_to_search.append(neighbour)
+            head += 1
+        return len(cells_to_search) == white_count
@@ -1,10 +1,106 @@
-from grid import Grid
+import argparse
+from typing import List, Optional
+from batch import generate_batch
+from grid import DEFAULT_MAX_SLOT_LENGTH, Grid, get_longest_line_length, parse_grid_size
+from grid_import import fill_template, load_template
+from instrumentation import TraceRecorder
+from pattern_library import PatternLibrary
+from portfolio import create_default_portfolio, generate_portfolio_puzzle
+from puzzle_store import PuzzleStore
+from regions import create_region_solver
+from word_list import get_shared_word_list
 """Main entry point of the app"""
 
-def main():
-    grid = Grid()
-    print("Initialize Crossword")
+def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description = "Generate crossword grids.")
+    parser.add_argument("--size", type = parse_grid_size, default = 15, help = "number of rows and columns in the grid, or ROWSxCOLS")
+    parser.add_argument("--batch", type = int, default = 0, help = "generate this many puzzles across a process pool")
+    parser.add_argument("--store", default = None, metavar = "PATH", help = "append the puzzles of a batch to this puzzle store")
+    parser.add_argument("--workers", type = int, default = None, help = "number of worker processes (defaults to the CPU count)")
+    parser.add_argument("--portfolio", type = int, default = 0, help = "race this many differently seeded fills of one pattern")
+    parser.add_argument("--timeout", type = float, default = None, help = "seconds to wait for a portfolio fill")
+    parser.add_argument("--seed", type = int, default = None, help = "seed of the grid, or of the first puzzle in a batch or portfolio")
+    parser.add_argument("--word-list", default = "words_alpha.txt", help = "path of the word list")
+    parser.add_argument("--progress", type = int, default = None, metavar = "N", help = "render the grid every N word placements")
+    parser.add_argument("--pattern-library", default = None, metavar = "PATH", help = "sample known-good patterns from this library and record fills in it")
+    parser.add_argument("--trace", default = None, metavar = "PATH", help = "write sampled trace events to this file as Chrome trace JSON")
+    parser.add_argument("--stats", action = "store_true", help = "print the search counters after generating")
+    parser.add_argument("--min-score", type = int, default = None, help = "only use words with at least this score (word lists with word;score lines)")
+    parser.add_argument("--import", dest = "template", default = None, metavar = "PATH", help = "fill the empty cells of a partially filled grid, in text or JSON format")
+    parser.add_argument("--lookahead", type = int, default = 0, metavar = "N", help = "rank candidates in windows of N by score and the domains left to their crossing words")
+    parser.add_argument("--fills", type = int, default = 0, metavar = "N", help = "print up to N more distinct fills of the generated pattern")
+    parser.add_argument("--unique-entries", action = "store_true", help = "never repeat a word across the fills printed by --fills")
+    parser.add_argument("--numpy-patterns", action = "store_true", help = "generate patterns with the NumPy generator, which gives different grids for the same seed")
+    parser.add_argument("--region-workers", type = int, default = 0, metavar = "N", help = "fill large independent regions of the grid in N worker processes")
+    return parser.parse_args(args)
+
+def display_progress(grid: Grid, event: str) -> None:
+    """
+    Renders each generated pattern, and the partially filled grid on each progress event.
+    """
+    if event in ("pattern", "progress"):
+        print()
+        grid.display_grid()
+
+def main(args: Optional[List[str]] = None):
+    options: argparse.Namespace = parse_args(args)
+    if options.batch:
+        store = PuzzleStore(options.store) if options.store else None
+        try:
+            for puzzle in generate_batch(options.batch, options.size, options.workers, options.seed, options.word_list):
+                print(f"Seed {puzzle.seed} ({puzzle.elapsed:.2f}s)")
+                print(puzzle)
+                print()
+                if store is not None:
+                    store.append(puzzle)
+        finally:
+            if store is not None:
+                store.close()
+        return
+    if options.portfolio:
+        entries = create_default_portfolio(options.portfolio, options.seed)
+        result = generate_portfolio_puzzle(options.size, entries, options.timeout, options.word_list, options.seed)
+        if result.puzzle is None:
+            print(f"No fill found ({result.elapsed:.2f}s)")
+        else:
+            print(f"Won by {result.winner.slot_strategy} with seed {result.winner.seed} ({result.elapsed:.2f}s)")
+            print(result.puzzle)
+        return
+    template = load_template(options.template) if options.template else None
+    # An imported template may have longer words than a generated pattern
+    max_length: int = max(get_longest_line_length(template.rows), DEFAULT_MAX_SLOT_LENGTH) if template else DEFAULT_MAX_SLOT_LENGTH
+    word_list = get_shared_word_list(options.word_list, max_length = max_length, min_score = options.min_score)
+    region_solver = create_region_solver(options.region_workers) if options.region_workers else None
+    if template is not None:
+        try:
+            grid = fill_template(template, word_list = word_list, seed = options.seed, candidate_lookahead = options.lookahead, region_solver = region_solver)
+        finally:
+            if region_solver is not None:
+                region_solver.shutdown()
+        print(f"Filled {options.template} ({grid.fill_result.status.value}, {grid.fill_result.elapsed:.2f}s)")
+        grid.display_grid()
+        return
+    library = PatternLibrary(options.pattern_library) if options.pattern_library else None
+    tracer = TraceRecorder() if options.trace else None
+    try:
+        grid = Grid(options.size, word_list = word_list, seed = options.seed, observer = display_progress, progress_interval = options.progress, pattern_library = library, tracer = tracer, candidate_lookahead = options.lookahead, region_solver = region_solver, vectorised_patterns = options.numpy_patterns)
+    finally:
+        # The trace is most useful when generation fails, so it is written either way
+        if tracer is not None:
+            tracer.save(options.trace)
+        if region_solver is not None:
+            region_solver.shutdown()
+    if library is not None:
+        library.save()
+    print(f"Initialize Crossword (seed {grid.seed}{', --numpy-patterns' if options.numpy_patterns else ''})")
     grid.display_grid()
+    if options.fills:
+        for index, puzzle in enumerate(grid.iterate_fills(options.fills, options.unique_entries, skip_current_fill = True), 1):
+            print(f"Fill {index} ({puzzle.elapsed:.3f}s)")
+            print(puzzle)
+    if options.stats:
+        for name, value in grid.counters.to_dict().items():
+            print(f"{name}: {value}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,632 @@
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from enum import Enum
+import time
+from typing import TYPE_CHECKING, Callable, Collection, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from instrumentation import SearchCounters, TraceRecorder
+from word import Word
+
+if TYPE_CHECKING:
+    from grid import Grid
+    from regions import ParallelRegionSolver
+
+MAX_NOGOOD_SIZE: int = 8
+MAX_NOGOODS_PER_PATTERN: int = 100000
+MAX_NOGOOD_PATTERNS: int = 256
+MAX_REGION_SOLUTIONS: int = 4096
+MAX_UNFILLABLE_REGIONS: int = 4096
+
+# A word placement, identified by the slot id of the word and the string placed in it
+Assignment = Tuple[int, str]
+
+class FillStatus(Enum):
+    SUCCESS = "success"
+    BUDGET_EXHAUSTED = "budget_exhausted"
+    UNSATISFIABLE = "unsatisfiable"
+
+@dataclass
+class FillBudget:
+    max_nodes: Optional[int] = None # Maximum number of word placements
+    max_backtracks: Optional[int] = None # Maximum number of words whose candidates are exhausted
+    time_limit: Optional[float] = None # Maximum number of seconds spent searching
+
+@dataclass
+class FillResult:
+    status: FillStatus
+    nodes: int # Number of word placements tried
+    backtracks: int # Number of words whose candidates were exhausted
+    elapsed: float # Seconds spent searching
+    backjumps: int = 0 # Number of backtracks that skipped over at least one word
+    nogoods: int = 0 # Number of nogoods known for the pattern
+
+    @property
+    def succeeded(self) -> bool:
+        return self.status is FillStatus.SUCCESS
+
+@dataclass
+class RegionFill:
+    regions: List[List[int]] # Slot ids of each region, in the order they are filled
+    filled: int = 0 # Number of regions filled so far
+    placed_slot_ids: List[int] = field(default_factory = list) # Slots filled so far, in placement order
+    engine: Optional["FillEngine"] = None # Engine of the region being filled, kept while the budget has paused it
+    futures: Dict[int, Future] = field(default_factory = dict) # Fills started by the grid's region solver, by region index
+    submitted: bool = False # Whether the large regions have been given to the grid's region solver
+
+@dataclass
+class FillFrame:
+    word: Word # The word being populated at this depth of the search
+    candidates: Iterator[str] # The candidates that haven't been tried yet
+    conflicts: Set[Word] = field(default_factory = set) # Earlier words responsible for rejecting candidates
+    region_fill: Optional["RegionFill"] = None # The regions that split off once the word was placed
+
+class NogoodStore:
+
+    def __init__(self) -> None:
+        """
+        Initialises an empty store of nogoods: sets of word placements that are known to leave the
+        rest of a pattern unfillable.
+        """
+        self.nogoods: Dict[Assignment, List[FrozenSet[Assignment]]] = {}
+        self.count: int = 0
+        self.unsatisfiable: bool = False # True once the pattern is known to be unfillable
+
+    def add(self, nogood: FrozenSet[Assignment]) -> None:
+        """
+        Records a nogood, indexed by each of its placements. An empty nogood means that the pattern
+        can't be filled at all. Nogoods larger than MAX_NOGOOD_SIZE rarely match again and aren't kept.
+        """
+        if not nogood:
+            self.unsatisfiable = True
+            return
+        if len(nogood) > MAX_NOGOOD_SIZE or self.count >= MAX_NOGOODS_PER_PATTERN:
+            return
+        for assignment in nogood:
+            self.nogoods.setdefault(assignment, []).append(nogood)
+        self.count += 1
+
+    def find_violated(self, assignment: Assignment, is_assigned: Callable[[Assignment], bool]) -> Optional[FrozenSet[Assignment]]:
+        """
+        Finds a nogood that would be completed by the given placement.
+
+        Args:
+            is_assigned (Callable[[Assignment], bool]): Checks whether a placement is currently in the grid.
+
+        Returns:
+            Optional[FrozenSet[Assignment]]: The violated nogood, or None if the placement is allowed.
+        """
+        for nogood in self.nogoods.get(assignment, ()):
+            if all(other == assignment or is_assigned(other) for other in nogood):
+                return nogood
+        return None
+
+# Nogoods shared by every fill of the same pattern, most recently used last
+nogood_stores: "OrderedDict[str, NogoodStore]" = OrderedDict()
+
+def get_nogood_store(pattern_key: str) -> NogoodStore:
+    """
+    Retrieves the nogood store of a pattern, creating it if needed, so that nogoods learned while filling
+    a pattern persist when the same pattern is filled again. Only the MAX_NOGOOD_PATTERNS most recently
+    used patterns are kept.
+    """
+    if pattern_key in nogood_stores:
+        nogood_stores.move_to_end(pattern_key)
+    else:
+        nogood_stores[pattern_key] = NogoodStore()
+        if len(nogood_stores) > MAX_NOGOOD_PATTERNS:
+            nogood_stores.popitem(last = False)
+    return nogood_stores[pattern_key]
+
+# Keys of regions (see FillEngine.get_region_key) that can't be filled, most recently used last. Unlike a fill of
+# a region, which depends on the order the grid tries candidates in, this holds for every grid
+unfillable_regions: "OrderedDict[str, None]" = OrderedDict()
+
+def is_region_unfillable(region_key: str) -> bool:
+    if region_key not in unfillable_regions:
+        return False
+    unfillable_regions.move_to_end(region_key)
+    return True
+
+def add_unfillable_region(region_key: str) -> None:
+    """
+    Records that a region can't be filled, keeping only the MAX_UNFILLABLE_REGIONS most recently used regions.
+    """
+    unfillable_regions[region_key] = None
+    unfillable_regions.move_to_end(region_key)
+    if len(unfillable_regions) > MAX_UNFILLABLE_REGIONS:
+        unfillable_regions.popitem(last = False)
+
+class FillEngine:
+
+    def __init__(self, grid: "Grid", slot_strategy: Union[str, Callable[[], Optional[Word]]] = "most_constrained", budget: Optional[FillBudget] = None, on_progress: Optional[Callable[[], None]] = None, progress_interval: Optional[int] = None, slot_ids: Optional[Collection[int]] = None, pattern_key: Optional[str] = None, nogood_store: Optional[NogoodStore] = None, excluded_words: Optional[Set[str]] = None, decompose_regions: Optional[bool] = None, region_solutions: Optional["OrderedDict[str, Tuple[Assignment, ...]]"] = None) -> None:
+        """
+        Initialises the fill engine for a grid whose words have had their domains initialised.
+
+        Args:
+            slot_strategy (Union[str, Callable[[], Optional[Word]]]): The name of a strategy in grid.slot_strategies,
+                                                    or a callable returning the next unpopulated word.
+            budget (Optional[FillBudget]): The limits on the search. An unlimited search is used if None.
+            on_progress (Optional[Callable[[], None]]): Called after the first successful placement once every
+                                                    progress_interval placements.
+            slot_ids (Optional[Collection[int]]): The slots of the region to fill, which no unpopulated slot outside
+                                                    it may cross. Defaults to the whole grid.
+            pattern_key (Optional[str]): The pattern key of the grid when the fill of the whole grid started, which
+                                                    region keys are built on. Defaults to the current pattern key.
+            nogood_store (Optional[NogoodStore]): The store of learned nogoods. Defaults to the store shared by every
+                                                    fill of the pattern (or region), which must not be used by a
+                                                    search whose candidates are restricted further.
+            excluded_words (Optional[Set[str]]): Words that are never placed. The set may grow between runs.
+            decompose_regions (Optional[bool]): Whether independent regions are filled separately. Defaults to
+                                                    the grid's setting.
+            region_solutions (Optional[OrderedDict[str, Tuple[Assignment, ...]]]): The fills of regions found by
+                                                    the search, by region key. Defaults to a new cache, as a fill
+                                                    found by one grid isn't the fill that a grid with another seed
+                                                    would find. The engines of regions share their parent's cache.
+        """
+        self.grid: "Grid" = grid
+        self.slot_strategy: Union[str, Callable[[], Optional[Word]]] = slot_strategy
+        self.slot_ids: Optional[List[int]] = None if slot_ids is None else sorted(slot_ids)
+        region_words: Optional[List[Word]] = None if self.slot_ids is None else [grid.slot_graph.words[slot_id] for slot_id in self.slot_ids]
+        self.select_word: Callable[[], Optional[Word]] = grid.get_slot_selector(slot_strategy, region_words)
+        self.budget: FillBudget = budget or FillBudget()
+        self.on_progress: Optional[Callable[[], None]] = on_progress if progress_interval else None
+        self.progress_interval: int = progress_interval or 0
+        self.next_progress_node: int = self.progress_interval
+        # Regions can only be searched separately if the slot strategy can be limited to a region
+        self.decompose: bool = (grid.decompose_regions if decompose_regions is None else decompose_regions) and not callable(slot_strategy)
+        self.pattern_key: str = pattern_key or grid.get_pattern_key()
+        # The nogoods of a region only hold for the letters around it, which are part of its key
+        self.region_key: Optional[str] = None if self.slot_ids is None else self.get_region_key(self.slot_ids)
+        self.nogood_store: NogoodStore = nogood_store or get_nogood_store(self.region_key or self.pattern_key)
+        self.excluded_words: Optional[Set[str]] = excluded_words
+        self.region_solutions: "OrderedDict[str, Tuple[Assignment, ...]]" = OrderedDict() if region_solutions is None else region_solutions
+        self.stack: List[FillFrame] = []
+        self.depths: List[int] = [-1] * len(grid.slot_graph) # Index of the frame of each slot on the stack, or -1
+        self.started: bool = False
+        self.nodes: int = 0
+        self.backtracks: int = 0
+        self.backjumps: int = 0
+        self.elapsed: float = 0.0
+        self.region_fill: Optional[RegionFill] = None # The regions the words left to fill were split into when the search started
+        self.counters: SearchCounters = grid.counters
+        self.tracer: Optional[TraceRecorder] = grid.tracer
+        self.next_sample_node: int = self.tracer.sample_interval if self.tracer else 0
+
+    def run(self) -> FillResult:
+        """
+        Populates the grid with words using a backtracking search driven from an explicit stack rather
+        than recursion. Each frame on the stack holds a word and the candidates that haven't been tried
+        for it yet, so the depth of the search is only limited by memory.
+
+        The search uses conflict-directed backjumping: each frame records which earlier words caused its
+        candidates to be rejected, and when a word runs out of candidates the search jumps straight back
+        to the most recent of those words instead of the previous one. The placements of those words are
+        also learned as a nogood for the pattern, so they are never tried together again.
+
+        Whenever the unpopulated words split into regions that don't share any cell, each region is filled
+        on its own by another engine (see solve_regions), so backtracking in one region never undoes the
+        fill of another.
+
+        If the budget is exhausted, the stack is kept so that calling run again (e.g. after raising the
+        budget) resumes the search where it stopped.
+
+        Returns:
+            FillResult: Whether the grid was populated, the budget was exhausted, or it was proven that
+                            no valid population exists, along with the search counters.
+        """
+        start_time: float = time.perf_counter()
+        status: FillStatus = self.search(start_time)
+        self.elapsed += time.perf_counter() - start_time
+        return FillResult(status, self.nodes, self.backtracks, self.elapsed, self.backjumps, self.nogood_store.count)
+
+    def search(self, start_time: float) -> FillStatus:
+        """
+        Runs the backtracking loop until the grid is populated, the budget is exhausted or every
+        candidate has been tried.
+        """
+        if not self.started:
+            self.started = True
+            if self.nogood_store.unsatisfiable:
+                return FillStatus.UNSATISFIABLE
+            # The words of a region are joined already, but the words left to fill a grid may not be
+            if self.decompose and self.slot_ids is None:
+                regions: List[List[int]] = self.grid.slot_graph.find_regions(range(len(self.grid.slot_graph)))
+                if len(regions) > 1:
+                    self.region_fill = self.create_region_fill(regions)
+            if self.region_fill is None and not self.push_next_word():
+                return FillStatus.SUCCESS
+        if self.region_fill is not None:
+            return self.solve_regions(self.region_fill, None, start_time)
+        while self.stack:
+            if self.is_budget_exhausted(start_time):
+                return FillStatus.BUDGET_EXHAUSTED
+            frame: FillFrame = self.stack[-1]
+            if frame.region_fill is not None:
+                # Resume filling the regions that split off once the frame's word was placed
+                status: FillStatus = self.solve_regions(frame.region_fill, frame, start_time)
+                if status is not FillStatus.UNSATISFIABLE:
+                    return status
+                continue
+            if frame.word.populated:
+                self.erase(frame.word)
+            candidate: Optional[str] = next(frame.candidates, None)
+            if candidate is None:
+                self.backjump(frame)
+                continue
+            self.counters.candidates_tested += 1
+            if self.excluded_words and candidate in self.excluded_words:
+                continue
+            violated_nogood: Optional[FrozenSet[Assignment]] = self.nogood_store.find_violated(self.get_assignment(frame.word, candidate), self.is_assigned)
+            if violated_nogood is not None:
+                self.counters.nogood_rejections += 1
+                frame.conflicts.update(self.get_nogood_words(violated_nogood, frame.word))
+                continue
+            self.nodes += 1
+            self.counters.nodes += 1
+            emptied_word: Optional[Word] = self.place(frame.word, candidate)
+            if emptied_word is not None:
+                # The candidate is rejected because of the words that narrowed the emptied domain
+                self.counters.domain_wipeouts += 1
+                frame.conflicts.update(self.get_assigned_crossings(emptied_word, frame.word))
+                continue
+            if self.decompose:
+                split_regions: Optional[List[List[int]]] = self.find_split_regions(frame.word)
+                if split_regions is not None:
+                    frame.region_fill = self.create_region_fill(split_regions)
+                    status = self.solve_regions(frame.region_fill, frame, start_time)
+                    if status is not FillStatus.UNSATISFIABLE:
+                        return status
+                    continue
+            if self.tracer and self.nodes >= self.next_sample_node:
+                self.next_sample_node = self.nodes + self.tracer.sample_interval
+                self.tracer.counter("search", {"nodes": self.nodes, "backtracks": self.backtracks, "depth": len(self.stack)})
+            if self.on_progress and self.nodes >= self.next_progress_node:
+                self.next_progress_node = self.nodes + self.progress_interval
+                self.on_progress()
+            if not self.push_next_word():
+                return FillStatus.SUCCESS
+        return FillStatus.UNSATISFIABLE
+
+    def reject_fill(self) -> None:
+        """
+        Rejects the fill just found, so that the next run continues the search for another fill. The search
+        may only backtrack chronologically past the words of a fill, as the words between a word and its
+        conflicts may have other candidates that lead to other fills, so every word on the stack is made to
+        conflict with all the words below it.
+
+        If words are excluded, the words of the fill are expected to have been excluded, so every word of
+        the next fill must differ and the search goes straight back to the next candidate of the first word.
+        """
+        if self.excluded_words:
+            self.unwind_to(min(len(self.stack), 1))
+            return
+        for depth, frame in enumerate(self.stack):
+            frame.conflicts.update(earlier_frame.word for earlier_frame in self.stack[:depth])
+
+    def extend_budget(self, budget: FillBudget) -> None:
+        """
+        Allows the search the given budget on top of what it has used so far.
+        """
+        self.budget = FillBudget(
+            None if budget.max_nodes is None else self.nodes + budget.max_nodes,
+            None if budget.max_backtracks is None else self.backtracks + budget.max_backtracks,
+            None if budget.time_limit is None else self.elapsed + budget.time_limit
+        )
+
+    def backjump(self, frame: FillFrame) -> None:
+        """
+        Handles a word running out of candidates. The words responsible for rejecting its candidates, and
+        those that narrowed its own domain, are learned as a nogood. The search then jumps back to the most
+        recent of those words, which inherits the rest of them as its own conflicts. If no earlier word is
+        responsible, the pattern can't be filled and the stack is emptied.
+        """
+        self.backtracks += 1
+        self.counters.backtracks += 1
+        slot_id: int = frame.word.slot_id
+        self.counters.slot_backtracks[slot_id] = self.counters.slot_backtracks.get(slot_id, 0) + 1
+        conflicts: Set[Word] = frame.conflicts | set(self.get_assigned_crossings(frame.word, frame.word))
+        conflicts.discard(frame.word)
+        self.nogood_store.add(frozenset(self.get_assignment(word, word.word) for word in conflicts))
+        if not conflicts:
+            self.unwind_to(0)
+            return
+        target_depth: int = max(self.depths[word.slot_id] for word in conflicts)
+        if target_depth < len(self.stack) - 2:
+            self.backjumps += 1
+        if self.tracer and self.backtracks % self.tracer.sample_interval == 0:
+            self.tracer.instant("backjump", {"slot": slot_id, "from_depth": len(self.stack) - 1, "to_depth": target_depth, "backtracks": self.backtracks})
+        self.unwind_to(target_depth + 1)
+        target_frame: FillFrame = self.stack[target_depth]
+        conflicts.discard(target_frame.word)
+        target_frame.conflicts.update(conflicts)
+
+    def unwind_to(self, depth: int) -> None:
+        """
+        Pops frames off the stack until it has the given depth, erasing their words from the newest to
+        the oldest so that the domain trail is undone in order.
+        """
+        if depth == 0 and self.region_fill is not None:
+            self.undo_regions(self.region_fill)
+        while len(self.stack) > depth:
+            frame: FillFrame = self.stack.pop()
+            self.depths[frame.word.slot_id] = -1
+            if frame.region_fill is not None:
+                self.undo_regions(frame.region_fill)
+                frame.region_fill = None
+            if frame.word.populated:
+                self.erase(frame.word)
+
+    def get_assigned_crossings(self, word: Word, excluded_word: Optional[Word]) -> List[Word]:
+        """
+        Finds the words crossing the given word that were populated during this search (other than the
+        excluded word). These are the words that have narrowed its domain.
+        """
+        slot_words: Tuple[Word, ...] = self.grid.slot_graph.words
+        crossing_words: List[Word] = []
+        for crossing in self.grid.slot_graph.slots[word.slot_id].crossings:
+            crossing_word: Word = slot_words[crossing.partner]
+            if crossing_word is not excluded_word and self.depths[crossing.partner] >= 0 and crossing_word.populated:
+                crossing_words.append(crossing_word)
+        return crossing_words
+
+    def find_split_regions(self, word: Word) -> Optional[List[List[int]]]:
+        """
+        Checks whether placing a word has split the unpopulated words into separate regions. The unpopulated
+        words are joined before each placement, so they can only have split if the unpopulated words crossing
+        the placed word are no longer joined to each other.
+
+        Returns:
+            Optional[List[List[int]]]: The slot ids of each region, or None if the unpopulated words are still joined.
+        """
+        slot_words: Tuple[Word, ...] = self.grid.slot_graph.words
+        open_crossings: List[int] = [crossing.partner for crossing in self.grid.slot_graph.slots[word.slot_id].crossings if not slot_words[crossing.partner].populated]
+        if len(open_crossings) < 2 or self.grid.slot_graph.are_joined(open_crossings):
+            return None
+        return self.grid.slot_graph.find_regions(open_crossings)
+
+    def create_region_fill(self, regions: List[List[int]]) -> RegionFill:
+        """
+        Orders regions so that the most constrained one, which is the most likely to fail, is filled first.
+        """
+        slot_words: Tuple[Word, ...] = self.grid.slot_graph.words
+        return RegionFill(sorted(regions, key = lambda region: min(slot_words[slot_id].domain.bit_count() for slot_id in region)))
+
+    def get_region_key(self, slot_ids: Iterable[int]) -> str:
+        """
+        Describes a region by the pattern it is in, its slots and the letters currently in them, which are
+        the only things that decide whether and how it can be filled.
+        """
+        slot_ids = sorted(slot_ids)
+        letters: bytes = b"|".join(self.grid.get_slot_letters(slot_id) for slot_id in slot_ids).replace(b"\0", b".")
+        return f"{self.pattern_key}:{','.join(map(str, slot_ids))}:{letters.decode('ascii')}"
+
+    def get_region_budget(self, region_engine: Optional["FillEngine"], start_time: float, shares: int = 1) -> FillBudget:
+        """
+        Returns the part of the budget that hasn't been used yet, on top of what a region's engine (if any)
+        has already used, as the budget is checked against the engine's own counters.
+
+        Args:
+            shares (int): The number of regions filled at the same time, which split the nodes and backtracks left
+                                between them. Each may use all of the time left, as they run side by side.
+        """
+        nodes, backtracks, elapsed = (region_engine.nodes, region_engine.backtracks, region_engine.elapsed) if region_engine else (0, 0, 0.0)
+        remaining_time: Optional[float] = self.get_remaining_time(start_time)
+        return FillBudget(
+            None if self.budget.max_nodes is None else nodes + max(self.budget.max_nodes - self.nodes, 0) // shares,
+            None if self.budget.max_backtracks is None else backtracks + max(self.budget.max_backtracks - self.backtracks, 0) // shares,
+            None if remaining_time is None else elapsed + remaining_time
+        )
+
+    def get_remaining_time(self, start_time: float) -> Optional[float]:
+        """
+        Returns the number of seconds left in the budget, or None if it has no time limit.
+        """
+        if self.budget.time_limit is None:
+            return None
+        return max(self.budget.time_limit - (self.elapsed + time.perf_counter() - start_time), 0.0)
+
+    def solve_regions(self, region_fill: RegionFill, frame: Optional[FillFrame], start_time: float) -> FillStatus:
+        """
+        Fills regions of unpopulated words that don't share any cell, one at a time. Each region is filled by
+        its own engine with the rest of the budget, or taken from the cache of region fills, or filled in a
+        worker process by the grid's region solver if it is large enough. Regions sent to workers share out the
+        nodes and backtracks left, and their counters are charged to this search. A region that has been filled
+        stays filled while the others are searched, and the fill of every region is cached by its key for the
+        rest of the search, so a region is never searched twice for the same letters around it. Regions that
+        can't be filled are remembered by every later search too.
+
+        Args:
+            frame (Optional[FillFrame]): The frame whose placement split the regions off, or None if the regions
+                                                    were already separate when the search started.
+
+        Returns:
+            FillStatus: SUCCESS if every region was filled. UNSATISFIABLE if a region can't be filled, in which case
+                                the filled regions are erased again and the words around the failed region are
+                                added to the frame's conflicts. BUDGET_EXHAUSTED if the budget ran out, in which
+                                case the region fill is paused and resumed by the next run.
+        """
+        slot_words: Tuple[Word, ...] = self.grid.slot_graph.words
+        solver: Optional["ParallelRegionSolver"] = self.grid.region_solver
+        if solver is not None and not region_fill.submitted:
+            region_fill.submitted = True
+            submitted: List[int] = [index for index, region in enumerate(region_fill.regions) if solver.should_submit(region) and not self.find_region_solution(self.get_region_key(region))[0]]
+            budget: FillBudget = self.get_region_budget(None, start_time, max(len(submitted), 1))
+            for index in submitted:
+                region_fill.futures[index] = solver.submit(self.grid, region_fill.regions[index], budget, self.slot_strategy, index)
+        failed_region: Optional[List[int]] = None
+        while region_fill.filled < len(region_fill.regions):
+            index: int = region_fill.filled
+            region: List[int] = region_fill.regions[index]
+            region_engine: Optional[FillEngine] = region_fill.engine
+            region_key: str = region_engine.region_key if region_engine else self.get_region_key(region)
+            solved, solution = (False, None) if region_engine else self.find_region_solution(region_key)
+            if not solved:
+                if index in region_fill.futures:
+                    try:
+                        worker_result, solution = solver.collect(self.grid, region, region_fill.futures[index], self.get_remaining_time(start_time))
+                    except FutureTimeoutError:
+                        # The worker keeps going, and is waited for again once the search resumes
+                        return FillStatus.BUDGET_EXHAUSTED
+                    del region_fill.futures[index]
+                    self.nodes += worker_result.nodes
+                    self.backtracks += worker_result.backtracks
+                    self.backjumps += worker_result.backjumps
+                    self.counters.nodes += worker_result.nodes
+                    self.counters.backtracks += worker_result.backtracks
+                    status = worker_result.status
+                    if status is FillStatus.BUDGET_EXHAUSTED:
+                        # The worker's share of the budget ran out, so the region is filled by an engine of its own
+                        # with whatever is left
+                        continue
+                else:
+                    region_engine = region_engine or FillEngine(self.grid, self.slot_strategy, slot_ids = region, pattern_key = self.pattern_key, region_solutions = self.region_solutions)
+                    region_engine.budget = self.get_region_budget(region_engine, start_time)
+                    nodes, backtracks, backjumps = (region_engine.nodes, region_engine.backtracks, region_engine.backjumps)
+                    result: FillResult = region_engine.run()
+                    self.nodes += result.nodes - nodes
+                    self.backtracks += result.backtracks - backtracks
+                    self.backjumps += result.backjumps - backjumps
+                    status = result.status
+                    if status is FillStatus.BUDGET_EXHAUSTED:
+                        region_fill.engine = region_engine
+                        return status
+                    region_fill.engine = None
+                    if status is FillStatus.SUCCESS:
+                        # The region engine has placed the words already
+                        self.store_region_solution(region_key, tuple(self.get_assignment(slot_words[slot_id], slot_words[slot_id].word) for slot_id in region))
+                        region_fill.placed_slot_ids.extend(region_engine.get_placed_slot_ids())
+                        region_fill.filled += 1
+                        continue
+                self.store_region_solution(region_key, solution if status is FillStatus.SUCCESS else None)
+            if solution is None:
+                failed_region = region
+                break
+            for slot_id, candidate in solution:
+                self.grid.place_slot(slot_id, candidate)
+                region_fill.placed_slot_ids.append(slot_id)
+            region_fill.filled += 1
+        if failed_region is None:
+            return FillStatus.SUCCESS
+        self.undo_regions(region_fill)
+        # The region can't be filled because of the letters of the words around it
+        if frame is not None:
+            frame.region_fill = None
+            frame.conflicts.update(word for slot_id in failed_region for word in self.get_assigned_crossings(slot_words[slot_id], frame.word))
+        else:
+            self.region_fill = None
+            self.nogood_store.add(frozenset())
+        return FillStatus.UNSATISFIABLE
+
+    def find_region_solution(self, region_key: str) -> Tuple[bool, Optional[Tuple[Assignment, ...]]]:
+        """
+        Looks up the cached fill of a region.
+
+        Returns:
+            Tuple[bool, Optional[Tuple[Assignment, ...]]]: Whether the region has been solved before, and its
+                                                    placements (None if it can't be filled).
+        """
+        if is_region_unfillable(region_key):
+            return True, None
+        if region_key not in self.region_solutions:
+            return False, None
+        self.region_solutions.move_to_end(region_key)
+        return True, self.region_solutions[region_key]
+
+    def store_region_solution(self, region_key: str, solution: Optional[Tuple[Assignment, ...]]) -> None:
+        """
+        Caches the fill of a region for this search, keeping only the MAX_REGION_SOLUTIONS most recently used
+        regions, or records that it can't be filled for every search.
+        """
+        if solution is None:
+            add_unfillable_region(region_key)
+            return
+        self.region_solutions[region_key] = solution
+        self.region_solutions.move_to_end(region_key)
+        if len(self.region_solutions) > MAX_REGION_SOLUTIONS:
+            self.region_solutions.popitem(last = False)
+
+    def undo_regions(self, region_fill: RegionFill) -> None:
+        """
+        Erases the regions filled so far by a region fill, including the words placed by a paused region
+        engine, in the reverse order they were placed.
+        """
+        for future in region_fill.futures.values():
+            future.cancel()
+        region_fill.futures.clear()
+        if region_fill.engine is not None:
+            region_fill.engine.unwind_to(0)
+            region_fill.engine = None
+        for slot_id in reversed(region_fill.placed_slot_ids):
+            self.grid.erase_slot(slot_id)
+        region_fill.placed_slot_ids.clear()
+        region_fill.filled = 0
+
+    def get_placed_slot_ids(self) -> List[int]:
+        """
+        Returns the slots filled by a successful search in the order they were placed, which is the reverse
+        of the order they must be erased in.
+        """
+        region_fill: Optional[RegionFill] = self.stack[-1].region_fill if self.stack else self.region_fill
+        return [frame.word.slot_id for frame in self.stack] + (region_fill.placed_slot_ids if region_fill else [])
+
+    def get_assignment(self, word: Word, candidate: str) -> Assignment:
+        return (word.slot_id, candidate)
+
+    def is_assigned(self, assignment: Assignment) -> bool:
+        """
+        Checks whether the placement is currently in the grid.
+        """
+        slot_id, candidate = assignment
+        word: Word = self.grid.slot_graph.words[slot_id]
+        return word.populated and word.word == candidate
+
+    def get_nogood_words(self, nogood: Iterable[Assignment], excluded_word: Word) -> List[Word]:
+        """
+        Finds the words of a nogood's placements, other than the excluded word.
+        """
+        words: List[Word] = [self.grid.slot_graph.words[slot_id] for slot_id, _ in nogood]
+        return [word for word in words if word is not excluded_word]
+
+    def push_next_word(self) -> bool:
+        """
+        Selects the next word to populate and pushes a frame for it onto the stack.
+
+        Returns:
+            bool: False if every word is already populated, otherwise True.
+        """
+        word: Optional[Word] = self.select_word()
+        if word is None:
+            return False
+        self.depths[word.slot_id] = len(self.stack)
+        self.stack.append(FillFrame(word, self.grid.iterate_candidates(word)))
+        return True
+
+    def place(self, word: Word, candidate: str) -> Optional[Word]:
+        """
+        Places a candidate into a word and narrows the domains of the words crossing it.
+
+        Returns:
+            Optional[Word]: The crossing word whose domain has become empty, or None if every crossing
+                                word can still be populated.
+        """
+        self.grid.place_slot(word.slot_id, candidate)
+        emptied_slot_id: Optional[int] = self.grid.narrow_crossings(word.slot_id)
+        return None if emptied_slot_id is None else self.grid.slot_graph.words[emptied_slot_id]
+
+    def erase(self, word: Word) -> None:
+        """
+        Erases a word and restores the domains of the words crossing it.
+        """
+        self.grid.erase_slot(word.slot_id)
+
+    def is_budget_exhausted(self, start_time: float) -> bool:
+        """
+        Checks whether any of the limits of the budget have been reached.
+        """
+        if self.budget.max_nodes is not None and self.nodes >= self.budget.max_nodes:
+            return True
+        if self.budget.max_backtracks is not None and self.backtracks >= self.budget.max_backtracks:
+            return True
+        if self.budget.time_limit is not None:
+            return self.elapsed + time.perf_counter() - start_time >= self.budget.time_limit
+        return False
@@ -1,9 +1,67 @@
+from contextlib import nullcontext
 from dataclasses import dataclass
+from itertools import islice
+import math
 import random
-from typing import Callable, Dict, List, Optional, Tuple
-from cell import Cell
+from typing import TYPE_CHECKING, Callable, Collection, ContextManager, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+from connectivity import WhiteCellConnectivity
+from fill_engine import FillBudget, FillEngine, FillResult, NogoodStore
+from grid_state import BLACK_SQUARE, GridState
+from instrumentation import SearchCounters, TraceRecorder
+from pattern_generator import PatternGenerator
+from puzzle import Puzzle
+from slot_graph import Slot, SlotGraph
 from word import Word
-from word_list import WordList
+from word_list import WordList, get_shared_word_list
+
+if TYPE_CHECKING:
+    from grid_import import LockedWord
+    from pattern_library import PatternLibrary
+    from regions import ParallelRegionSolver
+
+DEFAULT_MAX_BACKTRACKS: int = 5000
+DEFAULT_MAX_PATTERN_ATTEMPTS: int = 50
+# Longer lines are divided into several words, as longer words are too scarce to fill a grid with
+DEFAULT_MAX_SLOT_LENGTH: int = 15
+# Candidates are ranked by lookahead in windows of this many, taken in score order
+DEFAULT_CANDIDATE_LOOKAHEAD: int = 0
+# Score points that a candidate gains each time it doubles the average domain size of the words it crosses
+DEFAULT_LOOKAHEAD_WEIGHT: float = 5.0
+
+# The number of rows and columns of a square grid, or the number of rows and the number of columns
+GridSize = Union[int, Tuple[int, int]]
+
+def parse_grid_size(text: str) -> GridSize:
+    """
+    Parses a grid size given as "15" for a square grid or as "21x41" for rows by columns.
+
+    Raises:
+        ValueError: If the text isn't a number or two numbers separated by "x".
+    """
+    if "x" in text.lower():
+        rows, cols = text.lower().split("x")
+        return (int(rows), int(cols))
+    return int(text)
+
+def check_generated_grid_size(grid_size: GridSize) -> None:
+    """
+    Checks that a pattern can be generated for a grid of the given size, as generated patterns are
+    rotationally symmetrical about the middle cell.
+
+    Raises:
+        ValueError: If the grid has an even number of rows or columns.
+    """
+    rows, cols = grid_size if isinstance(grid_size, tuple) else (grid_size, grid_size)
+    if rows % 2 == 0 or cols % 2 == 0:
+        raise ValueError(f"Generated grids need an odd number of rows and columns, not {rows} x {cols}")
+
+def get_longest_line_length(pattern: List[str]) -> int:
+    """
+    Finds the longest run of white cells in the rows and columns of a pattern, which is the longest word
+    it can have.
+    """
+    lines: List[str] = pattern + ["".join(column) for column in zip(*pattern)]
+    return max((len(run) for line in lines for run in line.split("#")), default = 0)
 
 class Grid:
     @dataclass
@@ -12,40 +70,324 @@ class Grid:
         first_space: int
         last_space: int
 
-    def __init__(self, grid_size: int = 15) -> None:
+    def __init__(self, grid_size: GridSize = 15, slot_strategy: str = "most_constrained", fill_budget: Optional[FillBudget] = None, max_pattern_attempts: Optional[int] = DEFAULT_MAX_PATTERN_ATTEMPTS, word_list: Optional[WordList] = None, pattern: Optional[List[str]] = None, fill: bool = True, seed: Optional[int] = None, rng: Optional[random.Random] = None, observer: Optional[Callable[["Grid", str], None]] = None, progress_interval: Optional[int] = None, vectorised_patterns: bool = False, pattern_library: Optional["PatternLibrary"] = None, max_slot_length: int = DEFAULT_MAX_SLOT_LENGTH, tracer: Optional[TraceRecorder] = None, candidate_lookahead: int = DEFAULT_CANDIDATE_LOOKAHEAD, lookahead_weight: float = DEFAULT_LOOKAHEAD_WEIGHT, locked_words: Optional[List["LockedWord"]] = None, decompose_regions: bool = True, region_solver: Optional["ParallelRegionSolver"] = None) -> None:
         """
         Initialises the grid with the given size.
-        """
-        self.rows: int = grid_size
-        self.cols: int = grid_size
+        If a pattern is given, it is used instead of generating black square patterns and is only filled once,
+        so the outcome is left in self.fill_result rather than raising an error.
+
+        Args:
+            grid_size (GridSize): The number of rows and columns of a square grid, or a tuple of
+                                    the number of rows and the number of columns of a rectangular grid.
+            slot_strategy (str): The name of the strategy used to pick the next word to populate
+                                    ("most_constrained" or the legacy "alternating").
+            fill_budget (Optional[FillBudget]): The limits on the word fill for each black square pattern, after
+                                    which a new pattern is generated. Defaults to DEFAULT_MAX_BACKTRACKS backtracks.
+            max_pattern_attempts (Optional[int]): The number of black square patterns to try filling before giving
+                                    up, or None to keep trying indefinitely.
+            word_list (Optional[WordList]): The word list to fill the grid from. Defaults to the process-wide
+                                    shared word list for "words_alpha.txt", with the word lengths the grid can have.
+            pattern (Optional[List[str]]): The black square pattern to fill, as one string per row with "#" for
+                                    black squares, letters for white cells that are already filled, and any other
+                                    character for empty white cells. Only the empty cells are filled.
+            fill (bool): Whether to fill the pattern with words. If False, the grid only has a pattern, with
+                                    the domains of its words ready to be filled.
+            seed (Optional[int]): The seed for every random decision made by the grid. A random seed is chosen
+                                    and recorded in self.seed if None, so that any run can be replayed.
+            rng (Optional[random.Random]): A random number generator to use instead of one seeded with seed.
+            observer (Optional[Callable[[Grid, str], None]]): Called with the grid and an event: "pattern" when a
+                                    connected pattern has been generated, "progress" every progress_interval word
+                                    placements, and "filled" when the grid has been filled. The grid does no
+                                    terminal I/O itself, so rendering is left to the observer.
+            progress_interval (Optional[int]): The number of word placements between "progress" events, or None
+                                    for no progress events.
+            vectorised_patterns (bool): Whether to generate black square patterns with the NumPy PatternGenerator
+                                    rather than cell by cell. The two generators give different patterns for the
+                                    same seed, so this is never chosen by whether NumPy is installed, and a seed
+                                    gives the same grid on every machine.
+            pattern_library (Optional[PatternLibrary]): A library to sample known-good patterns from before generating
+                                    new ones. The outcome of every fill is recorded in it, but not saved.
+            max_slot_length (int): The longest word that generated patterns may have. Lines longer than this, in
+                                    grids larger than 15 x 15, are always divided into several words.
+            tracer (Optional[TraceRecorder]): Records a span for every pattern and fill, and samples the state of
+                                    each fill, as trace events. Search counters are kept in self.counters either way.
+            candidate_lookahead (int): The number of candidates, taken in word list score order, that are ranked
+                                    together by their score plus a lookahead at the domains of the words they cross.
+                                    0 or 1 tries candidates in score order alone.
+            lookahead_weight (float): The score points a candidate gains each time it doubles the average domain size
+                                    of the words it crosses.
+            locked_words (Optional[List[LockedWord]]): Entries to write into the given pattern before it is filled.
+                                    Locked words, and any other word whose cells are all filled, are kept as they
+                                    are even if they aren't in the word list.
+            decompose_regions (bool): Whether the fill splits the unpopulated words into independent regions once
+                                    they no longer share any cell, and fills each region on its own.
+            region_solver (Optional[ParallelRegionSolver]): Fills large independent regions in worker processes
+                                    instead of one after another.
+
+        Raises:
+            RuntimeError: If none of the attempted patterns could be filled with words.
+            ValueError: If a pattern has to be generated and the grid has an even number of rows or columns, as
+                                    generated patterns are rotationally symmetrical about the middle cell, if the
+                                    given pattern has a word longer than the word list's max_length, or if a locked
+                                    word doesn't fit the given pattern, or if region_solver is given and a word filter
+                                    of the word list can't be sent to its workers.
+            ImportError: If vectorised_patterns is True and NumPy isn't installed.
+        """
+        self.rows, self.cols = grid_size if isinstance(grid_size, tuple) else (grid_size, grid_size)
+        if pattern is None:
+            check_generated_grid_size(grid_size)
+        self.max_slot_length: int = max_slot_length
+        if rng is None and seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed: Optional[int] = seed
+        self.rng: random.Random = rng or random.Random(seed)
+        self.slot_strategies: Dict[str, Callable[[], Optional[Word]]] = {
+            "most_constrained": self.select_most_constrained_word,
+            "alternating": self.select_alternating_word
+        }
+        self.slot_strategy: str = slot_strategy
+        self.candidate_lookahead: int = candidate_lookahead
+        self.lookahead_weight: float = lookahead_weight
+        self.decompose_regions: bool = decompose_regions
+        self.region_solver: Optional["ParallelRegionSolver"] = region_solver
+        self.fill_budget: FillBudget = fill_budget or FillBudget(max_backtracks = DEFAULT_MAX_BACKTRACKS)
+        self.pattern_attempts: int = 0
+        self.observer: Optional[Callable[["Grid", str], None]] = observer
+        self.progress_interval: Optional[int] = progress_interval
+        self.counters: SearchCounters = SearchCounters()
+        self.tracer: Optional[TraceRecorder] = tracer
+        self.fill_engine: Optional[FillEngine] = None
 
-        self.wordlists: Dict[int, List[str]] = self.load_word_lists()
+        self.word_list: WordList = word_list or get_shared_word_list(max_length = max(self.get_longest_word_length(pattern), DEFAULT_MAX_SLOT_LENGTH))
+        if region_solver is not None:
+            region_solver.check_word_list(self.word_list)
+        self.max_slot_length = min(self.max_slot_length, self.word_list.max_length)
+        self.wordlists: Dict[int, Sequence[str]] = self.load_word_lists()
+        self.candidate_offsets: Dict[int, int] = self.choose_candidate_offsets()
+        self.pattern_library: Optional["PatternLibrary"] = pattern_library
+        self.pattern_generator: Optional[PatternGenerator] = None
+        if vectorised_patterns:
+            self.pattern_generator = PatternGenerator(self.rows, self.cols, self.rng, self.max_slot_length)
 
+        if pattern is not None:
+            self.pattern_attempts = 1
+            self.counters.pattern_attempts = 1
+            self.load_pattern(pattern)
+            longest_slot: int = max((slot.length for slot in self.slot_graph.slots), default = 0)
+            if longest_slot > self.word_list.max_length:
+                raise ValueError(f"The pattern has a {longest_slot} letter word, but the word list only has words of up to {self.word_list.max_length} letters")
+            self.lock_words(locked_words or [])
+            self.initialize_domains()
+            if fill:
+                self.populated_with_words(self.slot_strategy)
+                self.record_pattern_fill()
+            return
         while True:
+            if max_pattern_attempts is not None and self.pattern_attempts >= max_pattern_attempts:
+                raise RuntimeError(f"Unable to fill a grid after {self.pattern_attempts} black square patterns (seed {self.seed})")
+            self.pattern_attempts += 1
+            self.counters.pattern_attempts += 1
+            self.create_black_square_pattern()
+            self.initialize_domains()
+            if not fill:
+                break
+            filled: bool = self.populated_with_words(self.slot_strategy)
+            self.record_pattern_fill()
+            # Both an unfillable pattern and an exhausted budget move on to a new pattern
+            if filled:
+                break
+
+    def get_longest_word_length(self, pattern: Optional[List[str]] = None) -> int:
+        """
+        Finds the longest word that the grid can have, which is the longest line of the given pattern, or the
+        longest line of a generated pattern.
+        """
+        if pattern is not None:
+            return get_longest_line_length(pattern)
+        return min(max(self.rows, self.cols), self.max_slot_length)
+
+    def create_empty_grid(self) -> None:
+        """
+        Creates a grid of blank cells with no words.
+        """
+        self._grid: GridState = GridState(self.rows, self.cols)
+        self.words: Dict[str, Dict[int, Word]] = {
+            "across": {},
+            "down": {}
+        }
+
+    def create_black_square_pattern(self) -> None:
+        """
+        Generates random black square patterns until one is found in which all lines are connected,
+        and numbers its words. If the grid has a pattern library, a known-good pattern is sampled from
+        it instead, as long as it has one of the right size.
+        """
+        with self.trace("pattern") as trace_args:
+            if self.pattern_library is not None:
+                pattern: Optional[List[str]] = self.pattern_library.sample(self.rows, self.cols, self.rng)
+                if pattern is not None:
+                    trace_args["source"] = "library"
+                    self.load_pattern(pattern)
+                    self.notify("pattern")
+                    return
+            if self.pattern_generator is not None:
+                trace_args["source"] = "numpy"
+                rejections: int = self.pattern_generator.rejections
+                self.load_pattern(self.pattern_generator.generate_pattern())
+                self.counters.patterns_rejected += self.pattern_generator.rejections - rejections
+                self.notify("pattern")
+                return
+            trace_args["source"] = "legacy"
             while True:
-                self._grid: List[List[Cell]] = [[Cell() for _ in range(self.cols)] for _ in range(self.rows)]
-                self.words: Dict[str, Dict[int, Word]] = {
-                    "across": {},
-                    "down": {}
-                }
+                self.create_empty_grid()
                 self.generate_black_square_pattern()
-                self.display_grid()
-                self.populate_grid()
+                # Patterns are rejected as soon as a dividing square splits the white cells
+                if not self.populate_grid():
+                    self.counters.patterns_rejected += 1
+                    continue
                 self.assign_numbering()
                 self.remove_extra_cells()
                 if self.are_lines_connected():
-                    self.display_grid()
+                    self.notify("pattern")
                     break
-            iterable_keys: Dict[str, List[int]] = {
-                "across": list(self.words["across"].keys()),
-                "down": list(self.words["down"].keys())
-            }
-            if self.populated_with_words(iterable_keys):
-                break
+                self.counters.patterns_rejected += 1
+
+    def trace(self, name: str) -> ContextManager[Dict]:
+        """
+        Records a block as a span of the trace, if the grid has a tracer. The yielded dict holds the span's
+        arguments, and can be written to even when there is no tracer.
+        """
+        return self.tracer.span(name) if self.tracer else nullcontext({})
+
+    def record_pattern_fill(self) -> None:
+        """
+        Records the outcome of the last fill of the current pattern in the pattern library, if there is one.
+        """
+        if self.pattern_library is not None:
+            self.pattern_library.record_fill(self.get_pattern(), self.fill_result.succeeded, self.fill_result.elapsed)
+
+    def notify(self, event: str) -> None:
+        """
+        Passes an event to the observer, if there is one.
+        """
+        if self.observer:
+            self.observer(self, event)
+
+    def load_pattern(self, pattern: List[str]) -> None:
+        """
+        Replaces the grid with the given black square pattern and numbers its words.
+
+        Args:
+            pattern (List[str]): One string per row, with "#" for black squares, letters for filled white
+                                    cells and any other character for empty white cells.
+        """
+        self.rows = len(pattern)
+        self.cols = len(pattern[0]) if pattern else 0
+        self.create_empty_grid()
+        for row, line in enumerate(pattern):
+            for col, character in enumerate(line):
+                if character == "#" or character.isalpha():
+                    self._grid[row][col].letter = character
+        self.assign_numbering()
+        self.remove_extra_cells()
+
+    def lock_words(self, locked_words: List["LockedWord"]) -> None:
+        """
+        Writes locked words into the numbered grid, then marks every word whose cells are all filled as
+        populated, so that the fill engine only searches the words that still have empty cells.
+
+        Raises:
+            ValueError: If a locked word doesn't exactly cover a word of the pattern, or clashes with a letter
+                                    already in the grid.
+        """
+        for locked_word in locked_words:
+            row, col = (locked_word.row, locked_word.col)
+            number: Optional[int] = self._grid.numbering[row * self.cols + col] if 0 <= row < self.rows and 0 <= col < self.cols else None
+            if not number or number not in self.words[locked_word.direction]:
+                raise ValueError(f"No {locked_word.direction} word starts at row {row}, column {col}")
+            slot_id: int = self.slot_graph.get_slot_id(locked_word.direction, number)
+            slot: Slot = self.slot_graph.slots[slot_id]
+            if len(locked_word.word) != slot.length:
+                raise ValueError(f"{locked_word.word!r} doesn't fit the {slot.length} letter word {number} {locked_word.direction}")
+            for cell, letter in zip(slot.cells, locked_word.word):
+                if self._grid.letters[cell] not in (0, ord(letter)):
+                    raise ValueError(f"{locked_word.word!r} clashes with the letter {chr(self._grid.letters[cell])!r} in word {number} {locked_word.direction}")
+                self._grid.letters[cell] = ord(letter)
+        for slot in self.slot_graph.slots:
+            letters: bytes = self.get_slot_letters(slot.id)
+            if 0 not in letters:
+                word: Word = self.slot_graph.words[slot.id]
+                word.word = letters.decode("ascii")
+                word.populated = True
+
+    def get_pattern(self) -> List[str]:
+        """
+        Returns the black square pattern, as one string per row with "#" for black squares and "." for
+        white cells.
+        """
+        return ["".join("#" if cell.letter == "#" else "." for cell in row) for row in self._grid]
 
     def load_word_lists(self):
-        word_list: WordList = WordList()
-        return word_list.create_word_lists()
+        # Reuse the lists the WordList was built from, as its positional index refers to their order
+        return self.word_list.word_lists
+
+    def choose_candidate_offsets(self) -> Dict[int, int]:
+        """
+        Picks a random word id for each word length that candidates are tried from, so that grids
+        sharing the same wordlist order are still filled with different words.
+        """
+        return {length: self.rng.randrange(len(words)) if words else 0 for length, words in self.wordlists.items()}
+
+    def iterate_candidates(self, word: Word) -> Iterator[str]:
+        """
+        Yields the candidates in the domain of a word from the highest score to the lowest, starting each
+        score bucket from the random offset for its length. With a candidate lookahead, the candidates are
+        reordered by rank_candidates.
+        """
+        offset: int = self.candidate_offsets.get(word.length, 0)
+        if self.candidate_lookahead > 1:
+            return self.rank_candidates(word, self.word_list.iterate_scored_bitset(word.length, word.domain, offset))
+        return self.word_list.iterate_bitset(word.length, word.domain, offset)
+
+    def rank_candidates(self, word: Word, scored_candidates: Iterator[Tuple[str, int]]) -> Iterator[str]:
+        """
+        Takes scored candidates in windows of candidate_lookahead and yields each window from the highest
+        rated candidate to the lowest. A candidate is rated by its score plus lookahead_weight times the
+        average log2 size that the domains of the unpopulated words crossing it would be narrowed to, so
+        candidates that keep their crossings open are tried first. Candidates that would empty a crossing
+        domain are tried last, rather than skipped, so that the fill engine still learns from them.
+
+        Ranking is lazy, so only the windows the search reaches are rated, and the narrowed domain size of
+        each crossing is only counted once per letter.
+        """
+        slot_words: Tuple[Word, ...] = self.slot_graph.words
+        crossings: List[Tuple[int, int, Word]] = [(crossing.index, crossing.partner_index, slot_words[crossing.partner]) for crossing in self.slot_graph.slots[word.slot_id].crossings]
+        log_sizes: Dict[Tuple[int, str], float] = {} # Log2 of the narrowed domain size, by crossing and letter
+
+        def rate(scored_candidate: Tuple[str, int]) -> float:
+            candidate, score = scored_candidate
+            total: float = 0.0
+            open_crossings: int = 0
+            for i, (index, partner_index, crossing_word) in enumerate(crossings):
+                if crossing_word.populated:
+                    continue
+                key: Tuple[int, str] = (i, candidate[index])
+                if key not in log_sizes:
+                    size: int = (crossing_word.domain & self.word_list.get_letter_bitset(crossing_word.length, partner_index, candidate[index])).bit_count()
+                    log_sizes[key] = math.log2(size) if size else -math.inf
+                if log_sizes[key] == -math.inf:
+                    return -math.inf
+                total += log_sizes[key]
+                open_crossings += 1
+            return score + self.lookahead_weight * total / open_crossings if open_crossings else score
+
+        while True:
+            window: List[Tuple[str, int]] = list(islice(scored_candidates, self.candidate_lookahead))
+            if not window:
+                return
+            window.sort(key = rate, reverse = True)
+            for candidate, _ in window:
+                yield candidate
 
     @property
     def grid(self):
@@ -58,53 +400,202 @@ class Grid:
         """
         Displays the grid in a readable format.
         """
+        print(self.render_grid())
+
+    def render_grid(self) -> str:
+        """
+        Renders the grid in a readable format, with ANSI colours, as a single string.
+        """
+        lines: List[str] = []
         for y in range(self.rows):
+            line: List[str] = []
             for x in range(self.cols):
                 if self._grid[y][x].letter != "#":
-                    value: int = self._grid[y][x].numbering
                     letter: str = self._grid[y][x].letter
-                    # f"{value:02d}" if value is not None else 
                     formatted_value: str = f" {letter}" if letter is not None else "  "
-                    print(f"\033[31;107m{formatted_value}", end = "")
-                    print("\033[0m", end = "")
+                    line.append(f"\033[31;107m{formatted_value}\033[0m")
                 else:
-                    print(f"\033[31;40m  ", end = "")
-                    print("\033[0m", end = "")     
-            print()
+                    line.append("\033[31;40m  \033[0m")
+            lines.append("".join(line))
+        return "\n".join(lines)
 
-    def populated_with_words(self, iterable_keys: Dict[str, List[int]], alt_index: int = 0, across_index: int = 0, down_index: int = 0) -> bool:
+    def populated_with_words(self, slot_strategy: Union[str, Callable[[], Optional[Word]]] = "most_constrained") -> bool:
         """
-        Attempts to recursively populate the crossword grid with words from the wordlist.
-        This method uses a backtracking algorithm to fill the crossword grid by alternating 
-        between 'across' and 'down' words. It selects words from the provided wordlists that 
-        fit into the current grid configuration, ensuring that all intersecting words are 
-        valid. If a word placement leads to a dead end (i.e., no valid subsequent placements), 
+        Attempts to populate the crossword grid with words from the wordlist.
+        This method uses a backtracking algorithm to fill the crossword grid, one word at a time,
+        in the order chosen by the slot selection strategy. It selects words from the provided
+        wordlists that fit into the current grid configuration, ensuring that all intersecting words
+        are valid. If a word placement leads to a dead end (i.e., no valid subsequent placements),
         the method backtracks and tries alternative words. The function returns a boolean based
-        on whether population is successful.
+        on whether population is successful within the fill budget.
 
         Args:
-            iterable_keys (Dict[str, List[int]]): A dictionary containing lists of all of the across and down numbers
-                                                    which is used in order to iterate through these values in order.
-            alt_index: An incrementing index that is used to alternate directions between across (when alt_index is even)
-                                                    and down (when alt_index is odd). 
-        """
-        if across_index == len(iterable_keys["across"]) and down_index == len(iterable_keys["down"]):
-            return True
-        direction, word_num, across_index, down_index = self.alternate_index_directions(across_index, down_index, alt_index, iterable_keys)
-        word_length: int = self.words[direction][word_num].length
-        start_y, start_x = self.words[direction][word_num].start_pos
-        # Check direction to determine whether to read across (horizontally) or down (vertically).
-        current_word: List[Optional[str]] = [self._grid[start_y][start_x + i].letter if direction == "across" else self._grid[start_y + i][start_x].letter for i in range(word_length)]
-        for word in self.wordlists[word_length]:
-            if self.can_place_word(word_length, current_word, word):
-                self.place_word(word_length, direction, start_y, start_x, word, word_num)
-                if self.all_perpendicular_words_valid(word_length, direction, start_y, start_x):
-                    print()
-                    self.display_grid()
-                    if self.populated_with_words(iterable_keys, alt_index + 1, across_index, down_index):
-                        return True
-                self.erase_word(direction, word_num, word_length, start_y, start_x)
-        return False
+            slot_strategy (Union[str, Callable[[], Optional[Word]]]): The name of a strategy in self.slot_strategies,
+                                                    or a callable returning the next unpopulated word (None once every
+                                                    word is populated).
+        """
+        return self.fill_words(slot_strategy, self.fill_budget).succeeded
+
+    def fill_words(self, slot_strategy: Union[str, Callable[[], Optional[Word]]] = "most_constrained", fill_budget: Optional[FillBudget] = None) -> FillResult:
+        """
+        Populates the crossword grid with words using the iterative fill engine, and keeps the result
+        in self.fill_result.
+
+        Args:
+            fill_budget (Optional[FillBudget]): The limits on the search. An unlimited search is used if None.
+
+        Returns:
+            FillResult: Whether population succeeded, ran out of budget or was proven to be impossible.
+        """
+        on_progress: Optional[Callable[[], None]] = None
+        if self.observer and self.progress_interval:
+            on_progress = lambda: self.notify("progress")
+        self.fill_engine = FillEngine(self, slot_strategy, fill_budget, on_progress, self.progress_interval)
+        with self.trace("fill") as trace_args:
+            self.fill_result: FillResult = self.fill_engine.run()
+            trace_args.update(status = self.fill_result.status.value, nodes = self.fill_result.nodes, backtracks = self.fill_result.backtracks)
+        if self.fill_result.succeeded:
+            self.notify("filled")
+        return self.fill_result
+
+    def iterate_fills(self, max_fills: Optional[int] = None, unique_entries: bool = False, fill_budget: Optional[FillBudget] = None, skip_current_fill: bool = False) -> Iterator[Puzzle]:
+        """
+        Lazily yields distinct fills of the current pattern. Each fill continues the search where the last
+        one stopped rather than starting over, so the pattern, word list and domains are only built once and
+        later fills cost a fraction of the first. Any existing fill of the grid is erased first, keeping
+        locked words.
+
+        The search keeps its own nogoods, as the nogoods shared by fills of the pattern would be unsound once
+        earlier fills (or their words) are ruled out, and doesn't split the grid into regions, as a cached
+        region fill would make every fill the same in that region.
+
+        Args:
+            max_fills (Optional[int]): The number of fills to yield at most. Defaults to every fill.
+            unique_entries (bool): Whether a fill may only use words that no earlier fill has used.
+            fill_budget (Optional[FillBudget]): The limits on the search for each fill. Defaults to the grid's budget.
+            skip_current_fill (bool): Whether the grid's current fill counts as already found, so that it isn't yielded
+                                      again and, with unique_entries, its words aren't used by later fills.
+
+        Yields:
+            Puzzle: A snapshot of each fill, until max_fills fills have been found, there are no more fills or
+                            the budget runs out. The grid holds the last fill while it is processed.
+        """
+        current_rows: Optional[List[str]] = None
+        excluded_words: Optional[Set[str]] = set() if unique_entries else None
+        if skip_current_fill and all(word.word for word in self.slot_graph.words):
+            current_rows = Puzzle.from_grid(self).rows
+            if excluded_words is not None:
+                excluded_words.update(word.word for word in self.slot_graph.words)
+        if self.fill_engine is not None:
+            self.fill_engine.unwind_to(0)
+        self.fill_engine = FillEngine(self, self.slot_strategy, nogood_store = NogoodStore(), excluded_words = excluded_words, decompose_regions = False)
+        fills: int = 0
+        while max_fills is None or fills < max_fills:
+            self.fill_engine.extend_budget(fill_budget or self.fill_budget)
+            elapsed: float = self.fill_engine.elapsed
+            with self.trace("fill") as trace_args:
+                self.fill_result = self.fill_engine.run()
+                trace_args.update(status = self.fill_result.status.value, nodes = self.fill_result.nodes, backtracks = self.fill_result.backtracks)
+            if not self.fill_result.succeeded:
+                return
+            if current_rows is not None and Puzzle.from_grid(self).rows == current_rows:
+                self.fill_engine.reject_fill()
+                continue
+            fills += 1
+            self.notify("filled")
+            yield Puzzle.from_grid(self, self.fill_result.elapsed - elapsed)
+            if excluded_words is not None:
+                excluded_words.update(word.word for word in self.slot_graph.words)
+            self.fill_engine.reject_fill()
+
+    def get_slot_selector(self, slot_strategy: Union[str, Callable[[], Optional[Word]]], words: Optional[Collection[Word]] = None) -> Callable[[], Optional[Word]]:
+        """
+        Resolves a slot selection strategy, given either by name or as a callable, into a callable.
+        """
+        if callable(slot_strategy):
+            return slot_strategy
+        if slot_strategy not in self.slot_strategies:
+            raise ValueError(f"Unknown slot strategy: {slot_strategy}")
+        if words is not None:
+            return lambda: self.slot_strategies[slot_strategy](words)
+        return self.slot_strategies[slot_strategy]
+
+    def select_most_constrained_word(self, words: Optional[Collection[Word]] = None) -> Optional[Word]:
+        """
+        Picks the unpopulated word with the fewest remaining candidates in its domain (minimum remaining
+        values). Ties are broken by the number of unpopulated words crossing it, and then by the total
+        number of words crossing it, so that the most constraining word is populated first.
+
+        Args:
+            words (Optional[Collection[Word]]): The words to pick from, such as one region of the grid. Defaults
+                                    to every word.
+
+        Returns:
+            Optional[Word]: The next word to populate, or None if every word is populated.
+        """
+        tied_words: List[Word] = []
+        fewest_candidates: int = -1
+        for word in self.slot_graph.words if words is None else words:
+            if word.populated:
+                continue
+            candidates: int = word.domain.bit_count()
+            if fewest_candidates == -1 or candidates < fewest_candidates:
+                fewest_candidates = candidates
+                tied_words = [word]
+            elif candidates == fewest_candidates:
+                tied_words.append(word)
+        if not tied_words:
+            return None
+        if len(tied_words) == 1:
+            return tied_words[0]
+        return max(tied_words, key = lambda word: (self.count_unpopulated_crossings(word), len(self.crossing_words[word])))
+
+    def select_alternating_word(self, words: Optional[Collection[Word]] = None) -> Optional[Word]:
+        """
+        Picks the first unpopulated word in the legacy order, which strictly alternates between across and
+        down words in numbering order.
+
+        Args:
+            words (Optional[Collection[Word]]): The words to pick from, such as one region of the grid. Defaults
+                                    to every word.
+
+        Returns:
+            Optional[Word]: The next word to populate, or None if every word is populated.
+        """
+        for word in self.alternating_order:
+            if not word.populated and (words is None or word in words):
+                return word
+        return None
+
+    def create_alternating_order(self) -> List[Word]:
+        """
+        Lists every word in the order that the legacy strategy populates them, alternating between across
+        and down words for as long as both directions have words remaining.
+        """
+        iterable_keys: Dict[str, List[int]] = {
+            "across": list(self.words["across"].keys()),
+            "down": list(self.words["down"].keys())
+        }
+        order: List[Word] = []
+        across_index: int = 0
+        down_index: int = 0
+        for alt_index in range(len(iterable_keys["across"]) + len(iterable_keys["down"])):
+            direction, word_num, across_index, down_index = self.alternate_index_directions(across_index, down_index, alt_index, iterable_keys)
+            order.append(self.words[direction][word_num])
+        return order
+
+    def count_unpopulated_crossings(self, word: Word) -> int:
+        """
+        Counts the unpopulated words that cross the given word.
+        """
+        return sum(1 for crossing_word in self.crossing_words[word] if not crossing_word.populated)
+
+    def get_crossing_words(self, word: Word) -> List[Word]:
+        """
+        Finds every perpendicular word that intersects the given word.
+        """
+        slot_words: Tuple[Word, ...] = self.slot_graph.words
+        return [slot_words[crossing.partner] for crossing in self.slot_graph.slots[word.slot_id].crossings]
     
     def alternate_index_directions(self, across_index: int, down_index: int, alt_index: int, iterable_keys: Dict[str, List[int]]) -> Tuple[str, int, int, int]:
         """
@@ -131,30 +622,86 @@ class Grid:
             down_index += 1
         return direction, word_num, across_index, down_index
     
+    def initialize_domains(self) -> None:
+        """
+        Gives every word a candidate domain containing all words from the wordlist that fit the letters
+        currently in its line, and clears the trail used to undo domain changes and the per-slot backtrack
+        counts of the previous pattern. Also records the words
+        crossing each word and the legacy population order, which are used to select the next word.
+        """
+        self.domain_trail: List[Tuple[Word, int]] = []
+        self.counters.slot_backtracks = {}
+        self.crossing_words: Dict[Word, List[Word]] = {}
+        for word in self.slot_graph.words:
+            word.domain = self.word_list.get_matching_bitset(word.length, self.get_current_letters(word))
+            self.crossing_words[word] = self.get_crossing_words(word)
+        self.alternating_order: List[Word] = self.create_alternating_order()
+
+    def get_pattern_key(self) -> str:
+        """
+        Describes the current black square pattern, including any letters already in the grid, along with
+        the wordlist it is filled from. Grids with the same key share the nogoods learned while filling them.
+        """
+        rows: List[str] = ["".join(cell.letter or "." for cell in row) for row in self._grid]
+        return f"{self.word_list.key}:{'/'.join(rows)}"
+
+    def narrow_domain(self, word: Word, position: int, letter: str) -> bool:
+        """
+        Removes every candidate that doesn't have the given letter at the given position from the domain of
+        a word. The previous domain is recorded on the trail so that it can be restored when backtracking.
+
+        Returns:
+            bool: False if the domain has become empty, otherwise True.
+        """
+        domain: int = word.domain & self.word_list.get_letter_bitset(word.length, position, letter)
+        if domain != word.domain:
+            self.domain_trail.append((word, word.domain))
+            word.domain = domain
+        return domain != 0
+
+    def restore_domains(self, trail_mark: int) -> None:
+        """
+        Undoes every domain change recorded on the trail since it had the given length.
+        """
+        while len(self.domain_trail) > trail_mark:
+            word, domain = self.domain_trail.pop()
+            word.domain = domain
+
     def erase_word(self, direction: str, word_num: int, word_length: int, start_y: int, start_x: int) -> None:
         """
         Erases the current word while ensuring that any letters on the intersection of populated
-        words are retained.
+        words are retained, and restores the domains of crossing words to their state before the
+        word was placed.
 
         Args:
             direction (str): The direction of the word ("across" or "down").
         """
-        self.words[direction][word_num].word = None
-        self.words[direction][word_num].populated = False
-        for i in range(word_length):
-            if direction == "across":
-                if down_num := self._grid[start_y][start_x + i].num_down:
-                    if not self.words["down"][down_num].populated:
-                        self._grid[start_y][start_x + i].letter = None
-                else:
-                    self._grid[start_y][start_x + i].letter = None
-            else:
-                if across_num := self._grid[start_y + i][start_x].num_across:
-                    if not self.words["across"][across_num].populated:
-                        self._grid[start_y + i][start_x].letter = None
-                else:
-                    self._grid[start_y + i][start_x].letter = None
+        self.erase_slot(self.slot_graph.get_slot_id(direction, word_num))
+
+    def erase_slot(self, slot_id: int) -> None:
+        """
+        Erases the word in a slot of the slot graph. Cells shared with a populated crossing word keep their
+        letter, and every other cell gets back the letter it had before the word was placed.
+        """
+        slot: Slot = self.slot_graph.slots[slot_id]
+        word: Word = self.slot_graph.words[slot_id]
+        self.restore_domains(word.trail_mark)
+        word.word = None
+        word.populated = False
+        letters: bytearray = self._grid.letters
+        restored: bytearray = bytearray(word.previous_letters)
+        slot_words: Tuple[Word, ...] = self.slot_graph.words
+        for crossing in slot.crossings:
+            if slot_words[crossing.partner].populated:
+                restored[crossing.index] = letters[crossing.cell]
+        letters[slot.cell_slice] = restored
     
+    def get_slot_letters(self, slot_id: int) -> bytes:
+        """
+        Returns the letters currently in a slot, with 0 for empty cells.
+        """
+        return bytes(self._grid.letters[self.slot_graph.slots[slot_id].cell_slice])
+
     def can_place_word(self, word_length: int, current_word: List[Optional[str]], word: str) -> bool:
         """
         Checks whether a word can be placed in the current line, given the existing letters in the line.
@@ -177,37 +724,71 @@ class Grid:
         Args:
             direction (str): The direction of the word ("across" or "down").
         """
-        for i in range(word_length):
-            if direction == "across":
-                self._grid[start_y][start_x + i].letter = word[i]
-            else:
-                self._grid[start_y + i][start_x].letter = word[i]
-        self.words[direction][word_num].word = word
-        self.words[direction][word_num].populated = True
+        self.place_slot(self.slot_graph.get_slot_id(direction, word_num), word)
+
+    def place_slot(self, slot_id: int, word: str) -> None:
+        """
+        Places a word into a slot of the slot graph, keeping the letters it replaces so that erase_slot can
+        restore them.
+        """
+        cell_slice: slice = self.slot_graph.slots[slot_id].cell_slice
+        placed_word: Word = self.slot_graph.words[slot_id]
+        placed_word.previous_letters = bytes(self._grid.letters[cell_slice])
+        self._grid.letters[cell_slice] = word.encode("ascii")
+        placed_word.word = word
+        placed_word.populated = True
+        placed_word.trail_mark = len(self.domain_trail)
 
     def all_perpendicular_words_valid(self, word_length: int, direction: str, start_y: int, start_x: int) -> bool:
         """
         Checks whether all perpendicular words intersecting the current word are valid.
         This function iterates through each cell of a word in the specified direction (across or down) 
-        and verifies that any intersecting words in the perpendicular direction are either already 
-        populated or can be populated with a valid word. If any of the intersecting words cannot be 
-        validly populated, the function returns False.
+        and narrows the domain of every unpopulated intersecting word in the perpendicular direction to
+        the candidates that fit the newly placed letter (forward checking). If the domain of any of the
+        intersecting words becomes empty, the function returns False so that the branch is pruned
+        immediately. Domain changes are undone by erase_word.
 
         Args:
             direction (str): The direction of the word ("across" or "down").
         """
-        for i in range(word_length):
-            if direction == "across":
-                if down_num := self._grid[start_y][start_x + i].num_down:
-                    if not self.words["down"][down_num].populated:
-                        if not self.can_be_perpendicular("down", down_num):
-                            return False
-            else:
-                if across_num := self._grid[start_y + i][start_x].num_across:
-                    if not self.words["across"][across_num].populated:
-                        if not self.can_be_perpendicular("across", across_num):
-                            return False
-        return True
+        return self.find_emptied_perpendicular_word(word_length, direction, start_y, start_x) is None
+
+    def find_emptied_perpendicular_word(self, word_length: int, direction: str, start_y: int, start_x: int) -> Optional[Word]:
+        """
+        Narrows the domain of every unpopulated perpendicular word intersecting the current word, stopping
+        at the first word whose domain becomes empty.
+
+        Args:
+            direction (str): The direction of the word ("across" or "down").
+
+        Returns:
+            Optional[Word]: The perpendicular word left without candidates, or None if every perpendicular
+                                word can still be populated.
+        """
+        # A word is numbered by the cell it starts in
+        slot_id: int = self.slot_graph.get_slot_id(direction, self._grid.numbering[start_y * self.cols + start_x])
+        emptied_slot_id: Optional[int] = self.narrow_crossings(slot_id)
+        return None if emptied_slot_id is None else self.slot_graph.words[emptied_slot_id]
+
+    def narrow_crossings(self, slot_id: int) -> Optional[int]:
+        """
+        Narrows the domain of every unpopulated slot crossing a populated slot to the candidates that fit
+        the shared letters, stopping at the first slot whose domain becomes empty.
+
+        Returns:
+            Optional[int]: The id of the crossing slot left without candidates, or None if every crossing
+                                slot can still be populated.
+        """
+        slot_words: Tuple[Word, ...] = self.slot_graph.words
+        word: str = slot_words[slot_id].word
+        self.counters.perpendicular_checks += 1
+        for crossing in self.slot_graph.slots[slot_id].crossings:
+            crossing_word: Word = slot_words[crossing.partner]
+            if not crossing_word.populated:
+                self.counters.crossings_narrowed += 1
+                if not self.narrow_domain(crossing_word, crossing.partner_index, word[crossing.index]):
+                    return crossing.partner
+        return None
 
     
     def can_be_perpendicular(self, direction: str, word_num: int) -> bool:
@@ -219,7 +800,7 @@ class Grid:
             word_num (int): The index of the word in the specified direction.  
         """  
         word: Word = self.get_word(direction, word_num)
-        return self.is_valid_perpendicular_word(word)
+        return word.domain != 0
     
     def is_valid_perpendicular_word(self, word: Word) -> bool:  
         """  
@@ -255,16 +836,8 @@ class Grid:
             List[Optional[str]]: A list of characters representing the current letters on the grid where the word is placed.
                 If a cell is has no letter, the corresponding value will be None.
         """
-        word_length: int = word.length
-        start_y, start_x = word.start_pos
-        direction: str = word.direction 
-        current_letters: List[Optional[str]] = []
-        for i in range(word_length):
-            if direction == "across":
-                current_letters.append(self._grid[start_y][start_x + i].letter)
-            else:
-                current_letters.append(self._grid[start_y + i][start_x].letter)
-        return current_letters
+        cell_slice: slice = self.slot_graph.slots[word.slot_id].cell_slice
+        return [chr(letter) if letter else None for letter in self._grid.letters[cell_slice]]
 
     def is_valid_word(self, word_length: int, current_letters: List[Optional[str]]) -> bool:
         """
@@ -274,79 +847,25 @@ class Grid:
             current_letters (List[Optional[str]]): A list of characters representing the current letters in the line.
                                     Empty positions should be represented by None.
         """
-        for word in self.wordlists[word_length]:
-            valid: bool = True
-            for i in range(word_length):
-                if current_letters[i] and word[i] != current_letters[i]:
-                    valid = False
-            if valid:
-                return True
-        return False
+        return self.word_list.has_matching_word(word_length, current_letters)
     
-    def populate_grid(self) -> None:
+    def populate_grid(self) -> bool:
         """
-        Populates the grid with rotationally symmetrical black dividing boxes.
+        Populates the grid with rotationally symmetrical black dividing boxes, stopping as soon as one
+        of them splits the white cells into separate regions.
+
+        Returns:
+            bool: False if the white cells were split, otherwise True.
         """
-        self.populate_lines("rows")
-        self.populate_lines("columns")
+        self.connectivity: WhiteCellConnectivity = WhiteCellConnectivity(self._grid)
+        return self.populate_lines("rows") and self.populate_lines("columns")
 
     def are_lines_connected(self) -> bool:
         """
         Checks whether all lines in the crossword are connected, and that no breaks exist.
         """
-        self.visited: List[List[bool]] = self.initialize_visited_grid()
-        coords: Tuple[int, int] = self.get_first_space()
-        self.check_line_connections(coords)
-        return self.are_all_white_cells_visited()
-    
-    def initialize_visited_grid(self) -> List[List[bool]]:
-        """  
-        Initializes the visited grid to track which cells have been checked.
-
-        Returns:
-            List[List[bool]]: A 2d list the same size as the grid, filled with the value False.
-        """  
-        return [[False for _ in range(self.cols)] for _ in range(self.rows)]
-
-    def are_all_white_cells_visited(self) -> bool:
-        """
-        Checks whether the locations of all of the empty white cells in the grid have also been marked as "visited".
-        """
-        for row in range(self.rows):
-            for col in range(self.cols):
-                if self._grid[row][col].letter == None and not self.visited[row][col]:
-                    return False
-        return True
+        return WhiteCellConnectivity(self._grid).is_connected()
     
-    def get_first_space(self) -> Tuple[int, int]:
-        """
-        Finds the location of the first empty white cell in the grid when iterating from the first cell of the first row to the last cell of the last row.
-
-        Returns:
-            Tuple[int, int]: The coordinates of the cell in the form (column number, row number).
-        """
-        for row in range(self.rows):
-            for col in range(self.cols):   
-                if self._grid[row][col].letter == None:
-                    return (col, row)
-
-    def check_line_connections(self, coords: Tuple[int, int]) -> None:
-        """
-        Recursively searches surrounding cells to see if they are empty white cells, and marks them as visited.
-        
-        Args:
-            coords (Tuple[int, int]): The coordinates of a blank white space to begin searching from.
-        """
-        directions: Tuple[Tuple[int, int], ...] = ((-1, 0), (1, 0), (0, -1), (0, 1))
-        current_x: int = coords[0]
-        current_y: int = coords[1]
-        self.visited[current_y][current_x] = True
-        for x, y in directions:
-            next_coord: Tuple[int, int] = (current_x + x, current_y + y)
-            next_x, next_y = next_coord
-            if 0 <= next_x < self.cols and 0 <= next_y < self.rows and self.visited[next_y][next_x] == False and self._grid[next_y][next_x].letter == None:
-                self.check_line_connections(next_coord)
-
     def remove_extra_cells(self) -> None:
         """
         Changes any cells that aren't in rows or columns into black squares.
@@ -358,17 +877,19 @@ class Grid:
 
     def assign_numbering(self) -> None:
         """
-        Assigns an incrementing number to cells that begin across and down words.
+        Assigns an incrementing number to cells that begin across and down words, and builds the slot
+        graph of the numbered words.
         """
         number: int = 1
         for row in range(self.rows):
             for col in range(self.cols):
                 number_assigned: bool = False
-                if self.grid[row][col].letter == None:
+                if self.grid[row][col].letter != "#":
                     number_assigned: bool = self.assign_number_to_across_words(row, col, number, number_assigned)
                     number_assigned: bool = self.assign_number_to_down_words(row, col, number, number_assigned)
                     if number_assigned:
                         number += 1
+        self.slot_graph: SlotGraph = SlotGraph(self._grid, self.words)
 
     def assign_number_to_across_words(self, row: int, col: int, number: int, number_assigned: bool) -> bool:
         """
@@ -435,41 +956,101 @@ class Grid:
             "offset_y": lambda row, col: row % 2 == 0 and col % 2 != 0,
             "offset_x_and_y": lambda row, col: row % 2 == 0 and col % 2 == 0
         }
-        pattern: str = random.choice(list(offset_conditions.keys()))
+        pattern: str = self.rng.choice(list(offset_conditions.keys()))
         condition: Callable[[int, int], bool] = offset_conditions[pattern]
         for row in range(self.rows):
             for col in range(self.cols):
                 if condition(row, col):
                     self._grid[row][col].letter = "#"
 
-    def populate_lines(self, orientation: str) -> None:
+    def populate_lines(self, orientation: str) -> bool:
         """
         Checks for usable space in each first alternating line and divides each space up into smaller word spaces
         using black squares as dividers. On every second line, creates dividers in every second space.
 
         Args:
             orientation (str): The orientation of the lines being divided (expects "rows" or "columns").
+
+        Returns:
+            bool: False if a divider split the white cells into separate regions, otherwise True.
         """
-        half_grid: int = len(self._grid) // 2
+        half_grid: int = (self.rows if orientation == "rows" else self.cols) // 2
         for line in range(half_grid + 1):
             if line < half_grid:
                 usable_spaces: List[List[int]] = self.find_usable_spaces(line, orientation, half_grid)
                 for usable_space in usable_spaces:
                     first_space, last_space = (usable_space[0], usable_space[1])
-                    self.create_word_divisions(first_space, last_space, line, orientation)
+                    if not self.create_word_divisions(first_space, last_space, line, orientation):
+                        return False
             else:
-                if orientation == "rows":
-                    self.conditionally_place_center_divider(half_grid)
+                if orientation == "rows" and not self.conditionally_place_center_divider(half_grid):
+                    return False
+                return self.divide_middle_line(orientation)
+        return True
+
+    def divide_middle_line(self, orientation: str) -> bool:
+        """
+        Divides the spaces in the middle row (or column) that are longer than the maximum slot length. The middle
+        line is its own mirror image, so a space across its middle is divided at the middle cell first, and spaces
+        in its first half are divided and mirrored as usual. Grids no larger than 15 x 15 never have such spaces,
+        so this only applies to larger grids.
+
+        Returns:
+            bool: False if a divider split the white cells into separate regions, otherwise True.
+        """
+        line_count, line_length = (self.rows, self.cols) if orientation == "rows" else (self.cols, self.rows)
+        line: int = line_count // 2
+        for first_space, last_space in self.find_line_spaces(line, orientation):
+            if last_space - first_space + 1 <= self.max_slot_length:
+                continue
+            if first_space + last_space == line_length - 1:
+                middle: int = line_length // 2
+                if not self.draw_divisions([middle], orientation, line):
+                    return False
+                last_space = middle - 1
+                if last_space - first_space + 1 <= self.max_slot_length:
+                    continue
+            elif last_space >= line_length // 2:
+                # Spaces in the second half are mirrors of those in the first
+                continue
+            if not self.create_word_divisions(first_space, last_space, line, orientation):
+                return False
+        return True
+
+    def find_line_spaces(self, line: int, orientation: str) -> List[Tuple[int, int]]:
+        """
+        Finds the first and last index of every run of white cells in a row (or column).
+        """
+        if orientation == "rows":
+            cells: bytearray = self._grid.letters[line * self.cols:(line + 1) * self.cols]
+        else:
+            cells = self._grid.letters[line::self.cols]
+        spaces: List[Tuple[int, int]] = []
+        first_space: int = -1
+        for pos, letter in enumerate(cells):
+            if letter != BLACK_SQUARE and first_space == -1:
+                first_space = pos
+            elif letter == BLACK_SQUARE and first_space != -1:
+                spaces.append((first_space, pos - 1))
+                first_space = -1
+        if first_space != -1:
+            spaces.append((first_space, len(cells) - 1))
+        return spaces
                 
-    def conditionally_place_center_divider(self, half_grid: int) -> None:
+    def conditionally_place_center_divider(self, half_grid: int) -> bool:
         """
         Places a single black dividing square in the middle of the grid (1/2 probability) in order to create a point of symmetry.
+
+        Returns:
+            bool: False if the square split the white cells into separate regions, otherwise True.
         """
-        if not self._grid[half_grid][half_grid].letter:
-            if random.randint(1, 2) == 1:
-                self._grid[half_grid][half_grid].letter = "#"
+        middle_row, middle_col = (self.rows // 2, self.cols // 2)
+        if not self._grid[middle_row][middle_col].letter:
+            if self.rng.randint(1, 2) == 1:
+                return self.connectivity.add_black_square(middle_row, middle_col)
+        return True
     
-    def create_word_divisions(self, first_space: int, last_space: int, line: int, orientation: str) -> None:
+    def create_word_divisions(self, first_space: int, last_space: int, line: int, orientation: str) -> bool:
         """
         Divides up a blank space in a line using black dividing squares according to the chosen
         length of words within that space, and does the same for the equivalent mirrored and axially
@@ -477,10 +1058,13 @@ class Grid:
 
         Args:
             orientation (str): The orientation of the lines being divided (expects "rows" or "columns").
+
+        Returns:
+            bool: False if a divider split the white cells into separate regions, otherwise True.
         """
         word_lengths: List[int] = self.choose_word_lengths(first_space, last_space)
         divisions: List[int] = self.find_division_indexes(first_space, word_lengths)
-        self.draw_divisions(divisions, orientation, line)
+        return self.draw_divisions(divisions, orientation, line)
 
     def find_division_indexes(self, first_space: int, word_lengths: List[int]) -> List[int]:
         """
@@ -501,7 +1085,7 @@ class Grid:
             divisions.append(div_index)
         return divisions
 
-    def draw_divisions(self, divisions: List[int], orientation: str, line: int) -> None:
+    def draw_divisions(self, divisions: List[int], orientation: str, line: int) -> bool:
         """
         Draws black dividing squares ("#") into a given space according to a list of indexes, and does the same
         for the equivalent horizontally inverted mirrored space in the bottom half of the grid
@@ -511,17 +1095,21 @@ class Grid:
         Args:
             divisions (List[int]): The indexes of the black dividing squares.
             orientation (str): The orientation of the lines being divided (expects "rows" or "columns").
+
+        Returns:
+            bool: False as soon as a dividing square splits the white cells into separate regions, otherwise True.
         """
         for division in divisions:
             end_of_row, end_of_col = (len(self._grid[0]) - 1, len(self._grid) - 1)
             if orientation == "rows":
-                self._grid[line][division].letter = '#'
-                # Mirror inverted in the bottom rows
-                self._grid[end_of_col - line][end_of_row - division].letter = '#'
+                squares: Tuple[Tuple[int, int], ...] = ((line, division), (end_of_col - line, end_of_row - division))
             else:
-                self._grid[division][line].letter = '#'
-                # Mirror inverted in the right columns
-                self._grid[end_of_col - division][end_of_row - line].letter = '#'
+                squares = ((division, line), (end_of_col - division, end_of_row - line))
+            # The second square mirrors the first, inverted in the bottom rows or the right columns
+            for row, col in squares:
+                if not self.connectivity.add_black_square(row, col):
+                    return False
+        return True
 
     def choose_word_lengths(self, first_space: int, last_space: int) -> List[int]:
         """
@@ -544,19 +1132,25 @@ class Grid:
     def calculate_number_of_words(self, space_length: int) -> int:
         """
         Calculates the maximum number of words that can fit in a space of specified length.
+        Spaces longer than the maximum slot length are divided into at least as many words as are needed
+        to keep every word within it.
         """
         max_words: int = ((space_length - 3) // 4) + 1
+        if space_length > self.max_slot_length:
+            min_words: int = -(-(space_length + 1) // (self.max_slot_length + 1))
+            return self.rng.randint(min_words, max(min_words, min(max_words, min_words + 1)))
         # Pick a random number of words to divide this space into
         if max_words == 4:
-            return random.choices([1, 2], weights = [5, 100])[0]
+            return self.rng.choices([1, 2], weights = [5, 100])[0]
         elif max_words == 3:
-            return random.randint(1, 2)
+            return self.rng.randint(1, 2)
         else:
             return 1
 
     def create_random_word_lengths(self, remaining_space: int, num_words: int, word_lengths: List[int]) -> None:
         """
-        Creates word spaces of random lengths with each having a minimum length of 3.
+        Creates word spaces of random lengths with each having a minimum length of 3, and a maximum length of the
+        maximum slot length.
 
         Args:
             word_lengths (List[int]): The lengths allocated to each word that comprises the current space, in the current line.
@@ -567,11 +1161,12 @@ class Grid:
                 word_length: int = remaining_space
             else:
                 remaining_words: int = num_words - (i + 1)
-                shortest_word: int = 3
-                longest_word: int = remaining_space - (remaining_words * (3 + 1))
+                # Leave room for the remaining words, without leaving them more than they can hold
+                shortest_word: int = max(3, remaining_space - (remaining_words * (self.max_slot_length + 1)))
+                longest_word: int = min(self.max_slot_length, remaining_space - (remaining_words * (3 + 1)))
                 word_len_range: List[int] = list(range(shortest_word, longest_word + 1))
                 word_len_weights: List[int] = [5 if word_len == 3 or (remaining_space - word_len == (3 + 1)) else 100 for word_len in word_len_range]
-                word_length: int = random.choices(word_len_range, weights = word_len_weights)[0]
+                word_length: int = self.rng.choices(word_len_range, weights = word_len_weights)[0]
                 # Deduct word length and a single space from remaining space
                 remaining_space -= word_length + 1
             word_lengths.append(word_length)
@@ -592,7 +1187,7 @@ class Grid:
         if line == half_grid:
             line_length: int = half_grid - 1
         else:
-            line_length: int = self.rows
+            line_length: int = self.cols if orientation == "rows" else self.rows
         for pos in range(line_length):
             if not self.usable_space.is_space:
                 self.find_first_space(pos, line, orientation)
@@ -636,7 +1231,7 @@ class Grid:
                 usable_spaces.append((self.usable_space.first_space, self.usable_space.last_space))
         else:
             # Last space in the row, with preceeding spaces
-            if pos == self.rows - 1:
+            if pos == self.cols - 1:
                 self.usable_space.last_space = pos
                 if self.usable_space.last_space - self.usable_space.first_space >= 3:
                     usable_spaces.append((self.usable_space.first_space, self.usable_space.last_space))
@@ -658,7 +1253,7 @@ class Grid:
                 usable_spaces.append((self.usable_space.first_space, self.usable_space.last_space))
         else:
             # Last space in the column, with preceeding spaces
-            if pos == self.cols - 1:
+            if pos == self.rows - 1:
                 self.usable_space.last_space = pos
                 if self.usable_space.last_space - self.usable_space.first_space >= 3:
                     usable_spaces.append((self.usable_space.first_space, self.usable_space.last_space))
\ No newline at end of file
@@ -0,0 +1,129 @@
+from dataclasses import dataclass, field
+import json
+from typing import Any, Dict, List, NamedTuple
+from grid import Grid
+
+"""Loads partially filled grids from text or JSON, so that only their empty cells are filled"""
+
+DIRECTIONS = ("across", "down")
+
+class LockedWord(NamedTuple):
+    row: int # Row of the word's first cell
+    col: int # Column of the word's first cell
+    direction: str # "across" or "down"
+    word: str
+
+@dataclass
+class GridTemplate:
+    rows: List[str] # One string per row, with "#" for black squares, letters for filled cells and "." for empty cells
+    locked_words: List[LockedWord] = field(default_factory = list) # Words written into the grid before it is filled
+
+    def __post_init__(self) -> None:
+        """
+        Checks that the template is rectangular, that its letters are ASCII, as the grid stores one
+        byte per cell, and that every white cell is part of a word. Letters are lower-cased, like the
+        words of the word list, so that "ABA" in a template matches the word "aba".
+
+        Raises:
+            ValueError: If the template is empty, its rows differ in length, it has a letter that isn't ASCII or it
+                                has a white cell that isn't part of any word of 3 or more cells.
+        """
+        if not self.rows or not self.rows[0]:
+            raise ValueError("A grid template needs at least one row and column")
+        if any(len(row) != len(self.rows[0]) for row in self.rows):
+            raise ValueError("Every row of a grid template must have the same length")
+        for text in self.rows + [locked_word.word for locked_word in self.locked_words]:
+            if not text.isascii():
+                raise ValueError(f"{text!r} has a letter that isn't ASCII")
+        for locked_word in self.locked_words:
+            if locked_word.direction not in DIRECTIONS:
+                raise ValueError(f"Unknown direction {locked_word.direction!r}, expected across or down")
+            if not locked_word.word.isalpha():
+                raise ValueError(f"Locked word {locked_word.word!r} must only have letters")
+        self.rows = [row.lower() for row in self.rows]
+        self.locked_words = [locked_word._replace(word = locked_word.word.lower()) for locked_word in self.locked_words]
+        self.check_cells_covered()
+
+    def check_cells_covered(self) -> None:
+        """
+        Checks that every white cell is in an across or down run of at least 3 cells. The grid turns any other
+        white cell into a black square, which would silently change the pattern and drop a filled letter.
+
+        Raises:
+            ValueError: If a white cell isn't part of any word.
+        """
+        columns: List[str] = ["".join(column) for column in zip(*self.rows)]
+        for row, line in enumerate(self.rows):
+            for col, character in enumerate(line):
+                if character == "#":
+                    continue
+                if get_run_length(line, col) < 3 and get_run_length(columns[col], row) < 3:
+                    raise ValueError(f"The cell at row {row}, column {col} isn't part of any word of 3 or more cells")
+
+    def to_text(self) -> str:
+        return "\n".join(self.rows)
+
+    def to_json(self) -> str:
+        return json.dumps({"rows": self.rows, "locked": [locked_word._asdict() for locked_word in self.locked_words]})
+
+def get_run_length(line: str, index: int) -> int:
+    """
+    Counts the white cells in the run of a row or column that contains the cell at the given index.
+    """
+    start: int = line.rfind("#", 0, index) + 1
+    end: int = line.find("#", index)
+    return (len(line) if end == -1 else end) - start
+
+def parse_text_template(text: str) -> GridTemplate:
+    """
+    Parses the compact text format: one line per row, with "#" for black squares, letters for filled
+    cells and "." (or any other character) for empty cells. Blank lines are skipped. Words whose
+    cells are all filled are locked.
+
+    For example:
+        cat##
+        .....
+        ##...
+    """
+    return GridTemplate([line.rstrip("\r\n") for line in text.splitlines() if line.strip()])
+
+def parse_json_template(text: str) -> GridTemplate:
+    """
+    Parses the JSON format, an object with the rows in the text format and a list of locked words:
+        {"rows": ["#....", ...], "locked": [{"row": 0, "col": 1, "direction": "across", "word": "word"}]}
+
+    Raises:
+        ValueError: If the JSON is invalid or doesn't describe a grid.
+    """
+    data: Dict[str, Any] = json.loads(text)
+    if not isinstance(data, dict) or not isinstance(data.get("rows"), list):
+        raise ValueError("A JSON grid template must be an object with a list of rows")
+    try:
+        locked_words: List[LockedWord] = [LockedWord(int(entry["row"]), int(entry["col"]), str(entry["direction"]), str(entry["word"])) for entry in data.get("locked", [])]
+    except (KeyError, TypeError) as error:
+        raise ValueError(f"Locked words need a row, col, direction and word: {error}") from error
+    return GridTemplate([str(row) for row in data["rows"]], locked_words)
+
+def load_template(path: str) -> GridTemplate:
+    """
+    Loads a grid template from a file, in the JSON format if it has a .json extension or starts with
+    "{", and in the text format otherwise.
+    """
+    with open(path) as file:
+        text: str = file.read()
+    if path.endswith(".json") or text.lstrip().startswith("{"):
+        return parse_json_template(text)
+    return parse_text_template(text)
+
+def fill_template(template: GridTemplate, **grid_options) -> Grid:
+    """
+    Fills the empty cells of a grid template. The template's pattern is numbered as it is, without
+    generating a pattern, and the fill engine only searches the words that have empty cells.
+
+    Args:
+        grid_options: Other arguments of Grid, such as word_list, fill_budget or seed.
+
+    Returns:
+        Grid: The grid, whose fill_result says whether every word could be filled.
+    """
+    return Grid(pattern = template.rows, locked_words = template.locked_words, **grid_options)
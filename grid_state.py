@@ -0,0 +1,74 @@
+from array import array
+from typing import Iterator, Optional
+from cell import CellView
+
+BLACK_SQUARE: int = ord("#")
+
+class GridRow:
+    __slots__ = ("state", "row")
+
+    def __init__(self, state: "GridState", row: int):
+        """
+        A view of one row of a GridState, indexed by column.
+        """
+        self.state = state
+        self.row = row
+
+    def __getitem__(self, col: int) -> CellView:
+        if col < 0:
+            col += self.state.cols
+        if not 0 <= col < self.state.cols:
+            raise IndexError("column out of range")
+        return CellView(self.state, self.row * self.state.cols + col)
+
+    def __len__(self) -> int:
+        return self.state.cols
+
+    def __iter__(self) -> Iterator[CellView]:
+        start: int = self.row * self.state.cols
+        for index in range(start, start + self.state.cols):
+            yield CellView(self.state, index)
+
+class GridState:
+
+    def __init__(self, rows: int, cols: int):
+        """
+        Stores the cells of a grid in flat buffers indexed by row * cols + col, rather than as Cell objects:
+
+            letters: 0 for blank, the byte of "#" for black squares, or the byte of a letter
+            blocks: 1 for black squares, otherwise 0
+            numbering: the clue number of the cell, or 0
+            num_across / num_down: the number of the across / down word the cell belongs to, or 0
+
+        Indexing the state by row and then column gives Cell compatible views.
+        """
+        self.rows: int = rows
+        self.cols: int = cols
+        cell_count: int = rows * cols
+        self.letters: bytearray = bytearray(cell_count)
+        self.blocks: bytearray = bytearray(cell_count)
+        self.numbering: array = array("H", bytes(2 * cell_count))
+        self.num_across: array = array("H", bytes(2 * cell_count))
+        self.num_down: array = array("H", bytes(2 * cell_count))
+
+    def set_letter(self, index: int, letter: Optional[str]) -> None:
+        """
+        Sets the letter of a cell, keeping the block mask in sync.
+        """
+        value: int = ord(letter) if letter else 0
+        self.letters[index] = value
+        self.blocks[index] = value == BLACK_SQUARE
+
+    def __getitem__(self, row: int) -> GridRow:
+        if row < 0:
+            row += self.rows
+        if not 0 <= row < self.rows:
+            raise IndexError("row out of range")
+        return GridRow(self, row)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __iter__(self) -> Iterator[GridRow]:
+        for row in range(self.rows):
+            yield GridRow(self, row)
\ No newline at end of file
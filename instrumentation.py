@@ -0,0 +1,117 @@
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import json
+import os
+import threading
+import time
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+"""Search counters and sampled trace events for grid generation, exportable as a Chrome trace"""
+
+DEFAULT_SAMPLE_INTERVAL: int = 100
+DEFAULT_MAX_EVENTS: int = 100000
+
+@dataclass
+class SearchCounters:
+    pattern_attempts: int = 0 # Number of black square patterns filled, or loaded, by the grid
+    patterns_rejected: int = 0 # Number of generated patterns rejected before filling, e.g. for splitting the white cells
+    nodes: int = 0 # Number of word placements tried
+    candidates_tested: int = 0 # Number of candidates taken from word domains, including those rejected by a nogood
+    nogood_rejections: int = 0 # Number of candidates rejected by a learned nogood without being placed
+    perpendicular_checks: int = 0 # Number of placements whose crossing words were narrowed
+    crossings_narrowed: int = 0 # Number of crossing word domains narrowed, the cost of the perpendicular checks
+    domain_wipeouts: int = 0 # Number of placements rejected because a crossing word was left without candidates
+    backtracks: int = 0 # Number of words whose candidates were exhausted
+    slot_backtracks: Dict[int, int] = field(default_factory = dict) # Backtracks of each slot id of the current pattern
+
+    @property
+    def pattern_retries(self) -> int:
+        """
+        The number of patterns abandoned by the grid before the current one.
+        """
+        return max(self.pattern_attempts - 1, 0)
+
+    def get_most_backtracked_slots(self, count: int = 5) -> List[Tuple[int, int]]:
+        """
+        Finds the slots of the current pattern that have backtracked the most, which shows whether a fill
+        is thrashing in one region of the grid.
+
+        Returns:
+            List[Tuple[int, int]]: Up to count slot ids and their backtrack counts, most backtracked first.
+        """
+        return sorted(self.slot_backtracks.items(), key = lambda item: item[1], reverse = True)[:count]
+
+    def to_dict(self) -> Dict:
+        return {
+            "pattern_attempts": self.pattern_attempts,
+            "pattern_retries": self.pattern_retries,
+            "patterns_rejected": self.patterns_rejected,
+            "nodes": self.nodes,
+            "candidates_tested": self.candidates_tested,
+            "nogood_rejections": self.nogood_rejections,
+            "perpendicular_checks": self.perpendicular_checks,
+            "crossings_narrowed": self.crossings_narrowed,
+            "domain_wipeouts": self.domain_wipeouts,
+            "backtracks": self.backtracks,
+            "slot_backtracks": {str(slot_id): count for slot_id, count in self.slot_backtracks.items()}
+        }
+
+class TraceRecorder:
+
+    def __init__(self, sample_interval: int = DEFAULT_SAMPLE_INTERVAL, max_events: int = DEFAULT_MAX_EVENTS) -> None:
+        """
+        Records trace events in the Chrome trace event format, which can be opened in chrome://tracing or
+        Perfetto. Phases of generation (patterns and fills) are recorded as complete spans, while the state
+        of a running search is only sampled once every sample_interval word placements, so that tracing is
+        cheap enough to leave on. Only the most recent max_events events are kept.
+        """
+        self.sample_interval: int = sample_interval
+        self.events: Deque[Dict] = deque(maxlen = max_events)
+        self.start_time: float = time.perf_counter()
+        self.pid: int = os.getpid()
+
+    def get_timestamp(self, when: Optional[float] = None) -> float:
+        """
+        Converts a time.perf_counter value (now if None) into microseconds since the recorder started.
+        """
+        return ((time.perf_counter() if when is None else when) - self.start_time) * 1e6
+
+    def add_event(self, name: str, phase: str, args: Optional[Dict] = None, timestamp: Optional[float] = None, **fields) -> None:
+        event: Dict = {"name": name, "ph": phase, "ts": self.get_timestamp() if timestamp is None else timestamp, "pid": self.pid, "tid": threading.get_ident()}
+        if args:
+            event["args"] = args
+        event.update(fields)
+        self.events.append(event)
+
+    @contextmanager
+    def span(self, name: str, args: Optional[Dict] = None) -> Iterator[Dict]:
+        """
+        Records the time spent in a block as a complete event. The yielded dict is recorded as the event's
+        arguments once the block ends, so results can be added to it inside the block.
+        """
+        span_args: Dict = dict(args or {})
+        started: float = time.perf_counter()
+        try:
+            yield span_args
+        finally:
+            self.add_event(name, "X", span_args, self.get_timestamp(started), dur = (time.perf_counter() - started) * 1e6)
+
+    def instant(self, name: str, args: Optional[Dict] = None) -> None:
+        self.add_event(name, "i", args, s = "t")
+
+    def counter(self, name: str, values: Dict[str, float]) -> None:
+        """
+        Records the values of a counter track, drawn as a graph by trace viewers.
+        """
+        self.add_event(name, "C", values)
+
+    def to_chrome_trace(self) -> Dict:
+        return {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+
+    def save(self, path: str) -> None:
+        """
+        Writes the recorded events to a Chrome trace JSON file.
+        """
+        with open(path, "w") as file:
+            json.dump(self.to_chrome_trace(), file)
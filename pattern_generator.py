@@ -0,0 +1,253 @@
+import random
+from typing import List, Optional, Tuple
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+"""Generates and screens rotationally symmetrical black square patterns as NumPy boolean arrays"""
+
+NUMPY_AVAILABLE: bool = np is not None
+MIN_WORD_LENGTH: int = 3
+# Runs of white cells at least this long are considered for division into several words
+MIN_DIVISIBLE_SPACE: int = 4
+
+class PatternGenerator:
+
+    def __init__(self, rows: int, cols: int, rng: Optional[random.Random] = None, max_word_length: Optional[int] = None) -> None:
+        """
+        Initialises a generator of black square patterns that follows the same rules as the cell by cell
+        generator in Grid: a checkered base with a random offset, lines in the top and left halves divided
+        into words and mirrored by 180 degree rotation, an optional center square, cells that aren't part
+        of a word turned black, and every white cell connected.
+
+        Patterns are held as boolean arrays with True for black squares, so mirroring, slot extraction and
+        connectivity are whole-array operations. Only the choices of word lengths are made per line.
+
+        Patterns are rotationally symmetrical about the middle cell, so rows and cols must be odd.
+
+        Args:
+            rng (Optional[random.Random]): The random number generator for every choice, so that patterns can be
+                                    replayed from the grid's seed.
+            max_word_length (Optional[int]): The longest word a pattern may have. Longer lines are always divided
+                                    into several words, and patterns with a longer word are rejected.
+
+        Raises:
+            ImportError: If NumPy isn't installed.
+        """
+        if np is None:
+            raise ImportError("PatternGenerator requires NumPy")
+        self.rows: int = rows
+        self.cols: int = cols
+        self.rng: random.Random = rng or random.Random()
+        self.max_word_length: Optional[int] = max_word_length
+        self.candidates: int = 0 # Number of candidate patterns generated
+        self.rejections: int = 0 # Number of candidate patterns rejected by screening
+        row_indexes, col_indexes = np.indices((rows, cols))
+        self.checkered_bases: Tuple["np.ndarray", ...] = tuple(
+            (row_indexes % 2 == row_parity) & (col_indexes % 2 == col_parity)
+            for row_parity, col_parity in ((1, 1), (1, 0), (0, 1), (0, 0))
+        )
+
+    def generate_pattern(self, max_candidates: Optional[int] = None) -> Optional[List[str]]:
+        """
+        Generates candidate patterns until one passes screening.
+
+        Args:
+            max_candidates (Optional[int]): The number of candidates to try, or None to keep trying.
+
+        Returns:
+            Optional[List[str]]: The pattern as one string per row with "#" for black squares and "." for white
+                                    cells, or None if no candidate passed.
+        """
+        attempts: int = 0
+        while max_candidates is None or attempts < max_candidates:
+            attempts += 1
+            blocks: "np.ndarray" = self.generate_candidate()
+            if self.screen(blocks):
+                return self.to_pattern(blocks)
+            self.rejections += 1
+        return None
+
+    def generate_candidate(self) -> "np.ndarray":
+        """
+        Generates one candidate pattern, with the cells that aren't part of any word already turned black.
+        """
+        self.candidates += 1
+        blocks: "np.ndarray" = self.checkered_bases[self.rng.randrange(len(self.checkered_bases))].copy()
+        # Rows are divided first, then columns see the row divisions and center square, as in Grid.populate_grid
+        self.divide_lines(blocks)
+        half_row, half_col = (self.rows // 2, self.cols // 2)
+        if not blocks[half_row, half_col] and self.rng.randint(1, 2) == 1:
+            blocks[half_row, half_col] = True
+        self.divide_lines(blocks.T)
+        blocks |= ~self.find_slot_cells(blocks)
+        return blocks
+
+    def divide_lines(self, blocks: "np.ndarray") -> None:
+        """
+        Divides the runs of white cells in the first half of the lines (rows, or columns if given the
+        transposed array) into words, and mirrors the new black squares by 180 degree rotation. Writes to
+        the array in place.
+        """
+        half: int = blocks.shape[0] // 2
+        divisions: "np.ndarray" = np.zeros_like(blocks)
+        for line, start, length in zip(*self.find_runs(~blocks[:half])):
+            if length >= MIN_DIVISIBLE_SPACE:
+                self.divide_space(divisions, int(line), int(start), int(length))
+        self.divide_middle_line(blocks, divisions)
+        blocks |= divisions | divisions[::-1, ::-1]
+
+    def divide_space(self, divisions: "np.ndarray", line: int, start: int, length: int) -> None:
+        """
+        Marks the black squares dividing one run of white cells into words.
+        """
+        position: int = start - 1
+        for word_length in self.choose_word_lengths(length)[:-1]:
+            position += word_length + 1
+            divisions[line, position] = True
+
+    def divide_middle_line(self, blocks: "np.ndarray", divisions: "np.ndarray") -> None:
+        """
+        Divides the runs of white cells in the middle line that are longer than the maximum word length, in the
+        same way as Grid.divide_middle_line. The middle line is its own mirror image, so a run across its middle
+        is divided at the middle cell first, and only runs in its first half are divided otherwise.
+        """
+        if self.max_word_length is None:
+            return
+        line: int = blocks.shape[0] // 2
+        line_length: int = blocks.shape[1]
+        for _, start, length in zip(*self.find_runs(~blocks[line:line + 1])):
+            start, end = (int(start), int(start + length - 1))
+            if end - start + 1 <= self.max_word_length:
+                continue
+            if start + end == line_length - 1:
+                middle: int = line_length // 2
+                divisions[line, middle] = True
+                # The mirror of the division is added with the rest, by rotating the divisions
+                end = middle - 1
+                if end - start + 1 <= self.max_word_length:
+                    continue
+            elif end >= line_length // 2:
+                continue
+            self.divide_space(divisions, line, start, end - start + 1)
+
+    def choose_word_lengths(self, space_length: int) -> List[int]:
+        """
+        Divides a space into words with the same weights as Grid.choose_word_lengths.
+        """
+        max_words: int = ((space_length - MIN_WORD_LENGTH) // (MIN_WORD_LENGTH + 1)) + 1
+        longest_allowed: int = self.max_word_length or space_length
+        if space_length > longest_allowed:
+            min_words: int = -(-(space_length + 1) // (longest_allowed + 1))
+            num_words: int = self.rng.randint(min_words, max(min_words, min(max_words, min_words + 1)))
+        elif max_words == 4:
+            num_words: int = self.rng.choices([1, 2], weights = [5, 100])[0]
+        elif max_words == 3:
+            num_words = self.rng.randint(1, 2)
+        else:
+            num_words = 1
+        word_lengths: List[int] = []
+        remaining_space: int = space_length
+        for i in range(num_words - 1):
+            remaining_words: int = num_words - (i + 1)
+            shortest_word: int = max(MIN_WORD_LENGTH, remaining_space - remaining_words * (longest_allowed + 1))
+            longest_word: int = min(longest_allowed, remaining_space - remaining_words * (MIN_WORD_LENGTH + 1))
+            word_len_range: List[int] = list(range(shortest_word, longest_word + 1))
+            word_len_weights: List[int] = [5 if word_len == MIN_WORD_LENGTH or remaining_space - word_len == MIN_WORD_LENGTH + 1 else 100 for word_len in word_len_range]
+            word_length: int = self.rng.choices(word_len_range, weights = word_len_weights)[0]
+            remaining_space -= word_length + 1
+            word_lengths.append(word_length)
+        word_lengths.append(remaining_space)
+        return word_lengths
+
+    @staticmethod
+    def find_runs(white: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """
+        Finds every horizontal run of True cells with a run-length encoding of the padded rows.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: The row, first column and length of each run.
+        """
+        padded: "np.ndarray" = np.zeros((white.shape[0], white.shape[1] + 2), dtype = np.int8)
+        padded[:, 1:-1] = white
+        changes: "np.ndarray" = np.diff(padded, axis = 1)
+        start_rows, starts = np.nonzero(changes == 1)
+        _, ends = np.nonzero(changes == -1)
+        return start_rows, starts, ends - starts
+
+    @classmethod
+    def get_run_lengths(cls, white: "np.ndarray") -> "np.ndarray":
+        """
+        Gives every True cell the length of the horizontal run it belongs to, and every False cell 0.
+        """
+        lengths: "np.ndarray" = np.zeros(white.shape, dtype = np.int32)
+        rows, starts, run_lengths = cls.find_runs(white)
+        if len(run_lengths):
+            # Spread each run's length over its cells with one fancy-indexed write
+            offsets: "np.ndarray" = np.arange(run_lengths.sum()) - np.repeat(np.cumsum(run_lengths) - run_lengths, run_lengths)
+            lengths[np.repeat(rows, run_lengths), np.repeat(starts, run_lengths) + offsets] = np.repeat(run_lengths, run_lengths)
+        return lengths
+
+    def find_slot_cells(self, blocks: "np.ndarray") -> "np.ndarray":
+        """
+        Finds the white cells that belong to an across or down word of at least MIN_WORD_LENGTH cells.
+        """
+        white: "np.ndarray" = ~blocks
+        return (self.get_run_lengths(white) >= MIN_WORD_LENGTH) | (self.get_run_lengths(white.T).T >= MIN_WORD_LENGTH)
+
+    def screen(self, blocks: "np.ndarray") -> bool:
+        """
+        Checks that a candidate has white cells, that every white cell is connected, and that no word is
+        longer than the maximum word length.
+        """
+        white: "np.ndarray" = ~blocks
+        if not white.any():
+            return False
+        if self.max_word_length is not None:
+            if self.get_run_lengths(white).max() > self.max_word_length or self.get_run_lengths(white.T).max() > self.max_word_length:
+                return False
+        return self.is_connected(white)
+
+    @staticmethod
+    def get_run_ids(white: "np.ndarray") -> "np.ndarray":
+        """
+        Numbers the horizontal runs of True cells from 1 in reading order, giving every True cell the
+        number of its run and every False cell 0.
+        """
+        starts: "np.ndarray" = white.copy()
+        starts[:, 1:] &= ~white[:, :-1]
+        return np.cumsum(starts).reshape(white.shape) * white
+
+    @classmethod
+    def is_connected(cls, white: "np.ndarray") -> bool:
+        """
+        Flood fills from the first white cell and checks whether it reached every white cell. Rather than
+        growing one cell at a time, each step spreads the reached cells along their whole across runs and
+        then along their whole down runs, so the fill finishes in as many steps as the fill path has turns.
+        """
+        across_ids: "np.ndarray" = cls.get_run_ids(white)
+        down_ids: "np.ndarray" = cls.get_run_ids(white.T).T
+        reached: "np.ndarray" = np.zeros_like(white)
+        reached[np.unravel_index(np.argmax(white), white.shape)] = True
+        reached_count: int = 1
+        white_count: int = int(white.sum())
+        while True:
+            for run_ids in (across_ids, down_ids):
+                reached_runs: "np.ndarray" = np.zeros(int(run_ids.max()) + 1, dtype = bool)
+                reached_runs[run_ids[reached]] = True
+                reached_runs[0] = False
+                reached = reached_runs[run_ids]
+            grown_count: int = int(reached.sum())
+            if grown_count == white_count:
+                return True
+            if grown_count == reached_count:
+                return False
+            reached_count = grown_count
+
+    def to_pattern(self, blocks: "np.ndarray") -> List[str]:
+        """
+        Converts a boolean pattern into one string per row with "#" for black squares and "." for white cells.
+        """
+        characters: "np.ndarray" = np.where(blocks, ord("#"), ord(".")).astype(np.uint8)
+        return [row.tobytes().decode("ascii") for row in characters]
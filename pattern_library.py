@@ -0,0 +1,169 @@
+import argparse
+from dataclasses import asdict, dataclass, field
+import json
+import os
+import random
+import statistics
+from typing import Dict, Iterable, List, Optional
+from fill_engine import FillBudget
+from grid import Grid, GridSize, parse_grid_size
+from word_list import get_shared_word_list
+
+"""Stores black square patterns along with how often, and how quickly, they have been filled"""
+
+DEFAULT_LIBRARY_PATH: str = "patterns.json"
+LIBRARY_VERSION: int = 1
+# Only the most recent fill times of each pattern are kept for the median
+MAX_FILL_TIMES: int = 101
+
+@dataclass
+class PatternRecord:
+    rows: List[str] # One string per row, with "#" for black squares and "." for white cells
+    attempts: int = 0 # Number of fills tried
+    successes: int = 0 # Number of fills that succeeded
+    fill_times: List[float] = field(default_factory = list) # Seconds taken by the most recent successful fills
+
+    @property
+    def key(self) -> str:
+        return "/".join(self.rows)
+
+    @property
+    def success_rate(self) -> float:
+        """
+        The fraction of fills that succeeded, smoothed so that untried patterns have a rate of 0.5.
+        """
+        return (self.successes + 1) / (self.attempts + 2)
+
+    @property
+    def median_fill_time(self) -> Optional[float]:
+        return statistics.median(self.fill_times) if self.fill_times else None
+
+    def record_fill(self, succeeded: bool, elapsed: float) -> None:
+        self.attempts += 1
+        if succeeded:
+            self.successes += 1
+            self.fill_times.append(elapsed)
+            del self.fill_times[:-MAX_FILL_TIMES]
+
+class PatternLibrary:
+
+    def __init__(self, path: str = DEFAULT_LIBRARY_PATH) -> None:
+        """
+        Loads the pattern library stored at the given path, or starts an empty one if the file doesn't exist.
+        Changes are only written to disk by save.
+        """
+        self.path: str = path
+        self.records: Dict[str, PatternRecord] = {}
+        if os.path.exists(path):
+            with open(path) as file:
+                data: Dict = json.load(file)
+            for record in data.get("patterns", []):
+                self.add(PatternRecord(**record))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, pattern: Iterable[str]) -> bool:
+        """
+        Adds a pattern, unless the library already has it.
+
+        Args:
+            pattern (Iterable[str]): The rows of the pattern, or a PatternRecord.
+
+        Returns:
+            bool: True if the pattern was added, or False if it is a duplicate.
+        """
+        record: PatternRecord = pattern if isinstance(pattern, PatternRecord) else PatternRecord(list(pattern))
+        if record.key in self.records:
+            return False
+        self.records[record.key] = record
+        return True
+
+    def get(self, pattern: List[str]) -> Optional[PatternRecord]:
+        return self.records.get("/".join(pattern))
+
+    def record_fill(self, pattern: List[str], succeeded: bool, elapsed: float) -> None:
+        """
+        Records the outcome of filling a pattern, adding the pattern first if it is new.
+        """
+        self.add(pattern)
+        self.records["/".join(pattern)].record_fill(succeeded, elapsed)
+
+    def get_patterns(self, rows: int, cols: int, min_success_rate: float = 0.0, min_attempts: int = 0) -> List[PatternRecord]:
+        """
+        Lists the patterns of the given size that have been tried at least min_attempts times and have at
+        least the given success rate.
+        """
+        return [
+            record for record in self.records.values()
+            if len(record.rows) == rows and len(record.rows[0]) == cols and record.attempts >= min_attempts and record.success_rate >= min_success_rate
+        ]
+
+    def sample(self, rows: int, cols: int, rng: random.Random, min_success_rate: float = 0.5, min_attempts: int = 1) -> Optional[List[str]]:
+        """
+        Picks a known-good pattern of the given size, weighted by its success rate.
+
+        Returns:
+            Optional[List[str]]: The rows of the pattern, or None if the library has no pattern that qualifies.
+        """
+        records: List[PatternRecord] = self.get_patterns(rows, cols, min_success_rate, min_attempts)
+        if not records:
+            return None
+        return list(rng.choices(records, weights = [record.success_rate for record in records])[0].rows)
+
+    def save(self) -> None:
+        """
+        Writes the library to its path, replacing the file atomically.
+        """
+        temporary_path: str = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump({"version": LIBRARY_VERSION, "patterns": [asdict(record) for record in self.records.values()]}, file)
+        os.replace(temporary_path, self.path)
+
+def generate_patterns(library: PatternLibrary, count: int, grid_size: GridSize = 15, seed: Optional[int] = None, word_list_path: str = "words_alpha.txt") -> int:
+    """
+    Generates symmetric, connected patterns with the grid's own pattern generator and adds the new ones
+    to the library. Pattern i is generated from the seed seed + i.
+
+    Returns:
+        int: The number of patterns added, which is less than count if some were duplicates.
+    """
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    added: int = 0
+    for i in range(count):
+        grid: Grid = Grid(grid_size, word_list = get_shared_word_list(word_list_path), fill = False, seed = seed + i)
+        added += library.add(grid.get_pattern())
+    return added
+
+def rate_patterns(library: PatternLibrary, fills_per_pattern: int = 3, fill_budget: Optional[FillBudget] = None, seed: Optional[int] = None, word_list_path: str = "words_alpha.txt") -> None:
+    """
+    Fills every pattern in the library that has been tried fewer than fills_per_pattern times, recording
+    each outcome, until it has.
+
+    Args:
+        fill_budget (Optional[FillBudget]): The limits on each fill. Defaults to the grid's default budget.
+    """
+    rng: random.Random = random.Random(seed)
+    for record in list(library.records.values()):
+        while record.attempts < fills_per_pattern:
+            grid: Grid = Grid(fill_budget = fill_budget, word_list = get_shared_word_list(word_list_path), pattern = record.rows, seed = rng.randrange(2 ** 32))
+            record.record_fill(grid.fill_result.succeeded, grid.fill_result.elapsed)
+
+def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description = "Build a library of rated black square patterns.")
+    parser.add_argument("path", nargs = "?", default = DEFAULT_LIBRARY_PATH, help = "path of the library")
+    parser.add_argument("--size", type = parse_grid_size, default = 15, help = "number of rows and columns of the patterns, or ROWSxCOLS")
+    parser.add_argument("--count", type = int, default = 100, help = "number of patterns to generate")
+    parser.add_argument("--fills", type = int, default = 3, help = "number of fills to rate each pattern with")
+    parser.add_argument("--seed", type = int, default = None, help = "seed of the first pattern")
+    parser.add_argument("--word-list", default = "words_alpha.txt", help = "path of the word list")
+    return parser.parse_args(args)
+
+if __name__ == "__main__":
+    options: argparse.Namespace = parse_args()
+    library: PatternLibrary = PatternLibrary(options.path)
+    added: int = generate_patterns(library, options.count, options.size, options.seed, options.word_list)
+    rate_patterns(library, options.fills, seed = options.seed, word_list_path = options.word_list)
+    library.save()
+    print(f"Added {added} patterns to {options.path}, which has {len(library)}")
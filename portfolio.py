@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+import multiprocessing
+import os
+import queue
+import random
+import time
+from typing import List, Optional, Tuple
+from fill_engine import FillBudget
+from grid import Grid, GridSize
+from puzzle import Puzzle
+from word_list import get_shared_word_list
+
+"""Races differently seeded and ordered fills of one black square pattern across processes"""
+
+@dataclass
+class PortfolioEntry:
+    slot_strategy: str # Name of the slot selection strategy used by the fill
+    seed: int # Seed of the grid, which picks where candidates are tried from
+
+@dataclass
+class PortfolioResult:
+    puzzle: Optional[Puzzle] # The first successful fill, or None if no entry succeeded
+    winner: Optional[PortfolioEntry] # The entry that produced the puzzle
+    elapsed: float # Seconds until the race finished
+
+def create_default_portfolio(size: int, base_seed: Optional[int] = None) -> List[PortfolioEntry]:
+    """
+    Creates a portfolio of entries that mostly use the most constrained strategy with different seeds,
+    with every fourth entry using the legacy alternating strategy for diversity.
+    """
+    if base_seed is None:
+        base_seed = random.randrange(2 ** 32)
+    return [PortfolioEntry("alternating" if i % 4 == 3 else "most_constrained", base_seed + i) for i in range(size)]
+
+def run_entry(pattern: List[str], entry: PortfolioEntry, index: int, word_list_path: str, time_limit: Optional[float], results: multiprocessing.Queue) -> None:
+    """
+    Fills the pattern with a single portfolio entry in a worker process and reports the outcome. An entry
+    that raises is reported as having failed, so the race never waits for it.
+    """
+    start_time: float = time.perf_counter()
+    puzzle: Optional[Puzzle] = None
+    try:
+        grid: Grid = Grid(slot_strategy = entry.slot_strategy, fill_budget = FillBudget(time_limit = time_limit), word_list = get_shared_word_list(word_list_path), pattern = pattern, seed = entry.seed)
+        if grid.fill_result.succeeded:
+            puzzle = Puzzle.from_grid(grid, time.perf_counter() - start_time)
+    finally:
+        results.put((index, puzzle))
+
+def solve_portfolio(pattern: List[str], entries: Optional[List[PortfolioEntry]] = None, timeout: Optional[float] = None, word_list_path: str = "words_alpha.txt") -> PortfolioResult:
+    """
+    Fills a black square pattern by racing a portfolio of fills, one process per entry, and returns the
+    first one to succeed. The remaining processes are terminated as soon as there is a winner, so the
+    latency is that of the fastest entry rather than of a single, possibly unlucky, fill.
+
+    Args:
+        entries (Optional[List[PortfolioEntry]]): The fills to race. Defaults to one per CPU.
+        timeout (Optional[float]): The number of seconds to wait for a successful fill.
+    """
+    start_time: float = time.perf_counter()
+    entries = entries or create_default_portfolio(os.cpu_count() or 1)
+    # Load the word list before starting the processes, so that forked processes share its pages
+    get_shared_word_list(word_list_path)
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    results: multiprocessing.Queue = context.Queue()
+    processes: List[multiprocessing.Process] = [context.Process(target = run_entry, args = (pattern, entry, index, word_list_path, timeout, results), daemon = True) for index, entry in enumerate(entries)]
+    for process in processes:
+        process.start()
+    try:
+        for _ in range(len(processes)):
+            remaining: Optional[float] = None if timeout is None else max(0.0, timeout - (time.perf_counter() - start_time))
+            try:
+                result: Tuple[int, Optional[Puzzle]] = results.get(timeout = remaining)
+            except queue.Empty:
+                break
+            index, puzzle = result
+            if puzzle is not None:
+                return PortfolioResult(puzzle, entries[index], time.perf_counter() - start_time)
+        return PortfolioResult(None, None, time.perf_counter() - start_time)
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+
+def generate_portfolio_puzzle(grid_size: GridSize = 15, entries: Optional[List[PortfolioEntry]] = None, timeout: Optional[float] = None, word_list_path: str = "words_alpha.txt", pattern_seed: Optional[int] = None) -> PortfolioResult:
+    """
+    Generates a black square pattern from the pattern seed and fills it with a portfolio race.
+    """
+    pattern: List[str] = Grid(grid_size, word_list = get_shared_word_list(word_list_path), fill = False, seed = pattern_seed).get_pattern()
+    return solve_portfolio(pattern, entries, timeout, word_list_path)
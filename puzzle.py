@@ -0,0 +1,171 @@
+from dataclasses import dataclass, field
+import hashlib
+import json
+import re
+import struct
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    from grid import Grid
+
+DIRECTIONS: Tuple[str, ...] = ("across", "down")
+# Binary records: a header, the black square mask as a bitset, one letter per white cell and the start of each entry
+RECORD_HEADER_FORMAT: str = "<HH?qdIH" # rows, cols, whether there is a seed, seed, elapsed, pattern attempts, entry count
+RECORD_ENTRY_FORMAT: str = "<HBHH" # number, direction index and flags, row, col
+EMPTY_WORD_FLAG: int = 0x80 # Set in the direction byte of entries that have no word yet, such as in an unfilled grid
+
+class Entry(NamedTuple):
+    number: int # Clue number of the entry
+    direction: str # "across" or "down"
+    row: int # Row of the entry's first cell
+    col: int # Column of the entry's first cell
+    word: str
+
+def get_pattern_hash(pattern: List[str]) -> int:
+    """
+    Hashes a black square pattern (or the rows of a puzzle, whose letters are ignored) into 64 bits, so that
+    puzzles with the same pattern can be found by an index.
+    """
+    text: str = re.sub("[^#/]", ".", "/".join(pattern))
+    return int.from_bytes(hashlib.blake2b(text.encode("ascii"), digest_size = 8).digest(), "little")
+
+@dataclass
+class Puzzle:
+    seed: Optional[int] # Seed of the grid the puzzle was generated from
+    rows: List[str] # One string per row, with "#" for black squares and letters for white cells
+    across: Dict[int, str] = field(default_factory = dict) # Across words by number
+    down: Dict[int, str] = field(default_factory = dict) # Down words by number
+    elapsed: float = 0.0 # Seconds taken to generate the puzzle
+    pattern_attempts: int = 0 # Number of black square patterns tried
+    entries: List[Entry] = field(default_factory = list) # Every word with its number and first cell, across words first
+
+    @classmethod
+    def from_grid(cls, grid: "Grid", elapsed: float = 0.0) -> "Puzzle":
+        """
+        Creates a puzzle from a filled grid, keeping only plain data so that it can be sent between processes.
+        """
+        rows: List[str] = ["".join(cell.letter or "." for cell in row) for row in grid.grid]
+        across: Dict[int, str] = {number: word.word or "" for number, word in grid.words["across"].items()}
+        down: Dict[int, str] = {number: word.word or "" for number, word in grid.words["down"].items()}
+        entries: List[Entry] = [Entry(number, direction, *word.start_pos, word.word or "") for direction in DIRECTIONS for number, word in grid.words[direction].items()]
+        return cls(grid.seed, rows, across, down, elapsed, grid.pattern_attempts, entries)
+
+    @classmethod
+    def from_entries(cls, seed: Optional[int], rows: List[str], entries: List[Entry], elapsed: float = 0.0, pattern_attempts: int = 0) -> "Puzzle":
+        across: Dict[int, str] = {entry.number: entry.word for entry in entries if entry.direction == "across"}
+        down: Dict[int, str] = {entry.number: entry.word for entry in entries if entry.direction == "down"}
+        return cls(seed, rows, across, down, elapsed, pattern_attempts, entries)
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return (len(self.rows), len(self.rows[0]) if self.rows else 0)
+
+    @property
+    def pattern_hash(self) -> int:
+        return get_pattern_hash(self.rows)
+
+    def get_pattern(self) -> List[str]:
+        """
+        Returns the black square mask, as one string per row with "#" for black squares and "." for white cells.
+        """
+        return [re.sub("[^#]", ".", row) for row in self.rows]
+
+    def get_numbering(self) -> List[List[int]]:
+        """
+        Returns the clue number of each cell, or 0 for cells that don't start an entry.
+        """
+        rows, cols = self.size
+        numbering: List[List[int]] = [[0] * cols for _ in range(rows)]
+        for entry in self.entries:
+            numbering[entry.row][entry.col] = entry.number
+        return numbering
+
+    def to_dict(self) -> Dict:
+        """
+        Converts the puzzle into the JSON lines format. The across and down words are only kept in the entries.
+        """
+        return {
+            "seed": self.seed,
+            "rows": self.rows,
+            "entries": [[entry.number, entry.direction, entry.row, entry.col, entry.word] for entry in self.entries],
+            "elapsed": self.elapsed,
+            "pattern_attempts": self.pattern_attempts
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Puzzle":
+        entries: List[Entry] = [Entry(int(number), str(direction), int(row), int(col), str(word)) for number, direction, row, col, word in data.get("entries", [])]
+        return cls.from_entries(data.get("seed"), list(data["rows"]), entries, data.get("elapsed", 0.0), data.get("pattern_attempts", 0))
+
+    def to_json_line(self) -> str:
+        return json.dumps(self.to_dict(), separators = (",", ":"))
+
+    @classmethod
+    def from_json_line(cls, line: str) -> "Puzzle":
+        return cls.from_dict(json.loads(line))
+
+    def to_bytes(self) -> bytes:
+        """
+        Packs the puzzle into the compact binary format: a header, the black square mask with one bit per cell,
+        the letter of each white cell and the number, direction and first cell of each entry. The words of the
+        entries are read back from the letters, so each letter is only stored once, and entries without a word
+        are flagged so that they stay empty.
+
+        Raises:
+            ValueError: If a letter isn't ASCII, or the seed doesn't fit in 64 bits.
+        """
+        rows, cols = self.size
+        cells: str = "".join(self.rows)
+        # Bit i of the mask is cell i, so the bits are read from the reversed cells
+        bits: str = re.sub("[^#]", "0", cells[::-1]).replace("#", "1")
+        mask: bytes = int(bits or "0", 2).to_bytes((len(cells) + 7) // 8, "little")
+        letters: bytes = cells.replace("#", "").encode("ascii")
+        try:
+            header: bytes = struct.pack(RECORD_HEADER_FORMAT, rows, cols, self.seed is not None, self.seed or 0, self.elapsed, self.pattern_attempts, len(self.entries))
+        except struct.error as error:
+            raise ValueError(f"The puzzle can't be packed: {error}") from error
+        return header + mask + letters + b"".join(struct.pack(RECORD_ENTRY_FORMAT, entry.number, DIRECTIONS.index(entry.direction) | (0 if entry.word else EMPTY_WORD_FLAG), entry.row, entry.col) for entry in self.entries)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Puzzle":
+        """
+        Unpacks a puzzle packed by to_bytes.
+
+        Raises:
+            ValueError: If the data is truncated.
+        """
+        try:
+            rows, cols, has_seed, seed, elapsed, pattern_attempts, entry_count = struct.unpack_from(RECORD_HEADER_FORMAT, data)
+            offset: int = struct.calcsize(RECORD_HEADER_FORMAT)
+            mask: bytes = data[offset:offset + (rows * cols + 7) // 8]
+            offset += len(mask)
+            bits: str = format(int.from_bytes(mask, "little"), f"0{rows * cols}b")[::-1][:rows * cols]
+            # Each run of white cells between black squares takes the next run of letters
+            white_count: int = rows * cols - bits.count("1")
+            letters: str = data[offset:offset + white_count].decode("ascii")
+            runs: List[str] = []
+            letter_offset: int = 0
+            for run_length in map(len, bits.split("1")):
+                runs.append(letters[letter_offset:letter_offset + run_length])
+                letter_offset += run_length
+            cells: str = "#".join(runs)
+            letter_offset = offset + white_count
+            starts: List[Tuple[int, int, int, int]] = list(struct.iter_unpack(RECORD_ENTRY_FORMAT, data[letter_offset:letter_offset + entry_count * struct.calcsize(RECORD_ENTRY_FORMAT)]))
+        except struct.error as error:
+            raise ValueError(f"Truncated puzzle record: {error}") from error
+        if len(cells) != rows * cols or len(starts) != entry_count:
+            raise ValueError("Truncated puzzle record")
+        puzzle_rows: List[str] = [cells[row * cols:(row + 1) * cols] for row in range(rows)]
+        puzzle_cols: List[str] = ["".join(col) for col in zip(*puzzle_rows)]
+        entries: List[Entry] = []
+        for number, direction_byte, row, col in starts:
+            direction_index: int = direction_byte & ~EMPTY_WORD_FLAG
+            word: str = "" if direction_byte & EMPTY_WORD_FLAG else (puzzle_rows[row][col:] if direction_index == 0 else puzzle_cols[col][row:]).split("#", 1)[0]
+            entries.append(Entry(number, DIRECTIONS[direction_index], row, col, word))
+        return cls.from_entries(seed if has_seed else None, puzzle_rows, entries, elapsed, pattern_attempts)
+
+    def __str__(self) -> str:
+        """
+        Displays the rows of the puzzle, one per line.
+        """
+        return "\n".join(self.rows)
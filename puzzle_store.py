@@ -0,0 +1,289 @@
+import argparse
+from contextlib import nullcontext
+import os
+import struct
+import sys
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+from batch import generate_batch
+from grid import GridSize, parse_grid_size
+from puzzle import RECORD_HEADER_FORMAT, Puzzle, get_pattern_hash
+
+"""Stores generated puzzles in an append-only binary file, indexed by size, pattern and seed"""
+
+DEFAULT_STORE_PATH: str = "puzzles.cwps"
+STORE_MAGIC: bytes = b"CWPS0001"
+INDEX_MAGIC: bytes = b"CWPI0001"
+RECORD_LENGTH_FORMAT: str = "<I" # Length of the packed puzzle that follows
+INDEX_ENTRY_FORMAT: str = "<QIHHQ?q" # offset of the record, its length, rows, cols, pattern hash, whether there is a seed, seed
+
+class IndexEntry(NamedTuple):
+    offset: int # Position of the packed puzzle in the store file, after its length
+    length: int # Length of the packed puzzle
+    rows: int
+    cols: int
+    pattern_hash: int # get_pattern_hash of the puzzle's black square pattern
+    seed: Optional[int]
+
+    def pack(self) -> bytes:
+        return struct.pack(INDEX_ENTRY_FORMAT, self.offset, self.length, self.rows, self.cols, self.pattern_hash, self.seed is not None, self.seed or 0)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "IndexEntry":
+        offset, length, rows, cols, pattern_hash, has_seed, seed = struct.unpack(INDEX_ENTRY_FORMAT, data)
+        return cls(offset, length, rows, cols, pattern_hash, seed if has_seed else None)
+
+def read_index_entry(record: bytes, offset: int) -> IndexEntry:
+    """
+    Indexes a packed puzzle from its header and black square mask, without unpacking its letters and entries.
+    """
+    rows, cols, has_seed, seed = struct.unpack_from(RECORD_HEADER_FORMAT, record)[:4]
+    mask_offset: int = struct.calcsize(RECORD_HEADER_FORMAT)
+    pattern: List[str] = [
+        "".join("#" if record[mask_offset + (index >> 3)] >> (index & 7) & 1 else "." for index in range(row * cols, (row + 1) * cols))
+        for row in range(rows)
+    ]
+    return IndexEntry(offset, len(record), rows, cols, get_pattern_hash(pattern), seed if has_seed else None)
+
+class PuzzleStore:
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH) -> None:
+        """
+        Opens the puzzle store at the given path, creating it if it doesn't exist. Puzzles are packed with
+        Puzzle.to_bytes and only ever appended to the store file, so a store can be written by a nightly batch
+        and read without generating anything again. The index of every record, at path + ".idx", is loaded
+        into memory to answer queries by size, pattern and seed.
+
+        A record is written before its index entry, so if a write is interrupted the index is caught up from
+        the store file the next time the store is opened, and a partly written record at its end is dropped.
+
+        Raises:
+            ValueError: If the file at the path isn't a puzzle store.
+        """
+        self.path: str = path
+        self.index_path: str = f"{path}.idx"
+        self.entries: List[IndexEntry] = []
+        self.by_size: Dict[Tuple[int, int], List[int]] = {} # Record ids of each size
+        self.by_pattern: Dict[int, List[int]] = {} # Record ids of each pattern hash
+        self.by_seed: Dict[int, List[int]] = {} # Record ids of each seed
+        self.store_file: BinaryIO = self.open_file(path, STORE_MAGIC)
+        self.index_file: BinaryIO = self.open_file(self.index_path, INDEX_MAGIC)
+        self.load_index()
+
+    def open_file(self, path: str, magic: bytes) -> BinaryIO:
+        """
+        Opens a file of the store for reading and appending, writing its magic number if it is new.
+        """
+        file: BinaryIO = open(path, "a+b")
+        file.seek(0)
+        found: bytes = file.read(len(magic))
+        if not found:
+            file.write(magic)
+            file.flush()
+        elif found != magic:
+            file.close()
+            raise ValueError(f"{path} isn't a puzzle store file")
+        return file
+
+    def load_index(self) -> None:
+        """
+        Reads the index file, then indexes any records of the store file that were written after it.
+        """
+        entry_size: int = struct.calcsize(INDEX_ENTRY_FORMAT)
+        self.index_file.seek(len(INDEX_MAGIC))
+        data: bytes = self.index_file.read()
+        store_size: int = os.path.getsize(self.path)
+        for start in range(0, len(data) - len(data) % entry_size, entry_size):
+            entry: IndexEntry = IndexEntry.unpack(data[start:start + entry_size])
+            if entry.offset + entry.length > store_size:
+                break
+            self.add_to_index(entry)
+        indexed_size: int = len(INDEX_MAGIC) + len(self.entries) * entry_size
+        if indexed_size < os.path.getsize(self.index_path):
+            # Drop index entries that were partly written or point past the end of the store file
+            self.index_file.truncate(indexed_size)
+        offset: int = self.entries[-1].offset + self.entries[-1].length if self.entries else len(STORE_MAGIC)
+        length_size: int = struct.calcsize(RECORD_LENGTH_FORMAT)
+        self.store_file.seek(offset)
+        new_entries: List[IndexEntry] = []
+        while True:
+            prefix: bytes = self.store_file.read(length_size)
+            if len(prefix) < length_size:
+                break
+            length: int = struct.unpack(RECORD_LENGTH_FORMAT, prefix)[0]
+            record: bytes = self.store_file.read(length)
+            if len(record) < length:
+                break
+            new_entries.append(read_index_entry(record, offset + length_size))
+            offset += length_size + length
+        if offset < store_size:
+            self.store_file.truncate(offset)
+        for entry in new_entries:
+            self.add_to_index(entry)
+            self.index_file.write(entry.pack())
+        self.index_file.flush()
+
+    def add_to_index(self, entry: IndexEntry) -> None:
+        record_id: int = len(self.entries)
+        self.entries.append(entry)
+        self.by_size.setdefault((entry.rows, entry.cols), []).append(record_id)
+        self.by_pattern.setdefault(entry.pattern_hash, []).append(record_id)
+        if entry.seed is not None:
+            self.by_seed.setdefault(entry.seed, []).append(record_id)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __enter__(self) -> "PuzzleStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.store_file.close()
+        self.index_file.close()
+
+    def append(self, puzzle: Puzzle) -> int:
+        """
+        Appends a puzzle to the store.
+
+        Returns:
+            int: The record id of the puzzle.
+        """
+        self.extend([puzzle])
+        return len(self.entries) - 1
+
+    def extend(self, puzzles: Iterable[Puzzle]) -> int:
+        """
+        Appends puzzles to the store, flushing the store file and then the index once at the end, which makes
+        writing a large batch much faster than appending its puzzles one at a time.
+
+        Returns:
+            int: The number of puzzles appended.
+        """
+        length_size: int = struct.calcsize(RECORD_LENGTH_FORMAT)
+        self.store_file.seek(0, os.SEEK_END)
+        offset: int = self.store_file.tell()
+        new_entries: List[IndexEntry] = []
+        for puzzle in puzzles:
+            record: bytes = puzzle.to_bytes()
+            rows, cols = puzzle.size
+            self.store_file.write(struct.pack(RECORD_LENGTH_FORMAT, len(record)) + record)
+            new_entries.append(IndexEntry(offset + length_size, len(record), rows, cols, puzzle.pattern_hash, puzzle.seed))
+            offset += length_size + len(record)
+        self.store_file.flush()
+        for entry in new_entries:
+            self.add_to_index(entry)
+        self.index_file.write(b"".join(entry.pack() for entry in new_entries))
+        self.index_file.flush()
+        return len(new_entries)
+
+    def find(self, rows: Optional[int] = None, cols: Optional[int] = None, pattern_hash: Optional[int] = None, seed: Optional[int] = None) -> List[int]:
+        """
+        Finds the records matching every given condition, using the narrowest index that applies.
+
+        Returns:
+            List[int]: The record ids, in the order the puzzles were stored.
+        """
+        candidates: List[List[int]] = []
+        if rows is not None and cols is not None:
+            candidates.append(self.by_size.get((rows, cols), []))
+        if pattern_hash is not None:
+            candidates.append(self.by_pattern.get(pattern_hash, []))
+        if seed is not None:
+            candidates.append(self.by_seed.get(seed, []))
+        record_ids: Iterable[int] = min(candidates, key = len) if candidates else range(len(self.entries))
+        return [
+            record_id for record_id in record_ids
+            if (rows is None or self.entries[record_id].rows == rows) and (cols is None or self.entries[record_id].cols == cols)
+            and (pattern_hash is None or self.entries[record_id].pattern_hash == pattern_hash) and (seed is None or self.entries[record_id].seed == seed)
+        ]
+
+    def get(self, record_id: int) -> Puzzle:
+        """
+        Reads one puzzle.
+
+        Raises:
+            IndexError: If there is no record with the id.
+        """
+        entry: IndexEntry = self.entries[record_id]
+        self.store_file.seek(entry.offset)
+        return Puzzle.from_bytes(self.store_file.read(entry.length))
+
+    def iterate(self, record_ids: Optional[Iterable[int]] = None) -> Iterator[Puzzle]:
+        """
+        Streams puzzles from the store, reading the store file sequentially when the records are consecutive,
+        so exporting a whole store never holds more than one puzzle in memory.
+
+        Args:
+            record_ids (Optional[Iterable[int]]): The records to read, such as the result of find. Defaults to every record.
+        """
+        length_size: int = struct.calcsize(RECORD_LENGTH_FORMAT)
+        with open(self.path, "rb", buffering = 1 << 20) as file:
+            position: int = -1 # Offset of the record after the last one read
+            for record_id in range(len(self.entries)) if record_ids is None else record_ids:
+                entry: IndexEntry = self.entries[record_id]
+                if entry.offset == position:
+                    file.read(length_size)
+                else:
+                    file.seek(entry.offset)
+                yield Puzzle.from_bytes(file.read(entry.length))
+                position = entry.offset + entry.length + length_size
+
+    def export_json_lines(self, output: TextIO, record_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Writes puzzles to a text file in the JSON lines format, one Puzzle.to_json_line per line.
+
+        Returns:
+            int: The number of puzzles written.
+        """
+        count: int = 0
+        for puzzle in self.iterate(record_ids):
+            output.write(puzzle.to_json_line())
+            output.write("\n")
+            count += 1
+        return count
+
+    def import_json_lines(self, lines: Iterable[str]) -> int:
+        """
+        Appends the puzzles of a JSON lines file, skipping blank lines.
+
+        Returns:
+            int: The number of puzzles appended.
+        """
+        return self.extend(Puzzle.from_json_line(line) for line in lines if line.strip())
+
+def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description = "Generate, import and export stored puzzles.")
+    parser.add_argument("command", choices = ["generate", "import", "export"], help = "generate a batch of puzzles into the store, import puzzles from JSON lines, or export them as JSON lines")
+    parser.add_argument("path", nargs = "?", default = DEFAULT_STORE_PATH, help = "path of the store")
+    parser.add_argument("--size", type = parse_grid_size, default = None, help = "size of the puzzles to generate (default 15) or export, a number of rows and columns or ROWSxCOLS")
+    parser.add_argument("--count", type = int, default = 100, help = "number of puzzles to generate")
+    parser.add_argument("--workers", type = int, default = None, help = "number of worker processes (defaults to the CPU count)")
+    parser.add_argument("--seed", type = int, default = None, help = "seed of the first puzzle to generate, or of the puzzles to export")
+    parser.add_argument("--pattern-hash", type = int, default = None, help = "pattern hash of the puzzles to export")
+    parser.add_argument("--file", default = None, metavar = "PATH", help = "JSON lines file to import from or export to (defaults to stdin or stdout)")
+    parser.add_argument("--word-list", default = "words_alpha.txt", help = "path of the word list")
+    return parser.parse_args(args)
+
+def main(args: Optional[List[str]] = None) -> None:
+    options: argparse.Namespace = parse_args(args)
+    with PuzzleStore(options.path) as store:
+        if options.command == "generate":
+            grid_size: GridSize = options.size or 15
+            added: int = store.extend(generate_batch(options.count, grid_size, options.workers, options.seed, options.word_list))
+            print(f"Added {added} puzzles to {options.path}, which has {len(store)}")
+        elif options.command == "import":
+            with open(options.file) if options.file else nullcontext(sys.stdin) as file:
+                added = store.import_json_lines(file)
+            print(f"Imported {added} puzzles into {options.path}, which has {len(store)}")
+        else:
+            rows, cols = (None, None)
+            if options.size is not None:
+                rows, cols = options.size if isinstance(options.size, tuple) else (options.size, options.size)
+            record_ids: List[int] = store.find(rows, cols, options.pattern_hash, options.seed)
+            with open(options.file, "w") if options.file else nullcontext(sys.stdout) as file:
+                store.export_json_lines(file, record_ids)
+
+if __name__ == "__main__":
+    main()
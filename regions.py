@@ -0,0 +1,141 @@
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+import multiprocessing
+import os
+import pickle
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Set, Tuple
+from fill_engine import Assignment, FillBudget, FillResult
+from word_list import WordFilter, WordList, get_shared_word_list
+
+if TYPE_CHECKING:
+    from grid import Grid
+
+"""Fills independent regions of a grid in worker processes, so that the regions split off by a fill are searched in parallel"""
+
+DEFAULT_MIN_REGION_SLOTS: int = 8
+
+class RegionTask(NamedTuple):
+    rows: List[str] # The grid as a template, with every cell outside the region's slots left empty turned into a black square
+    word_list_path: str # Absolute path of the grid's word list, and the settings it was loaded with
+    min_length: int
+    max_length: int
+    word_filters: Tuple[WordFilter, ...]
+    min_score: Optional[int]
+    shuffle_seed: int
+    use_compiled: bool
+    budget: FillBudget # The rest of the fill's budget
+    seed: int # Seed of the worker's grid: the grid's seed plus the index of the region
+    candidate_offsets: Dict[int, int] # The grid's candidate offsets, so that the worker tries candidates in the same order
+    slot_strategy: str
+    candidate_lookahead: int
+    lookahead_weight: float
+
+def fill_region(task: RegionTask) -> Tuple[FillResult, Optional[List[str]]]:
+    """
+    Fills the template of a region in a worker process.
+
+    Returns:
+        Tuple[FillResult, Optional[List[str]]]: The result of the worker's fill, whose counters are charged to the
+                                                    grid's fill, and the rows of the filled template if it succeeded.
+    """
+    from grid import Grid
+    word_list: WordList = get_shared_word_list(task.word_list_path, task.min_length, task.max_length, task.word_filters, task.min_score, task.shuffle_seed, task.use_compiled)
+    grid: Grid = Grid(pattern = task.rows, word_list = word_list, fill = False, seed = task.seed, slot_strategy = task.slot_strategy, candidate_lookahead = task.candidate_lookahead, lookahead_weight = task.lookahead_weight)
+    grid.candidate_offsets = task.candidate_offsets
+    grid.fill_words(task.slot_strategy, task.budget)
+    if not grid.fill_result.succeeded:
+        return grid.fill_result, None
+    return grid.fill_result, ["".join(cell.letter for cell in row) for row in grid.grid]
+
+class ParallelRegionSolver:
+
+    def __init__(self, executor: Executor, min_region_slots: int = DEFAULT_MIN_REGION_SLOTS) -> None:
+        """
+        Fills regions of a grid in the processes of an executor. Starting a task costs far more than filling
+        a few words, so only regions with at least min_region_slots slots are sent to the executor, and the
+        fill engine fills the smaller ones itself.
+
+        A worker only gets the letters of the grid, so a region filled by a worker doesn't share the nogoods
+        learnt by the grid's fill.
+        """
+        self.executor: Executor = executor
+        self.min_region_slots: int = min_region_slots
+
+    def check_word_list(self, word_list: WordList) -> None:
+        """
+        Checks that the settings of a word list can be sent to the workers, which load the same word list.
+
+        Raises:
+            ValueError: If a word filter can't be pickled, such as a lambda or a nested function.
+        """
+        for word_filter in word_list.word_filters:
+            try:
+                pickle.dumps(word_filter)
+            except (pickle.PicklingError, AttributeError, TypeError) as error:
+                raise ValueError(f"Word filters must be picklable to fill regions in worker processes, such as module-level functions: {word_filter!r} isn't ({error})") from error
+
+    def should_submit(self, slot_ids: List[int]) -> bool:
+        return len(slot_ids) >= self.min_region_slots
+
+    def create_template(self, grid: "Grid", slot_ids: List[int]) -> List[str]:
+        """
+        Describes a region as a grid template: the letters of the grid with "." for the empty cells of the
+        region's slots and "#" for every other empty cell. The runs of letters left from the other regions'
+        slots are already filled, so the worker's fill only searches the region.
+        """
+        region_cells: Set[int] = {cell for slot_id in slot_ids for cell in grid.slot_graph.slots[slot_id].cells}
+        letters: bytearray = grid._grid.letters
+        cells: List[str] = [chr(letter) if letter else "." if index in region_cells else "#" for index, letter in enumerate(letters)]
+        return ["".join(cells[row * grid.cols:(row + 1) * grid.cols]) for row in range(grid.rows)]
+
+    def submit(self, grid: "Grid", slot_ids: List[int], budget: FillBudget, slot_strategy: str, region_index: int) -> Future:
+        """
+        Starts filling a region of the grid in a worker process. The worker's grid is seeded from the grid's
+        seed and the index of the region, and tries candidates in the grid's order, so the region gets the
+        same fill as when the fill engine fills it itself.
+
+        Args:
+            region_index (int): The index of the region among the regions split off by the fill.
+
+        Returns:
+            Future: The future of fill_region, to be passed to collect.
+        """
+        word_list: WordList = grid.word_list
+        task: RegionTask = RegionTask(
+            self.create_template(grid, slot_ids), os.path.abspath(word_list.filename), word_list.min_length, word_list.max_length,
+            word_list.word_filters, word_list.min_score, word_list.seed, word_list.use_compiled, budget, (grid.seed or 0) + region_index,
+            grid.candidate_offsets, slot_strategy, grid.candidate_lookahead, grid.lookahead_weight
+        )
+        return self.executor.submit(fill_region, task)
+
+    def collect(self, grid: "Grid", slot_ids: List[int], future: Future, timeout: Optional[float] = None) -> Tuple[FillResult, Optional[Tuple[Assignment, ...]]]:
+        """
+        Waits for the fill of a region started by submit.
+
+        Args:
+            timeout (Optional[float]): The number of seconds to wait, such as the time left in the grid's budget.
+
+        Returns:
+            Tuple[FillResult, Optional[Tuple[Assignment, ...]]]: The result of the worker's fill, and the word of each
+                                                    of the region's slots if it succeeded.
+
+        Raises:
+            concurrent.futures.TimeoutError: If the fill hasn't finished within the timeout. The future can be
+                                                    collected again later.
+        """
+        result, rows = future.result(timeout)
+        if rows is None:
+            return result, None
+        letters: str = "".join(rows)
+        return result, tuple((slot_id, "".join(letters[cell] for cell in grid.slot_graph.slots[slot_id].cells)) for slot_id in slot_ids)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(cancel_futures = True)
+
+def create_region_solver(workers: Optional[int] = None, min_region_slots: int = DEFAULT_MIN_REGION_SLOTS) -> ParallelRegionSolver:
+    """
+    Creates a region solver backed by a pool of worker processes, forked where possible so that the
+    workers share the pages of word lists loaded before the first region is submitted.
+    """
+    methods: List[str] = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    return ParallelRegionSolver(ProcessPoolExecutor(workers, mp_context = context), min_region_slots)
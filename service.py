@@ -0,0 +1,438 @@
+import argparse
+import asyncio
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, replace
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+from typing import Callable, Deque, Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+from urllib.parse import parse_qs, urlsplit
+from batch import initialize_worker
+from compiled_word_list import DEFAULT_WORD_SCORE
+from grid import Grid, GridSize, parse_grid_size
+from puzzle import Puzzle
+from word_list import get_shared_word_list
+
+"""Serves puzzles over local HTTP from an asyncio front end, generating them in a pool of worker processes"""
+
+# Minimum word score of each difficulty. Easy puzzles only use words at least as common as an unscored word,
+# and hard puzzles use the whole word list. Every word of an unscored word list has the default score, so
+# only the default difficulty is served from one
+DIFFICULTY_MIN_SCORES: Dict[str, Optional[int]] = {"easy": DEFAULT_WORD_SCORE, "medium": DEFAULT_WORD_SCORE // 2, "hard": None}
+DEFAULT_DIFFICULTY: str = "hard"
+MAX_GRID_SIZE: int = 41
+DEFAULT_MAX_QUEUE: int = 64
+DEFAULT_TIMEOUT: float = 10.0
+DEFAULT_WARM_POOL_SIZE: int = 4
+MAX_POOL_FAILURES: int = 3 # Failed generations in a row after which a warm pool is no longer refilled
+DEFAULT_CACHE_SIZE: int = 1024
+DEFAULT_CACHE_TTL: float = 3600.0
+REQUEST_TIMEOUT: float = 5.0 # Seconds a client has to send its request line and headers
+# Queue priorities: client requests are always generated before warm pool refills
+CLIENT_PRIORITY: int = 0
+WARM_PRIORITY: int = 1
+HTTP_REASONS: Dict[int, str] = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+Key = TypeVar("Key")
+Value = TypeVar("Value")
+
+@dataclass(frozen = True)
+class PuzzleRequest:
+    rows: int
+    cols: int
+    seed: Optional[int] = None # Seed of the grid, or None for any puzzle of the size and difficulty
+    difficulty: str = DEFAULT_DIFFICULTY # A key of DIFFICULTY_MIN_SCORES
+
+    def __post_init__(self) -> None:
+        """
+        Rejects requests that can't be generated before they reach a worker.
+
+        Raises:
+            ValueError: If the size isn't odd and at most MAX_GRID_SIZE, or the difficulty is unknown.
+        """
+        for length in (self.rows, self.cols):
+            if length % 2 == 0 or not 3 <= length <= MAX_GRID_SIZE:
+                raise ValueError(f"Grid sizes must be odd numbers from 3 to {MAX_GRID_SIZE}, not {self.rows} x {self.cols}")
+        if self.difficulty not in DIFFICULTY_MIN_SCORES:
+            raise ValueError(f"Unknown difficulty {self.difficulty!r}, expected one of {', '.join(DIFFICULTY_MIN_SCORES)}")
+
+    @classmethod
+    def from_query(cls, query: str) -> "PuzzleRequest":
+        """
+        Parses the query string of a request, such as "size=15x21&seed=3&difficulty=easy". Every parameter
+        is optional.
+
+        Raises:
+            ValueError: If a parameter is malformed or describes a puzzle that can't be generated.
+        """
+        parameters: Dict[str, List[str]] = parse_qs(query)
+        grid_size: GridSize = parse_grid_size(parameters.get("size", ["15"])[0])
+        rows, cols = grid_size if isinstance(grid_size, tuple) else (grid_size, grid_size)
+        seed: Optional[int] = int(parameters["seed"][0]) if "seed" in parameters else None
+        return cls(rows, cols, seed, parameters.get("difficulty", [DEFAULT_DIFFICULTY])[0])
+
+    @property
+    def pool_key(self) -> Tuple[int, int, str]:
+        """
+        The warm pool that can serve the request if it has no seed.
+        """
+        return (self.rows, self.cols, self.difficulty)
+
+@dataclass
+class ServiceCounters:
+    requests: int = 0 # Number of puzzle requests received
+    cache_hits: int = 0 # Requests served from the result cache
+    warm_hits: int = 0 # Requests served from a warm pool
+    shared: int = 0 # Requests that waited for the generation of an identical request already in flight
+    generated: int = 0 # Puzzles generated by the workers, including warm pool refills
+    failures: int = 0 # Generations that raised an error, such as no pattern being fillable
+    rejected: int = 0 # Requests turned away because the queue was full
+    timeouts: int = 0 # Requests that gave up waiting for their puzzle
+
+class TTLCache(Generic[Key, Value]):
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE, ttl: float = DEFAULT_CACHE_TTL, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        A least recently used cache whose entries also expire ttl seconds after they were stored.
+        """
+        self.max_entries: int = max_entries
+        self.ttl: float = ttl
+        self.clock: Callable[[], float] = clock
+        self.entries: "OrderedDict[Key, Tuple[float, Value]]" = OrderedDict() # Expiry time and value of each key, most recently used last
+
+    def get(self, key: Key) -> Optional[Value]:
+        entry: Optional[Tuple[float, Value]] = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= self.clock():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: Key, value: Value) -> None:
+        self.entries[key] = (self.clock() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last = False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+def generate_service_puzzle(task: Tuple[PuzzleRequest, str]) -> Puzzle:
+    """
+    Generates the puzzle of a request with a seed in a worker process.
+
+    Args:
+        task (Tuple[PuzzleRequest, str]): The request and the word list path.
+
+    Raises:
+        RuntimeError: If no pattern could be filled.
+    """
+    request, word_list_path = task
+    start_time: float = time.perf_counter()
+    word_list = get_shared_word_list(word_list_path, min_score = DIFFICULTY_MIN_SCORES[request.difficulty])
+    grid: Grid = Grid((request.rows, request.cols), word_list = word_list, seed = request.seed)
+    return Puzzle.from_grid(grid, time.perf_counter() - start_time)
+
+class PuzzleService:
+
+    def __init__(self, word_list_path: str = "words_alpha.txt", workers: Optional[int] = None, max_queue: int = DEFAULT_MAX_QUEUE, timeout: Optional[float] = DEFAULT_TIMEOUT, warm_sizes: Tuple[GridSize, ...] = (15,), warm_pool_size: int = DEFAULT_WARM_POOL_SIZE, cache_size: int = DEFAULT_CACHE_SIZE, cache_ttl: float = DEFAULT_CACHE_TTL) -> None:
+        """
+        Generates puzzles for asyncio clients without blocking the event loop. Requests wait in a bounded
+        priority queue and are taken from it by one dispatcher per worker process, so at most one puzzle
+        per worker is being generated at a time. Once the queue is full new requests are rejected straight
+        away rather than piling up (back-pressure).
+
+        Generated puzzles are cached by request, so repeated requests for a seed are served from memory,
+        and identical requests in flight share one generation. Requests without a seed are served from a
+        warm pool of puzzles generated ahead of time for each of the warm sizes, which is refilled in the
+        background at a lower priority than client requests.
+
+        Args:
+            workers (Optional[int]): The number of worker processes. Defaults to the number of CPUs.
+            max_queue (int): The number of requests that may wait for a worker.
+            timeout (Optional[float]): The number of seconds a request waits for its puzzle. A puzzle that
+                                        isn't ready in time is still generated and cached for a retry.
+            warm_sizes (Tuple[GridSize, ...]): The sizes to keep warm pools of, at the default difficulty.
+            warm_pool_size (int): The number of puzzles kept in each warm pool.
+            cache_size (int): The number of puzzles kept in the result cache.
+            cache_ttl (float): The number of seconds a cached puzzle is served for.
+        """
+        self.word_list_path: str = word_list_path
+        self.workers: int = workers or os.cpu_count() or 1
+        self.max_queue: int = max_queue
+        self.timeout: Optional[float] = timeout
+        self.warm_pool_size: int = warm_pool_size
+        self.cache: TTLCache[PuzzleRequest, Puzzle] = TTLCache(cache_size, cache_ttl)
+        self.counters: ServiceCounters = ServiceCounters()
+        self.warm_pools: Dict[Tuple[int, int, str], Deque[Puzzle]] = {}
+        self.warm_pending: Dict[Tuple[int, int, str], int] = {} # Refills in flight for each warm pool
+        self.pool_failures: Dict[Tuple[int, int, str], int] = {} # Failed generations in a row for each warm pool
+        for grid_size in warm_sizes:
+            rows, cols = grid_size if isinstance(grid_size, tuple) else (grid_size, grid_size)
+            pool_key: Tuple[int, int, str] = PuzzleRequest(rows, cols).pool_key
+            self.warm_pools[pool_key] = deque()
+            self.warm_pending[pool_key] = 0
+            self.pool_failures[pool_key] = 0
+        self.in_flight: Dict[PuzzleRequest, asyncio.Future] = {}
+        self.sequence: Iterator[int] = itertools.count() # Keeps requests of the same priority in arrival order
+        self.queue: Optional[asyncio.PriorityQueue] = None
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.dispatchers: List[asyncio.Task] = []
+        self.scored: bool = False # Whether the word list has scores, which difficulties other than the default need
+        self.stopping: bool = False
+
+    async def start(self) -> None:
+        """
+        Starts the worker processes and dispatchers, and begins filling the warm pools.
+        """
+        # Load the word list before the pool starts, so that forked workers share its pages
+        self.scored = get_shared_word_list(self.word_list_path).has_scores()
+        self.stopping = False
+        methods: List[str] = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        self.executor = ProcessPoolExecutor(self.workers, mp_context = context, initializer = initialize_worker, initargs = (self.word_list_path,))
+        self.queue = asyncio.PriorityQueue(self.max_queue)
+        self.dispatchers = [asyncio.create_task(self.dispatch()) for _ in range(self.workers)]
+        for pool_key in self.warm_pools:
+            self.refill(pool_key)
+
+    async def stop(self) -> None:
+        """
+        Stops the dispatchers and worker processes. Requests that are still queued or being generated fail
+        with a RuntimeError, so that clients waiting for them without a timeout don't wait forever.
+        """
+        self.stopping = True
+        for dispatcher in self.dispatchers:
+            dispatcher.cancel()
+        await asyncio.gather(*self.dispatchers, return_exceptions = True)
+        self.dispatchers = []
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures = True)
+            self.executor = None
+        for future in list(self.in_flight.values()):
+            if not future.done():
+                future.set_exception(RuntimeError("The puzzle service stopped"))
+
+    def check_difficulty(self, request: PuzzleRequest) -> None:
+        """
+        Rejects difficulties other than the default if the word list has no scores, as they would give the
+        same puzzles as the default.
+
+        Raises:
+            ValueError: If the difficulty can't be told apart from the default.
+        """
+        if request.difficulty != DEFAULT_DIFFICULTY and not self.scored:
+            raise ValueError(f"The word list has no scores, so only the {DEFAULT_DIFFICULTY!r} difficulty is available")
+
+    async def get_puzzle(self, request: PuzzleRequest) -> Puzzle:
+        """
+        Serves a request from a warm pool (if it has no seed) or the result cache, and otherwise queues its
+        generation and waits for it.
+
+        Raises:
+            ValueError: If the request has a difficulty other than the default and the word list has no scores.
+            asyncio.QueueFull: If too many requests are already waiting for a worker.
+            asyncio.TimeoutError: If the puzzle isn't generated within the timeout.
+            RuntimeError: If no pattern of the request could be filled, or the service stops first.
+        """
+        self.check_difficulty(request)
+        self.counters.requests += 1
+        if request.seed is None:
+            pool: Optional[Deque[Puzzle]] = self.warm_pools.get(request.pool_key)
+            if pool:
+                self.counters.warm_hits += 1
+                puzzle: Puzzle = pool.popleft()
+                self.refill(request.pool_key)
+                return puzzle
+            request = replace(request, seed = random.randrange(2 ** 32))
+        cached: Optional[Puzzle] = self.cache.get(request)
+        if cached is not None:
+            self.counters.cache_hits += 1
+            return cached
+        future: Optional[asyncio.Future] = self.in_flight.get(request)
+        if future is None:
+            try:
+                future = self.submit(request, CLIENT_PRIORITY)
+            except asyncio.QueueFull:
+                self.counters.rejected += 1
+                raise
+        else:
+            self.counters.shared += 1
+        try:
+            # Shielded, so that a request giving up doesn't cancel a generation that others wait for
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.counters.timeouts += 1
+            raise
+
+    def submit(self, request: PuzzleRequest, priority: int) -> asyncio.Future:
+        """
+        Queues the generation of a request.
+
+        Raises:
+            asyncio.QueueFull: If the queue is full.
+        """
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((priority, next(self.sequence), request, future))
+        self.in_flight[request] = future
+        future.add_done_callback(lambda _: self.in_flight.pop(request, None))
+        return future
+
+    async def dispatch(self) -> None:
+        """
+        Takes requests from the queue and generates them in the worker processes, one at a time. Every
+        generated puzzle is cached, even if the requests for it have timed out. Warm pools are refilled after
+        each generation, but not once the dispatcher is cancelled.
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        while True:
+            _, _, request, future = await self.queue.get()
+            try:
+                puzzle: Puzzle = await loop.run_in_executor(self.executor, generate_service_puzzle, (request, self.word_list_path))
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                self.counters.failures += 1
+                if not future.done():
+                    future.set_exception(error)
+            else:
+                self.counters.generated += 1
+                self.cache.put(request, puzzle)
+                if not future.done():
+                    future.set_result(puzzle)
+            finally:
+                self.queue.task_done()
+            # A worker is free, so warm pools that couldn't be refilled while the queue was busy can be now
+            for pool_key in self.warm_pools:
+                self.refill(pool_key)
+
+    def refill(self, pool_key: Tuple[int, int, str]) -> None:
+        """
+        Queues generations for a warm pool until it would be full, as long as they take no more than half
+        of the queue, which is kept for client requests. Nothing is queued once the service is stopping.
+        """
+        if self.stopping or self.pool_failures[pool_key] >= MAX_POOL_FAILURES:
+            return
+        rows, cols, difficulty = pool_key
+        while len(self.warm_pools[pool_key]) + self.warm_pending[pool_key] < self.warm_pool_size and self.queue.qsize() < self.max_queue // 2:
+            future: asyncio.Future = self.submit(PuzzleRequest(rows, cols, random.randrange(2 ** 32), difficulty), WARM_PRIORITY)
+            self.warm_pending[pool_key] += 1
+            future.add_done_callback(lambda done, pool_key = pool_key: self.add_warm_puzzle(pool_key, done))
+
+    def add_warm_puzzle(self, pool_key: Tuple[int, int, str], future: asyncio.Future) -> None:
+        """
+        Adds a generated puzzle to its warm pool. A failed generation is retried by the next refill, but after
+        MAX_POOL_FAILURES failures in a row the pool is no longer refilled, so that a size that can't be filled
+        doesn't keep the workers busy.
+        """
+        self.warm_pending[pool_key] -= 1
+        if future.cancelled() or future.exception() is not None:
+            self.pool_failures[pool_key] += 1
+            return
+        self.pool_failures[pool_key] = 0
+        self.warm_pools[pool_key].append(future.result())
+
+    def get_stats(self) -> Dict:
+        return {
+            **asdict(self.counters),
+            "queued": self.queue.qsize() if self.queue else 0,
+            "cached": len(self.cache),
+            "warm_pools": {f"{rows}x{cols} {difficulty}": len(pool) for (rows, cols, difficulty), pool in self.warm_pools.items()}
+        }
+
+    async def route(self, method: str, target: str) -> Tuple[int, Dict]:
+        """
+        Answers an HTTP request:
+            GET /puzzle?size=15&seed=3&difficulty=easy returns a puzzle (every parameter is optional)
+            GET /stats returns the service counters
+
+        Returns:
+            Tuple[int, Dict]: The HTTP status and the JSON body.
+        """
+        if method != "GET":
+            return 405, {"error": f"{method} isn't supported"}
+        url = urlsplit(target)
+        if url.path == "/stats":
+            return 200, self.get_stats()
+        if url.path != "/puzzle":
+            return 404, {"error": f"No such path {url.path}"}
+        try:
+            request: PuzzleRequest = PuzzleRequest.from_query(url.query)
+            self.check_difficulty(request)
+        except ValueError as error:
+            return 400, {"error": str(error)}
+        try:
+            puzzle: Puzzle = await self.get_puzzle(request)
+        except asyncio.QueueFull:
+            return 503, {"error": "Too many requests are waiting, try again later"}
+        except asyncio.TimeoutError:
+            return 504, {"error": f"The puzzle wasn't generated within {self.timeout} seconds"}
+        except RuntimeError as error:
+            return 500, {"error": str(error)}
+        return 200, asdict(puzzle)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serves one HTTP/1.1 request per connection.
+        """
+        try:
+            try:
+                request_line: bytes = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+                while (await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)).strip():
+                    pass # Headers aren't used
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+            except (ValueError, asyncio.TimeoutError):
+                status, body = 400, {"error": "Malformed request"}
+            else:
+                status, body = await self.route(method, target)
+            content: bytes = json.dumps(body).encode()
+            writer.write(f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\nContent-Type: application/json\r\nContent-Length: {len(content)}\r\nConnection: close\r\n\r\n".encode() + content)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000) -> None:
+        """
+        Starts the service and serves HTTP requests until cancelled.
+        """
+        await self.start()
+        try:
+            server: asyncio.AbstractServer = await asyncio.start_server(self.handle_connection, host, port)
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.stop()
+
+def parse_args(args: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description = "Serve puzzles over HTTP.")
+    parser.add_argument("--host", default = "127.0.0.1", help = "address to listen on")
+    parser.add_argument("--port", type = int, default = 8000, help = "port to listen on")
+    parser.add_argument("--workers", type = int, default = None, help = "number of worker processes (defaults to the CPU count)")
+    parser.add_argument("--max-queue", type = int, default = DEFAULT_MAX_QUEUE, help = "number of requests that may wait for a worker before new ones are rejected")
+    parser.add_argument("--timeout", type = float, default = DEFAULT_TIMEOUT, help = "seconds a request waits for its puzzle")
+    parser.add_argument("--warm-sizes", type = parse_grid_size, nargs = "*", default = [15], help = "sizes to keep pre-generated puzzles of")
+    parser.add_argument("--warm-pool", type = int, default = DEFAULT_WARM_POOL_SIZE, help = "number of pre-generated puzzles kept per size")
+    parser.add_argument("--cache-size", type = int, default = DEFAULT_CACHE_SIZE, help = "number of generated puzzles kept in the cache")
+    parser.add_argument("--cache-ttl", type = float, default = DEFAULT_CACHE_TTL, help = "seconds a cached puzzle is served for")
+    parser.add_argument("--word-list", default = "words_alpha.txt", help = "path of the word list")
+    return parser.parse_args(args)
+
+def main(args: Optional[List[str]] = None) -> None:
+    options: argparse.Namespace = parse_args(args)
+    service: PuzzleService = PuzzleService(options.word_list, options.workers, options.max_queue, options.timeout, tuple(options.warm_sizes), options.warm_pool, options.cache_size, options.cache_ttl)
+    print(f"Serving puzzles on http://{options.host}:{options.port}/puzzle")
+    try:
+        asyncio.run(service.serve(options.host, options.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+from grid_state import GridState
+from word import Word
+
+"""Describes which slots of a black square pattern cross each other, built once when the pattern is numbered"""
+
+class Crossing(NamedTuple):
+    partner: int # Slot id of the crossing slot
+    index: int # Position of the shared cell in this slot
+    partner_index: int # Position of the shared cell in the crossing slot
+    cell: int # Position of the shared cell in the grid state's flat buffers
+
+@dataclass(frozen = True)
+class Slot:
+    id: int # Position of the slot in SlotGraph.slots
+    direction: str # across or down
+    number: int # Clue number of the slot
+    length: int
+    cells: Tuple[int, ...] # Positions of the slot's cells in the grid state's flat buffers
+    cell_slice: slice # The same positions as a slice, for reading and writing the whole line at once
+    crossings: Tuple[Crossing, ...] # Every crossing, in order of position in this slot
+
+class SlotGraph:
+
+    def __init__(self, state: GridState, words: Dict[str, Dict[int, Word]]) -> None:
+        """
+        Builds the slot graph of a numbered grid. Every word is given an integer slot id, across words in
+        numbering order followed by down words in numbering order, which is stored in Word.slot_id. The
+        graph is immutable, so the fill can follow crossings by id without looking up cells or directions.
+
+        Args:
+            state (GridState): The grid state, with num_across and num_down assigned.
+            words (Dict[str, Dict[int, Word]]): The words of the grid by direction and number.
+        """
+        self.words: Tuple[Word, ...] = tuple(word for direction in ("across", "down") for word in words[direction].values())
+        ids: Dict[Tuple[str, int], int] = {}
+        for slot_id, word in enumerate(self.words):
+            word.slot_id = slot_id
+            ids[(word.direction, word.number)] = slot_id
+        slots: List[Slot] = []
+        for word in self.words:
+            start_y, start_x = word.start_pos
+            start: int = start_y * state.cols + start_x
+            step: int = 1 if word.direction == "across" else state.cols
+            cells: Tuple[int, ...] = tuple(range(start, start + word.length * step, step))
+            if word.direction == "across":
+                crossing_numbers, crossing_direction = (state.num_down, "down")
+            else:
+                crossing_numbers, crossing_direction = (state.num_across, "across")
+            crossings: List[Crossing] = []
+            for index, cell in enumerate(cells):
+                if crossing_num := crossing_numbers[cell]:
+                    partner: Word = words[crossing_direction][crossing_num]
+                    partner_start: int = partner.start_pos[0] * state.cols + partner.start_pos[1]
+                    partner_index: int = (cell - partner_start) // (1 if partner.direction == "across" else state.cols)
+                    crossings.append(Crossing(ids[(crossing_direction, crossing_num)], index, partner_index, cell))
+            slots.append(Slot(word.slot_id, word.direction, word.number, word.length, cells, slice(start, start + word.length * step, step), tuple(crossings)))
+        self.slots: Tuple[Slot, ...] = tuple(slots)
+        self.ids: Dict[Tuple[str, int], int] = ids
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def get_slot_id(self, direction: str, number: int) -> int:
+        """
+        Returns the slot id of the word with the given direction and number.
+        """
+        return self.ids[(direction, number)]
+
+    def are_joined(self, slot_ids: List[int]) -> bool:
+        """
+        Checks whether the given unpopulated slots are joined to each other through crossings between
+        unpopulated slots. The search stops as soon as it has reached all of them, so slots that are joined
+        closely are cheap to check even in a large graph.
+        """
+        words: Tuple[Word, ...] = self.words
+        targets: Set[int] = set(slot_ids)
+        targets.discard(slot_ids[0])
+        seen: Set[int] = {slot_ids[0]}
+        slots_to_search: List[int] = [slot_ids[0]]
+        while slots_to_search:
+            for crossing in self.slots[slots_to_search.pop()].crossings:
+                partner: int = crossing.partner
+                if partner not in seen and not words[partner].populated:
+                    if partner in targets:
+                        targets.discard(partner)
+                        if not targets:
+                            return True
+                    seen.add(partner)
+                    slots_to_search.append(partner)
+        return not targets
+
+    def find_regions(self, slot_ids: Iterable[int]) -> List[List[int]]:
+        """
+        Groups the unpopulated slots among the given ones, along with every unpopulated slot joined to them,
+        into regions: sets of slots joined to each other through crossings between unpopulated slots. Slots
+        in different regions don't share any cell, so the regions can be filled independently.
+
+        Returns:
+            List[List[int]]: The slot ids of each region, in the order their first slot was given.
+        """
+        words: Tuple[Word, ...] = self.words
+        seen: Set[int] = set()
+        regions: List[List[int]] = []
+        for slot_id in slot_ids:
+            if slot_id in seen or words[slot_id].populated:
+                continue
+            seen.add(slot_id)
+            region: List[int] = [slot_id]
+            head: int = 0
+            while head < len(region):
+                for crossing in self.slots[region[head]].crossings:
+                    if crossing.partner not in seen and not words[crossing.partner].populated:
+                        seen.add(crossing.partner)
+                        region.append(crossing.partner)
+                head += 1
+            regions.append(region)
+        return regions
@@ -0,0 +1,23 @@
+from typing import List
+import pytest
+from batch import generate_batch, generate_puzzle
+from conftest import WORDS
+from puzzle import Puzzle
+
+"""Tests of batch generation across worker processes"""
+
+def test_batch_yields_every_seed(word_list_path: str) -> None:
+    puzzles: List[Puzzle] = list(generate_batch(4, 3, workers = 2, base_seed = 10, word_list_path = word_list_path))
+    assert sorted(puzzle.seed for puzzle in puzzles) == [10, 11, 12, 13]
+    for puzzle in puzzles:
+        assert all(word in WORDS for word in [*puzzle.across.values(), *puzzle.down.values()])
+        assert all(len(row) == 3 for row in puzzle.rows)
+
+def test_puzzle_depends_only_on_seed(word_list_path: str) -> None:
+    first: Puzzle = generate_puzzle((3, 12, word_list_path))
+    second: Puzzle = generate_puzzle((3, 12, word_list_path))
+    assert (first.rows, first.across, first.down) == (second.rows, second.across, second.down)
+
+def test_unusable_size_rejected_before_submitting(word_list_path: str) -> None:
+    with pytest.raises(ValueError, match = "odd number"):
+        next(generate_batch(4, (3, 4), workers = 1, base_seed = 10, word_list_path = word_list_path))
@@ -0,0 +1,37 @@
+import copy
+from pathlib import Path
+from typing import Dict
+import pytest
+from benchmark import PHASES, RunResult, compare_reports, get_percentile, run_benchmarks, run_once
+
+"""Tests of the benchmark harness"""
+
+def test_percentiles() -> None:
+    assert get_percentile([3.0, 1.0, 2.0], 50) == 2.0
+    assert get_percentile([1.0, 2.0], 90) == pytest.approx(1.9)
+    assert get_percentile([5.0], 99) == 5.0
+
+def test_report(word_list_path: str) -> None:
+    report: Dict = run_benchmarks([3], ["legacy"], [1, 2], word_list_path)
+    summary: Dict = report["cases"]["3x3-legacy"]["summary"]
+    assert (summary["runs"], summary["succeeded"]) == (2, 2)
+    assert summary["nodes"] >= 4
+    assert set(summary["phase_times"]) == set(PHASES)
+    assert all(time >= 0 for time in summary["phase_times"].values())
+    assert summary["peak_memory"] > 0
+    assert [run["seed"] for run in report["cases"]["3x3-legacy"]["runs"]] == [1, 2]
+
+def test_regression_flagged(word_list_path: str) -> None:
+    report: Dict = run_benchmarks([3], ["legacy"], [1], word_list_path, measure_memory = False)
+    baseline: Dict = copy.deepcopy(report)
+    assert not compare_reports(report, baseline)[0]["regression"]
+    baseline["cases"]["3x3-legacy"]["summary"]["wall_time"]["p50"] /= 2
+    assert compare_reports(report, baseline, 0.5)[0]["regression"]
+
+def test_failed_run_reports_counters(word_list_path: str) -> None:
+    # One word per length can't fill a 5 x 5 pattern, but each fill still places some words before failing
+    Path(word_list_path).write_text("abc\nabcd\nabcde\n")
+    result: RunResult = run_once(5, 1, False, word_list_path)
+    assert not result.succeeded
+    assert result.nodes > 0 and result.retries > 0
+    assert result.phase_times["fill"] > 0
@@ -0,0 +1,66 @@
+import random
+from typing import List
+import pytest
+from conftest import assert_valid_pattern
+from connectivity import WhiteCellConnectivity
+from grid import Grid
+from grid_state import GridState
+
+"""Tests of the connectivity checks made while patterns are generated"""
+
+def create_state(pattern: List[str]) -> GridState:
+    state: GridState = GridState(len(pattern), len(pattern[0]))
+    for index, character in enumerate("".join(pattern)):
+        state.set_letter(index, "#" if character == "#" else None)
+    return state
+
+def count_word_regions(state: GridState) -> int:
+    """
+    Counts the regions of white cells that can hold a word, by flood filling from every white cell.
+    """
+    connectivity: WhiteCellConnectivity = WhiteCellConnectivity(state)
+    seen: set = set()
+    regions: int = 0
+    for start in range(len(state.letters)):
+        if state.blocks[start] or start in seen:
+            continue
+        region: List[int] = [start]
+        seen.add(start)
+        for cell in region:
+            for neighbour in connectivity.get_white_neighbours(cell):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    region.append(neighbour)
+        regions += connectivity.can_hold_word(region)
+    return regions
+
+def test_is_connected() -> None:
+    assert WhiteCellConnectivity(create_state(["...", ".#.", "..."])).is_connected()
+    assert not WhiteCellConnectivity(create_state(["...", "###", "..."])).is_connected()
+    assert not WhiteCellConnectivity(create_state(["###"])).is_connected()
+
+def test_split_detected() -> None:
+    state: GridState = create_state(["....", "#.##", "...."])
+    connectivity: WhiteCellConnectivity = WhiteCellConnectivity(state)
+    assert not connectivity.add_black_square(1, 1)
+    assert state[1][1].letter == "#"
+
+def test_cut_off_pocket_allowed() -> None:
+    connectivity: WhiteCellConnectivity = WhiteCellConnectivity(create_state([".#...", ".#...", "#...."]))
+    assert connectivity.add_black_square(2, 1)
+
+@pytest.mark.parametrize("seed", range(20))
+def test_agrees_with_flood_fill(seed: int) -> None:
+    rng: random.Random = random.Random(seed)
+    state: GridState = create_state(["." * 7] * 7)
+    connectivity: WhiteCellConnectivity = WhiteCellConnectivity(state)
+    for _ in range(30):
+        row, col = rng.randrange(7), rng.randrange(7)
+        joined: bool = connectivity.add_black_square(row, col)
+        assert joined == (count_word_regions(state) <= 1)
+        if not joined:
+            break
+
+@pytest.mark.parametrize("seed", range(5))
+def test_generated_patterns_are_valid(word_list_path: str, seed: int) -> None:
+    assert_valid_pattern(Grid(9, fill = False, seed = seed, vectorised_patterns = False).get_pattern(), 9)
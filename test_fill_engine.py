@@ -0,0 +1,105 @@
+from pathlib import Path
+from typing import Dict, List, Tuple
+import pytest
+from conftest import WORDS, assert_valid_fill, create_grid
+from fill_engine import FillBudget, FillStatus
+from grid import Grid
+
+"""Tests of the iterative fill engine and its search budget"""
+
+@pytest.fixture
+def grid(word_list_path: str) -> Grid:
+    """
+    A generated grid whose words have been erased again, ready to be filled.
+    """
+    grid: Grid = create_grid()
+    clear_grid(grid)
+    grid.initialize_domains()
+    return grid
+
+def clear_grid(grid: Grid) -> None:
+    for direction in ("across", "down"):
+        for word in grid.words[direction].values():
+            if word.populated:
+                grid.erase_word(direction, word.number, word.length, *word.start_pos)
+    for row in grid.grid:
+        for cell in row:
+            if cell.letter != "#":
+                cell.letter = None
+
+def get_word_cells(grid: Grid) -> List[List[Tuple[int, int]]]:
+    return [
+        [(word.start_pos[0] + i * (direction == "down"), word.start_pos[1] + i * (direction == "across")) for i in range(word.length)]
+        for direction in ("across", "down") for word in grid.words[direction].values()
+    ]
+
+def has_fill(word_cells: List[List[Tuple[int, int]]], letters: Dict[Tuple[int, int], str]) -> bool:
+    """
+    Searches every assignment of words to the slots by brute force, without any pruning beyond the letters
+    placed so far.
+    """
+    if not word_cells:
+        return True
+    cells: List[Tuple[int, int]] = word_cells[0]
+    for word in WORDS:
+        if len(word) == len(cells) and all(letters.get(cell, letter) == letter for cell, letter in zip(cells, word)):
+            if has_fill(word_cells[1:], {**letters, **dict(zip(cells, word))}):
+                return True
+    return False
+
+def test_fill_succeeds(grid: Grid) -> None:
+    result = grid.fill_words()
+    assert result.status is FillStatus.SUCCESS
+    assert result.nodes >= 4
+    assert_valid_fill(grid)
+
+def test_node_budget_resumes(grid: Grid) -> None:
+    result = grid.fill_words(fill_budget = FillBudget(max_nodes = 1))
+    assert result.status is FillStatus.BUDGET_EXHAUSTED
+    assert result.nodes == 1
+    grid.fill_engine.budget = FillBudget()
+    result = grid.fill_engine.run()
+    assert result.status is FillStatus.SUCCESS
+    assert_valid_fill(grid)
+
+def test_time_budget(grid: Grid) -> None:
+    assert grid.fill_words(fill_budget = FillBudget(time_limit = 0)).status is FillStatus.BUDGET_EXHAUSTED
+
+def test_unsatisfiable(grid: Grid) -> None:
+    word = next(iter(grid.words["across"].values()))
+    row, col = word.start_pos
+    grid.grid[row][col].letter = "z"
+    grid.initialize_domains()
+    result = grid.fill_words()
+    assert result.status is FillStatus.UNSATISFIABLE
+    assert result.nodes == 0
+
+def test_pattern_attempts_exhausted(word_list_path: str) -> None:
+    Path(word_list_path).write_text("abcd\n")
+    with pytest.raises(RuntimeError):
+        create_grid(max_pattern_attempts = 5)
+
+def test_backjumping_agrees_with_brute_force(grid: Grid) -> None:
+    """
+    Fixes one letter of the grid at a time and checks that the fill engine, with backjumping and nogoods,
+    finds a fill exactly when one exists.
+    """
+    word_cells: List[List[Tuple[int, int]]] = get_word_cells(grid)
+    white_cells: List[Tuple[int, int]] = sorted({cell for cells in word_cells for cell in cells})
+    outcomes: List[FillStatus] = []
+    for cell in white_cells:
+        for letter in "abcerot":
+            clear_grid(grid)
+            grid.grid[cell[0]][cell[1]].letter = letter
+            grid.initialize_domains()
+            status: FillStatus = grid.fill_words().status
+            assert status is (FillStatus.SUCCESS if has_fill(word_cells, {cell: letter}) else FillStatus.UNSATISFIABLE)
+            outcomes.append(status)
+    assert FillStatus.SUCCESS in outcomes and FillStatus.UNSATISFIABLE in outcomes
+
+def test_nogoods_kept_across_fills(grid: Grid) -> None:
+    for _ in range(3):
+        clear_grid(grid)
+        grid.initialize_domains()
+        assert grid.fill_words().status is FillStatus.SUCCESS
+        assert_valid_fill(grid)
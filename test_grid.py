@@ -0,0 +1,111 @@
+from typing import List
+import pytest
+from conftest import assert_valid_fill, assert_valid_pattern, create_grid
+from grid import Grid, parse_grid_size
+from pattern_generator import NUMPY_AVAILABLE
+from word_list import WordList
+
+"""Tests of filling generated grids"""
+
+@pytest.fixture
+def grid(word_list_path: str) -> Grid:
+    return create_grid()
+
+def test_fill_is_valid(grid: Grid) -> None:
+    assert_valid_fill(grid)
+
+def test_narrowed_domain_is_restored(grid: Grid) -> None:
+    word = next(iter(grid.words["across"].values()))
+    domain: int = grid.word_list.get_full_bitset(3)
+    word.domain = domain
+    trail_mark: int = len(grid.domain_trail)
+    assert grid.narrow_domain(word, 0, "t")
+    assert set(grid.word_list.iterate_bitset(3, word.domain)) == {"tar", "tea", "tee"}
+    assert not grid.narrow_domain(word, 1, "o")
+    assert word.domain == 0
+    grid.restore_domains(trail_mark)
+    assert word.domain == domain
+
+@pytest.mark.parametrize("slot_strategy", ["most_constrained", "alternating"])
+def test_slot_strategies_fill(word_list_path: str, slot_strategy: str) -> None:
+    assert_valid_fill(create_grid(slot_strategy = slot_strategy))
+
+def test_most_constrained_word_selected(grid: Grid) -> None:
+    words = [word for direction in ("across", "down") for word in grid.words[direction].values()]
+    for word in words:
+        word.populated = False
+        word.domain = grid.word_list.get_full_bitset(3)
+    words[-1].domain = grid.word_list.get_letter_bitset(3, 0, "t")
+    assert grid.select_most_constrained_word() is words[-1]
+    for word in words:
+        word.populated = True
+    assert grid.select_most_constrained_word() is None
+
+def test_unknown_slot_strategy(grid: Grid) -> None:
+    with pytest.raises(ValueError):
+        grid.get_slot_selector("random")
+
+def test_given_pattern_filled(word_list_path: str) -> None:
+    grid: Grid = Grid(3, pattern = ["...", "...", "..."])
+    assert grid.fill_result.succeeded
+    assert grid.get_pattern() == ["...", "...", "..."]
+    assert_valid_fill(grid)
+
+def test_pattern_without_fill(word_list_path: str) -> None:
+    grid: Grid = Grid(3, pattern = [".#.", "...", ".#."], fill = False)
+    assert grid.get_pattern() == [".#.", "...", ".#."]
+    assert all(cell.letter in ("#", None) for row in grid.grid for cell in row)
+
+def get_letters(grid: Grid) -> List[str]:
+    return ["".join(cell.letter for cell in row) for row in grid.grid]
+
+@pytest.mark.parametrize("seed", [3, 7, 11])
+def test_seed_replays_grid(word_list_path: str, seed: int) -> None:
+    first: Grid = Grid(3, pattern = ["...", "...", "..."], seed = seed)
+    second: Grid = Grid(3, pattern = ["...", "...", "..."], word_list = WordList(word_list_path, use_compiled = False), seed = seed)
+    assert first.seed == second.seed == seed
+    assert get_letters(first) == get_letters(second)
+
+def test_grid_seed_recorded(word_list_path: str) -> None:
+    assert isinstance(Grid(3, pattern = ["...", "...", "..."]).seed, int)
+
+def test_no_output_while_generating(word_list_path: str, capsys: pytest.CaptureFixture) -> None:
+    grid: Grid = create_grid()
+    assert capsys.readouterr().out == ""
+    grid.display_grid()
+    assert capsys.readouterr().out == grid.render_grid() + "\n"
+
+def test_observer_events(word_list_path: str) -> None:
+    events: List[str] = []
+    create_grid(observer = lambda grid, event: events.append(event), progress_interval = 1)
+    assert events[0] == "pattern"
+    assert "progress" in events
+    assert events[-1] == "filled"
+
+def test_parse_grid_size() -> None:
+    assert parse_grid_size("15") == 15
+    assert parse_grid_size("21x41") == (21, 41)
+    with pytest.raises(ValueError):
+        parse_grid_size("wide")
+
+@pytest.mark.parametrize("vectorised_patterns", [False, pytest.param(True, marks = pytest.mark.skipif(not NUMPY_AVAILABLE, reason = "NumPy isn't installed"))])
+def test_rectangular_patterns(word_list_path: str, vectorised_patterns: bool) -> None:
+    grid: Grid = Grid((7, 21), fill = False, seed = 5, vectorised_patterns = vectorised_patterns, word_list = WordList(word_list_path, max_length = 8), max_slot_length = 8)
+    pattern: List[str] = grid.get_pattern()
+    assert (len(pattern), len(pattern[0])) == (7, 21)
+    assert_valid_pattern(pattern, 8)
+
+def test_even_size_rejected(word_list_path: str) -> None:
+    with pytest.raises(ValueError):
+        Grid((8, 9), fill = False, seed = 1)
+
+def test_given_rectangular_pattern(word_list_path: str) -> None:
+    grid: Grid = Grid(pattern = ["...#...", "...#..."], fill = False)
+    assert (grid.rows, grid.cols) == (2, 7)
+    assert [word.length for word in grid.words["across"].values()] == [3, 3, 3, 3]
+
+def test_candidate_lookahead_fill_is_valid(word_list_path: str) -> None:
+    assert_valid_fill(create_grid(candidate_lookahead = 4))
+
+def test_numpy_generator_only_when_asked(word_list_path: str) -> None:
+    assert create_grid(fill = False).pattern_generator is None
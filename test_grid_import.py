@@ -0,0 +1,65 @@
+import json
+from pathlib import Path
+import re
+from typing import List
+import pytest
+from conftest import WORDS, assert_valid_fill
+from crossword import main
+from fill_engine import FillStatus
+from grid import Grid
+from grid_import import GridTemplate, LockedWord, fill_template, load_template, parse_json_template, parse_text_template
+from word_list import WordList
+
+"""Tests of importing and filling partially filled grids"""
+
+def get_rows(grid: Grid) -> List[str]:
+    return ["".join(cell.letter or "." for cell in row) for row in grid.grid]
+
+def test_filled_letters_kept(word_list_path: str) -> None:
+    grid: Grid = fill_template(parse_text_template("e..\n...\n..a\n"), word_list = WordList(word_list_path), seed = 1)
+    assert grid.fill_result.status is FillStatus.SUCCESS
+    assert_valid_fill(grid)
+    assert get_rows(grid)[0][0] == "e" and get_rows(grid)[2][2] == "a"
+
+def test_locked_word_outside_word_list(word_list_path: str) -> None:
+    template: GridTemplate = parse_json_template(json.dumps({"rows": ["...", "...", "..."], "locked": [{"row": 0, "col": 0, "direction": "across", "word": "zzz"}]}))
+    grid: Grid = fill_template(template, word_list = WordList(word_list_path), seed = 1)
+    assert get_rows(grid)[0] == "zzz"
+    assert grid.fill_result.status is FillStatus.UNSATISFIABLE
+
+def test_locked_word_must_fit(word_list_path: str) -> None:
+    with pytest.raises(ValueError):
+        fill_template(GridTemplate(["...", "...", "..."], [LockedWord(0, 1, "across", "tea")]), word_list = WordList(word_list_path))
+
+def test_upper_case_letters_fill(word_list_path: str) -> None:
+    template: GridTemplate = GridTemplate(["T..", "...", "..."], [LockedWord(1, 0, "across", "ERA")])
+    assert template.rows[0] == "t.." and template.locked_words[0].word == "era"
+    grid: Grid = fill_template(template, word_list = WordList(word_list_path), seed = 1)
+    assert grid.fill_result.status is FillStatus.SUCCESS
+    assert get_rows(grid)[1] == "era" and all(word.word in WORDS for word in grid.slot_graph.words)
+
+@pytest.mark.parametrize("rows", [["..#..", "....."], ["abc#e"]])
+def test_uncovered_cells_rejected(rows: List[str]) -> None:
+    with pytest.raises(ValueError, match = "isn't part of any word"):
+        GridTemplate(rows)
+
+def test_invalid_templates_rejected() -> None:
+    with pytest.raises(ValueError):
+        GridTemplate(["...", ".."])
+    with pytest.raises(ValueError):
+        GridTemplate(["...", "...", "..é"])
+    with pytest.raises(ValueError):
+        parse_json_template(json.dumps({"rows": ["..."], "locked": [{"row": 0}]}))
+
+def test_word_longer_than_word_list_rejected(word_list_path: str) -> None:
+    with pytest.raises(ValueError, match = "4 letter word"):
+        fill_template(parse_text_template("....\n"), word_list = WordList(word_list_path, max_length = 3))
+
+def test_command_line_sizes_word_list(word_list_path: str, tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    # A 17 letter word is longer than the default word list length of 15
+    Path(word_list_path).write_text("\n".join(WORDS + ["abcdefghijklmnopq"]) + "\n")
+    template_path: Path = tmp_path / "long.txt"
+    template_path.write_text("abcdefghijklmno..\n")
+    main(["--import", str(template_path), "--word-list", word_list_path, "--seed", "1"])
+    assert "abcdefghijklmnopq" in re.sub(r"\x1b\[[0-9;]*m| ", "", capsys.readouterr().out)
+    assert load_template(str(template_path)).rows == ["abcdefghijklmno.."]
@@ -0,0 +1,34 @@
+import pytest
+from grid_state import GridState
+
+"""Tests of the flat grid buffers and their cell views"""
+
+def test_cell_views_write_buffers() -> None:
+    state: GridState = GridState(2, 3)
+    state[1][2].letter = "a"
+    state[0][0].letter = "#"
+    state[1][2].numbering = 4
+    state[1][2].num_across = 4
+    assert state.letters[5] == ord("a")
+    assert state.blocks[0] == 1 and state.blocks[5] == 0
+    assert state.numbering[5] == 4
+    assert state[1][-1].letter == "a"
+    assert state[1][-1].num_across == 4
+    assert state[0][1].letter is None and state[0][1].numbering is None
+
+def test_black_square_mask_follows_letters() -> None:
+    state: GridState = GridState(1, 3)
+    state.set_letter(1, "#")
+    assert list(state.blocks) == [0, 1, 0]
+    state.set_letter(1, None)
+    assert list(state.blocks) == [0, 0, 0]
+    assert state[0][1].letter is None
+
+def test_rows_and_columns() -> None:
+    state: GridState = GridState(2, 3)
+    assert len(state) == 2 and len(state[0]) == 3
+    assert [cell.index for cell in state[1]] == [3, 4, 5]
+    with pytest.raises(IndexError):
+        state[2]
+    with pytest.raises(IndexError):
+        state[0][3]
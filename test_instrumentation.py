@@ -0,0 +1,38 @@
+import json
+from pathlib import Path
+from typing import Dict, List
+from conftest import create_grid
+from grid import Grid
+from instrumentation import SearchCounters, TraceRecorder
+
+"""Tests of the search counters and trace events"""
+
+def test_counters_follow_fill(word_list_path: str) -> None:
+    grid: Grid = create_grid()
+    counters: SearchCounters = grid.counters
+    assert counters.pattern_attempts == grid.pattern_attempts
+    assert counters.nodes >= len(grid.words)
+    assert counters.candidates_tested >= counters.nodes
+    assert counters.perpendicular_checks >= 1
+    assert counters.to_dict()["pattern_retries"] == counters.pattern_retries
+
+def test_most_backtracked_slots() -> None:
+    counters: SearchCounters = SearchCounters(slot_backtracks = {0: 2, 1: 7, 2: 4})
+    assert counters.get_most_backtracked_slots(2) == [(1, 7), (2, 4)]
+
+def test_chrome_trace(word_list_path: str, tmp_path: Path) -> None:
+    tracer: TraceRecorder = TraceRecorder(sample_interval = 1)
+    create_grid(tracer = tracer)
+    path: Path = tmp_path / "trace.json"
+    tracer.save(str(path))
+    events: List[Dict] = json.loads(path.read_text())["traceEvents"]
+    spans: List[str] = [event["name"] for event in events if event["ph"] == "X"]
+    assert "pattern" in spans and "fill" in spans
+    assert all({"name", "ph", "ts", "pid", "tid"} <= set(event) for event in events)
+    assert all(event["dur"] >= 0 for event in events if event["ph"] == "X")
+
+def test_trace_buffer_bounded() -> None:
+    tracer: TraceRecorder = TraceRecorder(max_events = 3)
+    for i in range(5):
+        tracer.instant("event", {"i": i})
+    assert [event["args"]["i"] for event in tracer.to_chrome_trace()["traceEvents"]] == [2, 3, 4]
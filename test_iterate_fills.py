@@ -0,0 +1,53 @@
+import itertools
+from typing import List, Set
+import pytest
+from conftest import WORDS
+from grid import Grid
+from puzzle import Puzzle
+from word_list import WordList
+
+"""Tests of Grid.iterate_fills against fills counted by brute force"""
+
+@pytest.fixture
+def word_list(word_list_path: str) -> WordList:
+    return WordList(word_list_path, use_compiled = False, max_length = 3)
+
+def count_word_squares() -> int:
+    """
+    Counts the 3 x 3 grids whose rows and columns are all words, by trying every choice of rows.
+    """
+    words: Set[str] = set(WORDS)
+    return sum(1 for rows in itertools.product(WORDS, repeat = 3) if all("".join(col) in words for col in zip(*rows)))
+
+def get_words(puzzle: Puzzle) -> List[str]:
+    return list(puzzle.across.values()) + list(puzzle.down.values())
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_every_fill_found(word_list: WordList, seed: int) -> None:
+    grid: Grid = Grid(pattern = ["...", "...", "..."], word_list = word_list, seed = seed)
+    fills: List[Puzzle] = list(grid.iterate_fills())
+    assert len(fills) == count_word_squares()
+    assert len({tuple(puzzle.rows) for puzzle in fills}) == len(fills)
+    for puzzle in fills:
+        assert all(word in WORDS for word in get_words(puzzle))
+
+def test_max_fills(word_list: WordList) -> None:
+    grid: Grid = Grid(pattern = ["...", "...", "..."], word_list = word_list, seed = 1)
+    assert len(list(grid.iterate_fills(5))) == 5
+
+def test_unique_entries(word_list: WordList) -> None:
+    grid: Grid = Grid(pattern = ["...", "...", "..."], word_list = word_list, seed = 1)
+    used: Set[str] = set()
+    fills: List[Puzzle] = list(grid.iterate_fills(unique_entries = True))
+    assert fills
+    for puzzle in fills:
+        words: Set[str] = set(get_words(puzzle))
+        assert not words & used
+        used |= words
+
+def test_skip_current_fill(word_list: WordList) -> None:
+    grid: Grid = Grid(pattern = ["...", "...", "..."], word_list = word_list, seed = 1)
+    current: List[str] = Puzzle.from_grid(grid).rows
+    fills: List[Puzzle] = list(grid.iterate_fills(skip_current_fill = True))
+    assert len(fills) == count_word_squares() - 1
+    assert all(puzzle.rows != current for puzzle in fills)
@@ -0,0 +1,32 @@
+from pathlib import Path
+import random
+import pytest
+from conftest import assert_valid_pattern
+from grid import Grid
+from pattern_generator import PatternGenerator
+
+"""Tests of the NumPy pattern generator"""
+
+pytest.importorskip("numpy")
+
+@pytest.mark.parametrize("size", [5, 9, 15])
+def test_patterns_are_valid(size: int) -> None:
+    generator: PatternGenerator = PatternGenerator(size, size, random.Random(size))
+    for _ in range(10):
+        assert_valid_pattern(generator.generate_pattern())
+    assert generator.candidates >= 10
+
+def test_max_word_length() -> None:
+    generator: PatternGenerator = PatternGenerator(15, 15, random.Random(1), max_word_length = 9)
+    for _ in range(5):
+        assert_valid_pattern(generator.generate_pattern(), 9)
+
+def test_patterns_replay_from_seed() -> None:
+    patterns = [PatternGenerator(15, 15, random.Random(4)).generate_pattern() for _ in range(2)]
+    assert patterns[0] == patterns[1]
+
+def test_grid_uses_generator(word_list_path: str) -> None:
+    # Patterns are limited to the longest word in the word list
+    Path(word_list_path).write_text("abc\nabcd\nabcde\n")
+    grid: Grid = Grid(5, fill = False, seed = 3, vectorised_patterns = True)
+    assert_valid_pattern(grid.get_pattern())
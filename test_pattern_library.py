@@ -0,0 +1,40 @@
+from pathlib import Path
+import random
+from grid import Grid
+from pattern_library import PatternLibrary
+
+"""Tests of the persistent pattern library"""
+
+SQUARE = ["...", "...", "..."]
+RING = ["...", ".#.", "..."]
+
+def test_patterns_deduplicated_and_rated(tmp_path: Path) -> None:
+    library: PatternLibrary = PatternLibrary(str(tmp_path / "patterns.json"))
+    assert library.add(SQUARE)
+    assert not library.add(list(SQUARE))
+    library.record_fill(SQUARE, True, 0.5)
+    library.record_fill(SQUARE, False, 2.0)
+    library.record_fill(SQUARE, True, 1.5)
+    library.record_fill(RING, False, 1.0)
+    assert len(library) == 2
+    record = library.get(SQUARE)
+    assert (record.attempts, record.successes, record.median_fill_time) == (3, 2, 1.0)
+    assert record.success_rate == 0.6
+    assert library.get_patterns(3, 3, min_success_rate = 0.5) == [record]
+
+def test_library_saved_and_loaded(tmp_path: Path) -> None:
+    path: str = str(tmp_path / "patterns.json")
+    library: PatternLibrary = PatternLibrary(path)
+    library.record_fill(SQUARE, True, 0.25)
+    library.save()
+    loaded: PatternLibrary = PatternLibrary(path)
+    assert loaded.records == library.records
+    assert loaded.sample(3, 3, random.Random(1)) == SQUARE
+    assert loaded.sample(5, 5, random.Random(1)) is None
+
+def test_grid_samples_and_records(word_list_path: str, tmp_path: Path) -> None:
+    library: PatternLibrary = PatternLibrary(str(tmp_path / "patterns.json"))
+    library.record_fill(SQUARE, True, 0.25)
+    grid: Grid = Grid(3, seed = 1, pattern_library = library)
+    assert grid.get_pattern() == SQUARE
+    assert library.get(SQUARE).attempts == 2
@@ -0,0 +1,27 @@
+from pathlib import Path
+from conftest import WORDS
+from portfolio import PortfolioResult, create_default_portfolio, solve_portfolio
+
+"""Tests of racing differently seeded fills of one pattern"""
+
+PATTERN = ["...", "...", "..."]
+
+def test_portfolio_fills_pattern(word_list_path: str) -> None:
+    entries = create_default_portfolio(4, 1)
+    assert [entry.slot_strategy for entry in entries] == ["most_constrained"] * 3 + ["alternating"]
+    result: PortfolioResult = solve_portfolio(PATTERN, entries, 30, word_list_path)
+    assert result.winner in entries
+    assert all(row in WORDS for row in result.puzzle.rows)
+    assert all("".join(col) in WORDS for col in zip(*result.puzzle.rows))
+
+def test_portfolio_without_fill(word_list_path: str) -> None:
+    Path(word_list_path).write_text("abc\n")
+    result: PortfolioResult = solve_portfolio(PATTERN, create_default_portfolio(2, 1), 30, word_list_path)
+    assert result.puzzle is None and result.winner is None
+
+def test_portfolio_entries_that_raise(word_list_path: str) -> None:
+    # The shared word list has no words longer than 15 letters, so every entry's Grid raises ValueError
+    result: PortfolioResult = solve_portfolio(["." * 17], create_default_portfolio(2, 1), 30, word_list_path)
+    assert result.puzzle is None and result.winner is None
+    # The race ends as soon as every entry has failed, rather than at the timeout
+    assert result.elapsed < 20
@@ -0,0 +1,46 @@
+import pytest
+from grid import Grid
+from puzzle import Entry, Puzzle
+from word_list import WordList
+
+"""Tests of the binary and JSON lines formats of puzzles"""
+
+@pytest.fixture
+def word_list(word_list_path: str) -> WordList:
+    return WordList(word_list_path, use_compiled = False, max_length = 3)
+
+def round_trip(puzzle: Puzzle) -> None:
+    assert Puzzle.from_bytes(puzzle.to_bytes()) == puzzle
+    assert Puzzle.from_json_line(puzzle.to_json_line()) == puzzle
+
+def test_filled_grid_round_trip(word_list: WordList) -> None:
+    grid: Grid = Grid(pattern = ["...", "...", "..."], word_list = word_list, seed = 1)
+    assert grid.fill_result.succeeded
+    puzzle: Puzzle = Puzzle.from_grid(grid, 0.25)
+    assert all(entry.word for entry in puzzle.entries)
+    round_trip(puzzle)
+
+def test_numbering_and_pattern() -> None:
+    rows = ["cat", "a#a", "tar"]
+    entries = [Entry(1, "across", 0, 0, "cat"), Entry(3, "across", 2, 0, "tar"), Entry(1, "down", 0, 0, "cat"), Entry(2, "down", 0, 2, "tar")]
+    puzzle: Puzzle = Puzzle.from_entries(None, rows, entries, 1.5, 3)
+    round_trip(puzzle)
+    assert puzzle.get_numbering() == [[1, 0, 2], [0, 0, 0], [3, 0, 0]]
+    assert puzzle.get_pattern() == ["...", ".#.", "..."]
+    assert puzzle.pattern_hash == Puzzle.from_entries(4, ["ace", "r#r", "eat"], []).pattern_hash
+
+def test_truncated_record() -> None:
+    data: bytes = Puzzle.from_entries(7, ["cat", "a#a", "tar"], [Entry(1, "across", 0, 0, "cat")]).to_bytes()
+    with pytest.raises(ValueError):
+        Puzzle.from_bytes(data[:-1])
+
+def test_unfilled_grid_round_trip(word_list: WordList) -> None:
+    puzzle: Puzzle = Puzzle.from_grid(Grid(pattern = ["...", ".#.", "..."], word_list = word_list, seed = 1, fill = False))
+    assert puzzle.rows == ["...", ".#.", "..."]
+    assert [entry.word for entry in puzzle.entries] == ["", "", "", ""]
+    round_trip(puzzle)
+
+def test_round_trip_with_empty_word() -> None:
+    rows = ["cat#", "a#ox", "red#"]
+    entries = [Entry(1, "across", 0, 0, "cat"), Entry(3, "across", 2, 0, "red"), Entry(1, "down", 0, 0, "car"), Entry(2, "down", 0, 1, "")]
+    round_trip(Puzzle.from_entries(None, rows, entries, 1.5, 3))
@@ -0,0 +1,83 @@
+import io
+import os
+from pathlib import Path
+from typing import List
+import pytest
+from puzzle import Entry, Puzzle
+from puzzle_store import PuzzleStore, main
+
+"""Tests of the puzzle store, and of how it recovers from interrupted writes"""
+
+def create_puzzles(count: int) -> List[Puzzle]:
+    rows = ["cat", "a#a", "tar"]
+    entries = [Entry(1, "across", 0, 0, "cat"), Entry(3, "across", 2, 0, "tar"), Entry(1, "down", 0, 0, "cat"), Entry(2, "down", 0, 2, "tar")]
+    return [Puzzle.from_entries(seed, rows, entries, seed / 10, 1) for seed in range(count)]
+
+def test_append_and_reopen(tmp_path: Path) -> None:
+    path: str = str(tmp_path / "puzzles.cwps")
+    puzzles: List[Puzzle] = create_puzzles(3)
+    with PuzzleStore(path) as store:
+        assert store.extend(puzzles) == 3
+    with PuzzleStore(path) as store:
+        assert list(store.iterate()) == puzzles
+        assert store.find(rows = 3, cols = 3) == [0, 1, 2]
+        assert store.find(seed = 1) == [1]
+        assert store.get(2) == puzzles[2]
+
+def test_json_lines_round_trip(tmp_path: Path) -> None:
+    puzzles: List[Puzzle] = create_puzzles(2)
+    output: io.StringIO = io.StringIO()
+    with PuzzleStore(str(tmp_path / "a.cwps")) as store:
+        store.extend(puzzles)
+        assert store.export_json_lines(output) == 2
+    with PuzzleStore(str(tmp_path / "b.cwps")) as store:
+        assert store.import_json_lines(output.getvalue().splitlines()) == 2
+        assert list(store.iterate()) == puzzles
+
+def test_index_catch_up(tmp_path: Path) -> None:
+    path: str = str(tmp_path / "puzzles.cwps")
+    puzzles: List[Puzzle] = create_puzzles(3)
+    with PuzzleStore(path) as store:
+        store.extend(puzzles[:1])
+        index_size: int = os.path.getsize(store.index_path)
+        store.extend(puzzles[1:])
+    # As if the process stopped after writing the records but before their index entries, one of which is half written
+    with open(f"{path}.idx", "r+b") as index_file:
+        index_file.truncate(index_size + 5)
+    with PuzzleStore(path) as store:
+        assert len(store) == 3
+        assert list(store.iterate()) == puzzles
+        assert store.find(seed = 2) == [2]
+    with PuzzleStore(path) as store:
+        assert len(store) == 3
+
+def test_partial_record_truncated(tmp_path: Path) -> None:
+    path: str = str(tmp_path / "puzzles.cwps")
+    puzzles: List[Puzzle] = create_puzzles(3)
+    with PuzzleStore(path) as store:
+        store.extend(puzzles[:2])
+        store_size: int = os.path.getsize(path)
+        index_size: int = os.path.getsize(store.index_path)
+        store.append(puzzles[2])
+    # As if the process stopped while writing the last record, before its index entry
+    with open(path, "r+b") as store_file:
+        store_file.truncate(store_size + 10)
+    with open(f"{path}.idx", "r+b") as index_file:
+        index_file.truncate(index_size)
+    with PuzzleStore(path) as store:
+        assert list(store.iterate()) == puzzles[:2]
+        assert os.path.getsize(path) == store_size
+        assert store.append(puzzles[2]) == 2
+    with PuzzleStore(path) as store:
+        assert list(store.iterate()) == puzzles
+
+def test_command_line_keeps_standard_streams_open(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path: str = str(tmp_path / "puzzles.cwps")
+    stdin: io.StringIO = io.StringIO("".join(puzzle.to_json_line() + "\n" for puzzle in create_puzzles(2)))
+    stdout: io.StringIO = io.StringIO()
+    monkeypatch.setattr("sys.stdin", stdin)
+    monkeypatch.setattr("sys.stdout", stdout)
+    main(["import", path])
+    main(["export", path])
+    assert not stdin.closed and not stdout.closed
+    assert [Puzzle.from_json_line(line) for line in stdout.getvalue().splitlines()[1:]] == create_puzzles(2)
@@ -0,0 +1,74 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+import pytest
+from conftest import assert_valid_fill
+from fill_engine import FillStatus
+from grid import Grid
+from regions import ParallelRegionSolver
+from word_list import WordList, get_shared_word_list
+
+"""Tests of filling independent regions of a grid separately"""
+
+# Two 3 x 3 blocks that don't share any word
+PATTERN: List[str] = ["...#...", "...#...", "...#..."]
+
+def get_letters(grid: Grid) -> List[str]:
+    return ["".join(cell.letter for cell in row) for row in grid.grid]
+
+def test_regions_found(word_list_path: str) -> None:
+    grid: Grid = Grid(pattern = PATTERN, fill = False, word_list = WordList(word_list_path))
+    regions: List[List[int]] = grid.slot_graph.find_regions(range(len(grid.slot_graph)))
+    assert sorted(len(region) for region in regions) == [6, 6]
+    left_cells = {cell for slot_id in regions[0] for cell in grid.slot_graph.slots[slot_id].cells}
+    right_cells = {cell for slot_id in regions[1] for cell in grid.slot_graph.slots[slot_id].cells}
+    assert not left_cells & right_cells
+
+@pytest.mark.parametrize("decompose_regions", [True, False])
+def test_regions_filled(word_list_path: str, decompose_regions: bool) -> None:
+    grid: Grid = Grid(pattern = PATTERN, word_list = WordList(word_list_path), seed = 4, decompose_regions = decompose_regions)
+    assert grid.fill_result.status is FillStatus.SUCCESS
+    assert_valid_fill(grid)
+
+def test_unfillable_region(word_list_path: str) -> None:
+    # No word ends in "z", so the right block can't be filled whatever the left block holds
+    grid: Grid = Grid(pattern = ["...#...", "...#...", "...#..z"], word_list = WordList(word_list_path), seed = 4)
+    assert grid.fill_result.status is FillStatus.UNSATISFIABLE
+
+def test_region_fills_not_shared_between_seeds(word_list_path: str) -> None:
+    word_list: WordList = WordList(word_list_path)
+    first: List[str] = get_letters(Grid(pattern = PATTERN, word_list = word_list, seed = 7))
+    Grid(pattern = PATTERN, word_list = word_list, seed = 11)
+    assert get_letters(Grid(pattern = PATTERN, word_list = word_list, seed = 7)) == first
+
+def test_regions_filled_by_workers(word_list_path: str) -> None:
+    solver: ParallelRegionSolver = ParallelRegionSolver(ThreadPoolExecutor(2), min_region_slots = 1)
+    try:
+        grid: Grid = Grid(pattern = PATTERN, word_list = get_shared_word_list(word_list_path), seed = 4, region_solver = solver)
+    finally:
+        solver.shutdown()
+    assert grid.fill_result.status is FillStatus.SUCCESS
+    assert_valid_fill(grid)
+    # The workers' placements are charged to the grid's fill
+    assert grid.fill_result.nodes >= 6 and grid.counters.nodes >= 6
+
+@pytest.mark.parametrize("seed", [1, 4, 9])
+def test_workers_give_same_fill(word_list_path: str, seed: int) -> None:
+    # A custom-seeded text word list, which the workers have to load with the same order
+    word_list: WordList = WordList(word_list_path, use_compiled = False, seed = 5)
+    expected: List[str] = get_letters(Grid(pattern = PATTERN, word_list = word_list, seed = seed))
+    solver: ParallelRegionSolver = ParallelRegionSolver(ThreadPoolExecutor(2), min_region_slots = 1)
+    try:
+        grid: Grid = Grid(pattern = PATTERN, word_list = word_list, seed = seed, region_solver = solver)
+    finally:
+        solver.shutdown()
+    assert grid.fill_result.status is FillStatus.SUCCESS
+    assert get_letters(grid) == expected
+
+def test_unpicklable_filters_rejected(word_list_path: str) -> None:
+    word_list: WordList = WordList(word_list_path, word_filters = (lambda word: "z" not in word,))
+    solver: ParallelRegionSolver = ParallelRegionSolver(ThreadPoolExecutor(1), min_region_slots = 1)
+    try:
+        with pytest.raises(ValueError, match = "picklable"):
+            Grid(pattern = PATTERN, word_list = word_list, seed = 4, region_solver = solver)
+    finally:
+        solver.shutdown()
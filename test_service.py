@@ -0,0 +1,149 @@
+import asyncio
+from pathlib import Path
+from typing import List
+import pytest
+from conftest import WORDS
+from puzzle import Puzzle
+from service import MAX_POOL_FAILURES, PuzzleRequest, PuzzleService, TTLCache
+
+"""Tests of the puzzle service, with 3 x 3 puzzles generated in a worker process"""
+
+def create_service(word_list_path: str, **service_options) -> PuzzleService:
+    return PuzzleService(word_list_path, workers = 1, timeout = 60, **service_options)
+
+async def wait_for_warm_pool(service: PuzzleService, pool_size: int) -> None:
+    while len(service.warm_pools[(3, 3, "hard")]) < pool_size:
+        await asyncio.sleep(0.01)
+
+def test_request_validation() -> None:
+    assert PuzzleRequest.from_query("size=5x7&seed=3&difficulty=easy") == PuzzleRequest(5, 7, 3, "easy")
+    assert PuzzleRequest.from_query("") == PuzzleRequest(15, 15)
+    for query in ("size=4", "size=43", "difficulty=impossible", "seed=x"):
+        with pytest.raises(ValueError):
+            PuzzleRequest.from_query(query)
+
+def test_cache_expires() -> None:
+    now: List[float] = [0.0]
+    cache: TTLCache[str, int] = TTLCache(max_entries = 2, ttl = 10, clock = lambda: now[0])
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    # "b" was the least recently used entry
+    assert cache.get("b") is None and len(cache) == 2
+    now[0] = 10
+    assert cache.get("a") is None
+
+def test_warm_pool_hit(word_list_path: str) -> None:
+    async def run() -> None:
+        service: PuzzleService = create_service(word_list_path, warm_sizes = (3,), warm_pool_size = 2)
+        await service.start()
+        try:
+            await asyncio.wait_for(wait_for_warm_pool(service, 2), 60)
+            puzzle: Puzzle = await service.get_puzzle(PuzzleRequest(3, 3))
+            assert service.counters.warm_hits == 1
+            assert all(word in WORDS for word in list(puzzle.across.values()) + list(puzzle.down.values()))
+            # The pool is refilled in the background
+            await asyncio.wait_for(wait_for_warm_pool(service, 2), 60)
+        finally:
+            await service.stop()
+    asyncio.run(run())
+
+def test_result_cache(word_list_path: str) -> None:
+    async def run() -> None:
+        service: PuzzleService = create_service(word_list_path, warm_sizes = ())
+        await service.start()
+        try:
+            first, shared = await asyncio.gather(service.get_puzzle(PuzzleRequest(3, 3, 5)), service.get_puzzle(PuzzleRequest(3, 3, 5)))
+            cached: Puzzle = await service.get_puzzle(PuzzleRequest(3, 3, 5))
+            assert first.rows == shared.rows == cached.rows and first.seed == 5
+            assert (service.counters.generated, service.counters.shared, service.counters.cache_hits) == (1, 1, 1)
+        finally:
+            await service.stop()
+    asyncio.run(run())
+
+def test_full_queue_rejects_requests(word_list_path: str) -> None:
+    async def run() -> None:
+        service: PuzzleService = create_service(word_list_path, warm_sizes = (), max_queue = 1)
+        await service.start()
+        try:
+            # The requests are queued before the dispatcher can take the first one
+            results = await asyncio.gather(*(service.route("GET", f"/puzzle?size=3&seed={seed}") for seed in range(3)))
+            assert [status for status, _ in results] == [200, 503, 503]
+            assert service.counters.rejected == 2
+        finally:
+            await service.stop()
+    asyncio.run(run())
+
+def test_stop_fails_waiting_requests(word_list_path: str) -> None:
+    async def run() -> None:
+        service: PuzzleService = PuzzleService(word_list_path, workers = 1, timeout = None, warm_sizes = ())
+        await service.start()
+        requests = [asyncio.create_task(service.get_puzzle(PuzzleRequest(3, 3, seed))) for seed in range(3)]
+        await asyncio.sleep(0)
+        await service.stop()
+        results = await asyncio.wait_for(asyncio.gather(*requests, return_exceptions = True), 10)
+        assert all(isinstance(result, (Puzzle, RuntimeError)) for result in results)
+        # With one worker, the last request is still queued when the service stops
+        assert isinstance(results[-1], RuntimeError)
+    asyncio.run(run())
+
+def test_stop_does_not_refill_warm_pools(word_list_path: str) -> None:
+    async def run() -> None:
+        # A pool that is never full, so the dispatcher would refill it after every generation
+        service: PuzzleService = create_service(word_list_path, warm_sizes = (3,), warm_pool_size = 100, max_queue = 2)
+        submitted_while_stopping: List[PuzzleRequest] = []
+        submit = service.submit
+        def record_submit(request: PuzzleRequest, priority: int) -> asyncio.Future:
+            if service.stopping:
+                submitted_while_stopping.append(request)
+            return submit(request, priority)
+        service.submit = record_submit
+        await service.start()
+        await asyncio.wait_for(wait_for_warm_pool(service, 2), 60)
+        await service.stop()
+        service.refill((3, 3, "hard"))
+        assert not submitted_while_stopping
+    asyncio.run(run())
+
+def test_difficulties_need_scores(word_list_path: str) -> None:
+    async def run() -> None:
+        service: PuzzleService = create_service(word_list_path, warm_sizes = ())
+        await service.start()
+        try:
+            status, body = await service.route("GET", "/puzzle?size=3&seed=1&difficulty=easy")
+            assert status == 400 and "no scores" in body["error"]
+            status, _ = await service.route("GET", "/puzzle?size=3&seed=1")
+            assert status == 200
+        finally:
+            await service.stop()
+    asyncio.run(run())
+
+def test_difficulties_with_scores(word_list_path: str) -> None:
+    # Every word is common enough for easy puzzles but one
+    Path(word_list_path).write_text("".join(f"{word};{60 if word != 'zoo' else 10}\n" for word in WORDS + ["zoo"]))
+    async def run() -> None:
+        service: PuzzleService = create_service(word_list_path, warm_sizes = ())
+        await service.start()
+        try:
+            puzzle: Puzzle = await service.get_puzzle(PuzzleRequest(3, 3, 1, "easy"))
+            assert all(word in WORDS for word in list(puzzle.across.values()) + list(puzzle.down.values()))
+        finally:
+            await service.stop()
+    asyncio.run(run())
+
+def test_warm_pool_retried_after_failure(word_list_path: str) -> None:
+    async def run() -> None:
+        service: PuzzleService = create_service(word_list_path, warm_sizes = (3,))
+        pool_key = (3, 3, "hard")
+        for _ in range(MAX_POOL_FAILURES - 1):
+            failed: asyncio.Future = asyncio.get_running_loop().create_future()
+            failed.set_exception(RuntimeError("Unable to fill a grid"))
+            service.warm_pending[pool_key] += 1
+            service.add_warm_puzzle(pool_key, failed)
+        generated: asyncio.Future = asyncio.get_running_loop().create_future()
+        generated.set_result(Puzzle(1, ["abc"]))
+        service.warm_pending[pool_key] += 1
+        service.add_warm_puzzle(pool_key, generated)
+        assert service.pool_failures[pool_key] == 0 and len(service.warm_pools[pool_key]) == 1
+    asyncio.run(run())
@@ -0,0 +1,23 @@
+from grid import Grid
+from slot_graph import SlotGraph
+
+"""Tests of the slot graph built when a grid is numbered"""
+
+def test_slot_graph(word_list_path: str) -> None:
+    grid: Grid = Grid(3, pattern = [".#.", "...", ".#."], fill = False)
+    graph: SlotGraph = grid.slot_graph
+    assert [(slot.direction, slot.number, slot.length) for slot in graph.slots] == [("across", 3, 3), ("down", 1, 3), ("down", 2, 3)]
+    assert graph.slots[0].cells == (3, 4, 5)
+    assert graph.slots[2].cells == (2, 5, 8)
+    assert [(crossing.partner, crossing.index, crossing.partner_index, crossing.cell) for crossing in graph.slots[0].crossings] == [(1, 0, 1, 3), (2, 2, 1, 5)]
+    assert graph.get_slot_id("down", 2) == 2
+    assert all(word.slot_id == slot_id for slot_id, word in enumerate(graph.words))
+
+def test_crossings_are_symmetric(word_list_path: str) -> None:
+    graph: SlotGraph = Grid(3, pattern = ["...", "...", "..."], fill = False).slot_graph
+    assert len(graph) == 6
+    for slot in graph.slots:
+        assert len(slot.crossings) == 3
+        for crossing in slot.crossings:
+            assert slot.cells[crossing.index] == crossing.cell == graph.slots[crossing.partner].cells[crossing.partner_index]
+            assert any(back.partner == slot.id and back.cell == crossing.cell for back in graph.slots[crossing.partner].crossings)
@@ -0,0 +1,110 @@
+import os
+from pathlib import Path
+from typing import List, Optional
+import pytest
+from compiled_word_list import get_compiled_path
+from conftest import WORDS
+from word_list import WordList, get_shared_word_list
+
+"""Tests of the word list and its positional letter index"""
+
+@pytest.fixture
+def word_list(word_list_path: str) -> WordList:
+    return WordList(word_list_path)
+
+@pytest.mark.parametrize("current_letters", [[None, None, None], ["e", None, None], [None, "a", "r"], ["t", "e", "e"], ["z", None, None]])
+def test_matching_words(word_list: WordList, current_letters: List[Optional[str]]) -> None:
+    expected: List[str] = [word for word in WORDS if all(letter is None or letter == word[i] for i, letter in enumerate(current_letters))]
+    assert sorted(word_list.get_matching_words(3, current_letters)) == expected
+    assert word_list.has_matching_word(3, current_letters) == bool(expected)
+
+def test_matching_words_in_word_list_order(word_list: WordList) -> None:
+    assert list(word_list.get_matching_words(3, [None, None, None])) == list(word_list.word_lists[3])
+
+def test_other_lengths_are_empty(word_list: WordList) -> None:
+    assert word_list.get_matching_bitset(4, [None] * 4) == 0
+    assert list(word_list.get_matching_words(5, ["a", None, None, None, None])) == []
+
+def test_compiled_matches_text(word_list_path: str) -> None:
+    compiled: WordList = WordList(word_list_path)
+    text: WordList = WordList(word_list_path, use_compiled = False)
+    assert compiled.compiled is not None and text.compiled is None
+    for length in range(3, 16):
+        assert sorted(compiled.word_lists[length]) == sorted(text.word_lists[length])
+    for current_letters in ([None, None, None], ["t", None, None], [None, "e", "e"]):
+        assert sorted(compiled.get_matching_words(3, current_letters)) == sorted(text.get_matching_words(3, current_letters))
+
+def test_compiled_file_rebuilt_when_source_changes(word_list_path: str) -> None:
+    assert "tee" in WordList(word_list_path).word_lists[3]
+    assert os.path.exists(get_compiled_path(word_list_path))
+    Path(word_list_path).write_text("cat\ndog\n")
+    word_list: WordList = WordList(word_list_path)
+    assert sorted(word_list.word_lists[3]) == ["cat", "dog"]
+    assert list(word_list.get_matching_words(3, ["d", None, None])) == ["dog"]
+
+def test_filename_used(tmp_path: Path) -> None:
+    path: Path = tmp_path / "other.txt"
+    path.write_text("cat\ndogs\n")
+    word_list: WordList = WordList(str(path), use_compiled = False)
+    assert list(word_list.word_lists[3]) == ["cat"]
+    assert list(word_list.word_lists[4]) == ["dogs"]
+
+def test_length_range_and_filters(word_list_path: str) -> None:
+    word_list: WordList = WordList(word_list_path, max_length = 4, word_filters = (lambda word: word.startswith("t"),))
+    assert set(word_list.word_lists) == {3, 4}
+    assert sorted(word_list.get_matching_words(3, [None, None, None])) == ["tar", "tea", "tee"]
+
+def test_shared_word_lists(word_list_path: str) -> None:
+    word_list: WordList = get_shared_word_list(word_list_path)
+    assert get_shared_word_list(os.path.basename(word_list_path)) is word_list
+    assert get_shared_word_list(word_list_path, max_length = 4) is not word_list
+    assert word_list.load_time >= 0
+    assert word_list.get_memory_footprint() > 0
+
+def test_compiled_and_text_order_match(word_list_path: str) -> None:
+    for seed in (0, 5):
+        compiled: WordList = WordList(word_list_path, seed = seed)
+        text: WordList = WordList(word_list_path, use_compiled = False, seed = seed)
+        assert all(list(compiled.word_lists[length]) == list(text.word_lists[length]) for length in range(3, 16))
+    assert list(WordList(word_list_path, seed = 0).word_lists[3]) != list(WordList(word_list_path, seed = 5).word_lists[3])
+
+@pytest.fixture
+def scored_path(word_list_path: str) -> str:
+    Path(word_list_path).write_text("".join(f"{word};{score}\n" for word, score in zip(WORDS, [30, 60, 50] * 6)))
+    return word_list_path
+
+@pytest.mark.parametrize("use_compiled", [True, False])
+def test_words_in_score_order(scored_path: str, use_compiled: bool) -> None:
+    word_list: WordList = WordList(scored_path, use_compiled = use_compiled)
+    scores: List[int] = [score for _, score in word_list.iterate_scored_bitset(3, word_list.get_full_bitset(3))]
+    assert scores == sorted(scores, reverse = True) and len(scores) == len(WORDS)
+    assert [(end - start, score) for start, end, score in word_list.buckets[3]] == [(6, 60), (5, 50), (6, 30)]
+    # An offset rotates each bucket without mixing scores
+    offset_scores: List[int] = [score for _, score in word_list.iterate_scored_bitset(3, word_list.get_full_bitset(3), 4)]
+    assert offset_scores == scores
+    assert list(word_list.iterate_bitset(3, word_list.get_full_bitset(3), 4)) == [word for word, _ in word_list.iterate_scored_bitset(3, word_list.get_full_bitset(3), 4)]
+
+def test_scored_order_compiled_and_text_match(scored_path: str) -> None:
+    compiled: WordList = WordList(scored_path, seed = 3)
+    text: WordList = WordList(scored_path, use_compiled = False, seed = 3)
+    assert list(compiled.word_lists[3]) == list(text.word_lists[3])
+    assert compiled.buckets[3] == text.buckets[3]
+
+def test_unscored_list_is_one_bucket(word_list_path: str) -> None:
+    assert WordList(word_list_path).buckets[3] == [(0, len(WORDS), 50)]
+
+@pytest.mark.parametrize("use_compiled", [True, False])
+def test_min_score(scored_path: str, use_compiled: bool) -> None:
+    word_list: WordList = WordList(scored_path, use_compiled = use_compiled, min_score = 50)
+    expected: List[str] = [word for word, score in zip(WORDS, [30, 60, 50] * 6) if score >= 50]
+    assert sorted(word_list.get_matching_words(3, [None, None, None])) == expected
+
+def test_non_ascii_words_skipped_by_both_loaders(word_list_path: str) -> None:
+    with open(word_list_path, "a", encoding = "utf-8") as file:
+        file.write("été\ncafé\nnaïve\nzoo\n")
+    compiled: WordList = WordList(word_list_path)
+    text: WordList = WordList(word_list_path, use_compiled = False)
+    assert compiled.compiled is not None
+    assert all(list(compiled.word_lists[length]) == list(text.word_lists[length]) for length in range(3, 16))
+    assert compiled.buckets == text.buckets
+    assert "zoo" in text.word_lists[3] and all(word.isascii() for words in text.word_lists.values() for word in words)
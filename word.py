@@ -5,4 +5,8 @@ class Word:
         self.start_pos = start_pos # Tuple (row, col) coordinates
         self.length = length # Length of the word
         self.word = None
-        self.populated = False # Boolean indicating if the word is populated
\ No newline at end of file
+        self.populated = False # Boolean indicating if the word is populated
+        self.domain = 0 # Bitset of the word list ids that still fit the line
+        self.trail_mark = 0 # Length of the domain trail when the word was placed
+        self.previous_letters = b"" # Letters in the line before the word was placed
+        self.slot_id = -1 # Id of the word in the grid's slot graph
\ No newline at end of file
@@ -1,21 +1,226 @@
-import random
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from compiled_word_list import DEFAULT_SHUFFLE_SEED, DEFAULT_WORD_SCORE, CompiledWordList, ScoreBucket, load_compiled_word_list, order_scored_words, parse_scored_word
+
+WordFilter = Callable[[str], bool]
+# Path, length range, word filters, minimum score, shuffle seed and whether the compiled file is used, which
+# together fix the words of a word list and the order of their ids
+WordListKey = Tuple[str, int, int, Tuple[WordFilter, ...], Optional[int], int, bool]
 
 class WordList:
 
-    def __init__(self, filename = "words_alpha.txt"):
+    def __init__(self, filename = "words_alpha.txt", use_compiled = True, min_length: int = 3, max_length: int = 15, word_filters: Tuple[WordFilter, ...] = (), seed: int = DEFAULT_SHUFFLE_SEED, min_score: Optional[int] = None):
         """
         Initializes the WordListManager with the path to the word list file.
+
+        If use_compiled is True, the word lists and their positional index are memory-mapped from the
+        compiled form of the file (see compiled_word_list.py), which is rebuilt whenever the file changes.
+        Otherwise, or if the compiled file can't be used, the file is parsed and indexed in memory.
+
+        Each line of the file is a word, optionally followed by a semicolon and an integer score (e.g.
+        "crossword;60"). Word ids of each length are ordered from the highest score to the lowest, in
+        buckets of equal score that are shuffled within, so candidates are tried best words first.
+
+        Args:
+            min_length (int): The shortest word length to load.
+            max_length (int): The longest word length to load.
+            word_filters (Tuple[WordFilter, ...]): Functions that every word must return True for to be used.
+            seed (int): The seed used to shuffle each word list. The same seed always gives the same order,
+                            whether the word list is compiled or not, so that grid seeds can be replayed.
+            min_score (Optional[int]): The lowest score of a word to be used, or None to use every word.
         """
+        start_time: float = time.perf_counter()
         self.filename = filename
-        self.word_lists = self.create_word_lists()
+        self.min_length: int = min_length
+        self.max_length: int = max_length
+        self.word_filters: Tuple[WordFilter, ...] = tuple(word_filters)
+        self.seed: int = seed
+        self.use_compiled: bool = use_compiled
+        self.min_score: Optional[int] = min_score
+        self.key: WordListKey = (os.path.abspath(filename), min_length, max_length, self.word_filters, min_score, seed, use_compiled)
+        self.compiled: Optional[CompiledWordList] = load_compiled_word_list(filename, seed) if use_compiled else None
+        if self.compiled:
+            self.word_lists: Dict[int, Sequence[str]] = {i: self.compiled.get_words(i) for i in range(min_length, max_length + 1)}
+            self.buckets: Dict[int, List[ScoreBucket]] = {i: self.compiled.get_buckets(i) for i in range(min_length, max_length + 1)}
+            self.index: Dict[int, Dict[Tuple[int, str], int]] = {}
+        else:
+            self.buckets = {}
+            self.word_lists = self.create_word_lists()
+            self.index = self.create_index()
+        self.full_bitsets: Dict[int, int] = self.create_full_bitsets()
+        self.load_time: float = time.perf_counter() - start_time
 
     def create_word_lists(self):
-        word_lists = {i: [] for i in range(3, 16)}
-        with open("words_alpha.txt") as file:
-            for word in file:
-                word = word.strip()
-                if 3 <= len(word) <= 15:
-                    word_lists[len(word)].append(word)
-        for length in word_lists:
-            random.shuffle(word_lists[length])
-        return word_lists
\ No newline at end of file
+        word_lists = {i: [] for i in range(self.min_length, self.max_length + 1)}
+        with open(self.filename, encoding = "utf-8") as file:
+            for line in file:
+                word, score = parse_scored_word(line)
+                # The compiled format stores one byte per letter, so both loaders skip words that aren't ASCII
+                if self.min_length <= len(word) <= self.max_length and word.isascii():
+                    word_lists[len(word)].append((word, score))
+        for length, words in word_lists.items():
+            self.buckets[length] = order_scored_words(words, length, self.seed)
+        # Tuples, as the lists may be shared between grids and must not change order under the index
+        return {length: tuple(word for word, _ in words) for length, words in word_lists.items()}
+
+    def create_full_bitsets(self) -> Dict[int, int]:
+        """
+        Builds the bitset of every usable word id for each word length: all of them, or only the words
+        that pass every word filter and have at least the minimum score.
+        """
+        full_bitsets: Dict[int, int] = {}
+        for length, words in self.word_lists.items():
+            # Buckets are ordered by score, so the words with at least the minimum score come first
+            usable_count: int = len(words)
+            if self.min_score is not None:
+                usable_count = max((end for _, end, score in self.buckets[length] if score >= self.min_score), default = 0)
+            if self.word_filters:
+                full_bitsets[length] = self.ids_to_bitset([word_id for word_id in range(usable_count) if all(word_filter(words[word_id]) for word_filter in self.word_filters)])
+            else:
+                full_bitsets[length] = (1 << usable_count) - 1
+        return full_bitsets
+
+    def has_scores(self) -> bool:
+        """
+        Returns whether any word has a score other than DEFAULT_WORD_SCORE, which a word list without scores
+        gives every word.
+        """
+        return any(score != DEFAULT_WORD_SCORE for buckets in self.buckets.values() for _, _, score in buckets)
+
+    def get_memory_footprint(self) -> int:
+        """
+        Estimates the number of bytes used by the word lists and their index. For a compiled word list
+        this is the size of the mapping, which is shared with every other process mapping the same file,
+        plus the bitsets converted from it so far.
+        """
+        bitsets: List[int] = list(self.full_bitsets.values())
+        if self.compiled:
+            bitsets += list(self.compiled.bitsets.values())
+            total: int = len(self.compiled.buffer)
+        else:
+            bitsets += [bitset for length_index in self.index.values() for bitset in length_index.values()]
+            total = sum(sys.getsizeof(words) + sum(sys.getsizeof(word) for word in words) for words in self.word_lists.values())
+        return total + sum(sys.getsizeof(bitset) for bitset in bitsets)
+
+    def create_index(self) -> Dict[int, Dict[Tuple[int, str], int]]:
+        """
+        Builds a positional letter index for every word length. Each word is identified by its position
+        in self.word_lists, and each (position, letter) key maps to a bitset (stored as an int) with a bit
+        set for every word id that has that letter at that position.
+
+        Returns:
+            Dict[int, Dict[Tuple[int, str], int]]: The bitsets for each (position, letter) key, by word length.
+        """
+        index: Dict[int, Dict[Tuple[int, str], int]] = {}
+        for length, words in self.word_lists.items():
+            # Collect the ids per key first, as growing a large int one bit at a time is quadratic
+            ids_by_key: Dict[Tuple[int, str], List[int]] = {}
+            for word_id, word in enumerate(words):
+                for position, letter in enumerate(word):
+                    ids_by_key.setdefault((position, letter), []).append(word_id)
+            index[length] = {key: self.ids_to_bitset(ids) for key, ids in ids_by_key.items()}
+        return index
+
+    def ids_to_bitset(self, word_ids: List[int]) -> int:
+        """
+        Converts a list of word ids into a bitset with the bit of each word id set.
+        """
+        if not word_ids:
+            return 0
+        bits: bytearray = bytearray((max(word_ids) >> 3) + 1)
+        for word_id in word_ids:
+            bits[word_id >> 3] |= 1 << (word_id & 7)
+        return int.from_bytes(bits, "little")
+
+    def get_full_bitset(self, word_length: int) -> int:
+        """
+        Returns a bitset containing every usable word id of the given length.
+        """
+        return self.full_bitsets.get(word_length, 0)
+
+    def get_letter_bitset(self, word_length: int, position: int, letter: str) -> int:
+        """
+        Returns the bitset of words of the given length that have the letter at the given position.
+        """
+        if self.compiled:
+            if word_length not in self.word_lists:
+                return 0
+            return self.compiled.get_letter_bitset(word_length, position, letter)
+        return self.index.get(word_length, {}).get((position, letter), 0)
+
+    def get_matching_bitset(self, word_length: int, current_letters: List[Optional[str]]) -> int:
+        """
+        Finds all words of the given length that fit the letters already in a line by intersecting the
+        precomputed bitsets of every filled position.
+
+        Args:
+            current_letters (List[Optional[str]]): The current letters in the line. Blank letters are
+                                                represented by None.
+
+        Returns:
+            int: A bitset of the matching word ids.
+        """
+        matches: int = self.get_full_bitset(word_length)
+        for position, letter in enumerate(current_letters):
+            if letter:
+                matches &= self.get_letter_bitset(word_length, position, letter)
+                if not matches:
+                    break
+        return matches
+
+    def has_matching_word(self, word_length: int, current_letters: List[Optional[str]]) -> bool:
+        """
+        Checks whether at least one word of the given length fits the letters already in a line.
+        """
+        return self.get_matching_bitset(word_length, current_letters) != 0
+
+    def iterate_bitset(self, word_length: int, bitset: int, offset: int = 0) -> Iterator[str]:
+        """
+        Yields the words of the given length whose ids are set in the bitset, in the order of
+        iterate_scored_bitset.
+        """
+        return (word for word, _ in self.iterate_scored_bitset(word_length, bitset, offset))
+
+    def iterate_scored_bitset(self, word_length: int, bitset: int, offset: int = 0) -> Iterator[Tuple[str, int]]:
+        """
+        Yields the words of the given length whose ids are set in the bitset along with their scores, one
+        score bucket at a time from the highest score to the lowest. Within each bucket, words are yielded
+        in word list order starting from the given offset into the bucket (modulo its size) and wrapping
+        around to its start, so a random offset samples each bucket in a random order without reshuffling it.
+        """
+        words: Sequence[str] = self.word_lists[word_length]
+        for start, end, score in self.buckets[word_length]:
+            first_id: int = start + offset % (end - start)
+            for run_start, run_end in ((first_id, end), (start, first_id)):
+                bits: int = (bitset >> run_start) & ((1 << (run_end - run_start)) - 1)
+                while bits:
+                    lowest_bit: int = bits & -bits
+                    yield words[run_start + lowest_bit.bit_length() - 1], score
+                    bits ^= lowest_bit
+
+    def get_matching_words(self, word_length: int, current_letters: List[Optional[str]]) -> Iterator[str]:
+        """
+        Yields every word of the given length that fits the letters already in a line, from the highest
+        score bucket to the lowest and in word list order within each bucket.
+        """
+        return self.iterate_bitset(word_length, self.get_matching_bitset(word_length, current_letters))
+
+# WordLists shared by every grid in the process, keyed by WordList.key
+shared_word_lists: Dict[WordListKey, WordList] = {}
+shared_word_lists_lock: threading.Lock = threading.Lock()
+
+def get_shared_word_list(filename: str = "words_alpha.txt", min_length: int = 3, max_length: int = 15, word_filters: Tuple[WordFilter, ...] = (), min_score: Optional[int] = None, seed: int = DEFAULT_SHUFFLE_SEED, use_compiled: bool = True) -> WordList:
+    """
+    Returns the process-wide WordList for the given path, length range, filters, minimum score, shuffle seed
+    and loader, loading it on first use. Shared word lists must be treated as read-only. Worker processes
+    forked after a word list is loaded inherit it, and compiled word lists are otherwise shared through the
+    memory-mapped file.
+    """
+    key: WordListKey = (os.path.abspath(filename), min_length, max_length, tuple(word_filters), min_score, seed, use_compiled)
+    with shared_word_lists_lock:
+        if key not in shared_word_lists:
+            shared_word_lists[key] = WordList(filename, use_compiled, min_length, max_length, word_filters, seed, min_score)
+        return shared_word_lists[key]